@@ -0,0 +1,71 @@
+import asyncio
+
+from aiohttp import web
+
+from web_security_scanner.core.budget import ScanBudget
+from web_security_scanner.core.scanner_core_async import AsyncScannerCore, ScanConfig
+
+
+def test_no_caps_means_no_budget():
+    assert ScanBudget.from_config({}) is None
+    assert ScanBudget.from_config({'max_time': None, 'max_requests': 0}) is None
+
+
+def test_request_cap_stops_at_the_limit():
+    budget = ScanBudget(max_requests=3)
+    assert [budget.check(sent, 0) for sent in range(5)] == [True, True, True, False, False]
+    assert budget.exhausted and budget.exhausted_by == 'requests'
+
+
+def test_first_cap_reached_is_kept():
+    budget = ScanBudget(max_requests=10, max_bytes=100)
+    assert not budget.check(5, 100)
+    assert not budget.check(10, 100)
+    assert budget.exhausted_by == 'bytes'
+    assert budget.report(10, 100)['exhausted_by'] == 'bytes'
+
+
+def test_running_low_before_exhaustion():
+    budget = ScanBudget(max_requests=100)
+    assert budget.used(50, 0) == 0.5
+    assert not budget.running_low(79, 0)
+    assert budget.running_low(80, 0)
+    assert not budget.exhausted
+
+
+def test_time_cap():
+    budget = ScanBudget(max_time=0.01)
+    budget.started -= 1
+    assert not budget.check(0, 0)
+    assert budget.exhausted_by == 'time'
+    budget.start()
+    assert not budget.exhausted
+
+
+def test_core_refuses_requests_once_the_budget_is_spent():
+    hits = []
+
+    async def handler(request):
+        hits.append(request.path)
+        return web.Response(text='ok')
+
+    async def main():
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        core = AsyncScannerCore(ScanConfig(max_concurrency=1))
+        core.budget = ScanBudget(max_requests=2)
+        try:
+            return [await core.request('GET', f'http://127.0.0.1:{port}/{i}') for i in range(4)]
+        finally:
+            await core.close()
+            await runner.cleanup()
+
+    responses = asyncio.run(main())
+    assert hits == ['/0', '/1']
+    assert [response.get('budget_exhausted', False) for response in responses] == [False, False, True, True]
+    assert responses[2]['status_code'] == 0
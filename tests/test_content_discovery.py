@@ -0,0 +1,102 @@
+import asyncio
+
+from aiohttp import web
+
+from web_security_scanner.core.scanner_core_async import AsyncScannerCore, ScanConfig
+from web_security_scanner.modules.content_discovery_async import ContentDiscoveryAsync
+
+WORDLIST = ['admin', 'backup', 'login', 'uploads']
+
+
+def discover(handler, wordlist=WORDLIST, extensions=('', '.php'), max_depth=2):
+    """Run content discovery against a local server answering every method with handler."""
+    seen = []
+
+    async def recording(request):
+        seen.append((request.method, request.path))
+        return await handler(request)
+
+    async def main():
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', recording)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        core = AsyncScannerCore(ScanConfig(max_concurrency=4))
+        discovery = ContentDiscoveryAsync(core, wordlist=list(wordlist), extensions=list(extensions),
+                                          max_depth=max_depth)
+        try:
+            hits = await discovery.discover(f'http://127.0.0.1:{port}/')
+        finally:
+            await core.close()
+            await runner.cleanup()
+        return {hit['url'].split(str(port), 1)[1]: hit for hit in hits}
+
+    return asyncio.run(main()), seen
+
+
+def test_wildcard_site_reports_nothing():
+    async def handler(request):
+        # Catch-all page echoing the requested path, as many SPAs and CMSs do
+        return web.Response(text=f'<html><h1>Page {request.path} not found</h1><p>id 4711</p></html>')
+
+    hits, _ = discover(handler)
+    assert hits == {}
+
+
+def test_real_404_site_reports_the_existing_path():
+    async def handler(request):
+        if request.path == '/login.php':
+            return web.Response(text='<form method="post"><input name="user"></form>')
+        return web.Response(status=404, text='Not Found')
+
+    hits, _ = discover(handler)
+    assert list(hits) == ['/login.php']
+    assert hits['/login.php']['status_code'] == 200
+    assert not hits['/login.php']['is_directory']
+
+
+def test_head_405_falls_back_to_get():
+    async def handler(request):
+        if request.method == 'HEAD':
+            return web.Response(status=405)
+        if request.path == '/backup':
+            return web.Response(text='index of /backup')
+        return web.Response(status=404, text='Not Found')
+
+    hits, seen = discover(handler, extensions=('',), max_depth=0)
+    assert list(hits) == ['/backup']
+    assert hits['/backup']['method'] == 'GET'
+    assert ('HEAD', '/backup') in seen and ('GET', '/backup') in seen
+
+
+def test_soft_404_is_calibrated_per_extension():
+    async def handler(request):
+        if request.path.endswith('.php'):
+            # PHP front controller swallowing every .php path
+            return web.Response(text='<html>Welcome</html>')
+        if request.path == '/admin':
+            return web.Response(text='admin area')
+        return web.Response(status=404, text='Not Found')
+
+    hits, _ = discover(handler, max_depth=0)
+    assert list(hits) == ['/admin']
+
+
+def test_directories_are_searched_recursively():
+    async def handler(request):
+        if request.path in ('/admin', '/admin/'):
+            return web.Response(status=403, text='Forbidden')
+        if request.path == '/admin/backup.php':
+            return web.Response(text='dump')
+        return web.Response(status=404, text='Not Found')
+
+    hits, _ = discover(handler)
+    assert sorted(hits) == ['/admin', '/admin/backup.php']
+    assert hits['/admin']['is_directory'] and hits['/admin']['depth'] == 0
+    assert hits['/admin/backup.php']['depth'] == 1
+
+    hits, _ = discover(handler, max_depth=0)
+    assert list(hits) == ['/admin']
@@ -0,0 +1,65 @@
+import secrets
+
+from web_security_scanner.modules.cookie_analyzer import (
+    CookieAnalyzer, parse_set_cookie, split_set_cookie, token_entropy
+)
+
+
+def analyzer_with(cookie_header, name, samples, url='https://t/'):
+    analyzer = CookieAnalyzer()
+    analyzer.observe(url, {'set_cookies': [cookie_header]})
+    analyzer.add_samples('t', name, samples)
+    return {entry['name']: entry for entry in analyzer.findings()}
+
+
+def test_parse_and_split_set_cookie():
+    cookie = parse_set_cookie('PHPSESSID="abc"; Path=/; Secure; HttpOnly; SameSite=Lax')
+    assert (cookie.name, cookie.value, cookie.samesite) == ('PHPSESSID', 'abc', 'Lax')
+    assert cookie.secure and cookie.httponly and not cookie.deleted
+    merged = 'a=1; Expires=Wed, 21 Oct 2026 07:28:00 GMT, b=2; Path=/'
+    assert [parse_set_cookie(part).name for part in split_set_cookie(merged)] == ['a', 'b']
+
+
+def test_random_session_ids_are_fine():
+    values = [secrets.token_hex(16) for _ in range(10)]
+    findings = analyzer_with('PHPSESSID=x; Secure; HttpOnly; SameSite=Lax', 'PHPSESSID', values)
+    assert findings == {}
+    assert token_entropy(values)['bits'] >= 64
+
+
+def test_reissued_session_id_is_reported():
+    values = [secrets.token_hex(16) for _ in range(5)]
+    findings = analyzer_with('PHPSESSID=x; Secure; HttpOnly; SameSite=Lax', 'PHPSESSID', values + values[:1])
+    assert findings['PHPSESSID']['reused'] and not findings['PHPSESSID']['weak']
+
+
+def test_low_entropy_session_id_is_reported():
+    values = [f'user{i:04d}' for i in range(10)]
+    findings = analyzer_with('JSESSIONID=x; Secure; HttpOnly; SameSite=Lax', 'JSESSIONID', values)
+    assert findings['JSESSIONID']['weak'] and not findings['JSESSIONID']['reused']
+
+
+def test_static_cookie_with_session_like_name_is_not_an_id():
+    findings = analyzer_with('theme_token=dark; Secure; HttpOnly; SameSite=Lax', 'theme_token', ['dark'] * 10)
+    assert findings == {}
+
+
+def test_short_values_of_session_like_names_are_not_judged():
+    findings = analyzer_with('remember_view=x; Secure; HttpOnly; SameSite=Lax', 'remember_view',
+                             ['grid', 'list', 'grid'])
+    assert findings == {}
+
+
+def test_missing_flags_on_session_cookie():
+    analyzer = CookieAnalyzer()
+    analyzer.observe('https://t/', {'set_cookies': ['sessionid=abc', 'lang=en']})
+    findings = {entry['name']: entry['issues'] for entry in analyzer.findings()}
+    assert findings['sessionid'][:3] == ['missing Secure', 'missing HttpOnly', 'missing SameSite']
+    assert findings['lang'] == ['missing Secure']
+
+
+def test_infrastructure_cookies_are_fingerprints_not_sessions():
+    analyzer = CookieAnalyzer()
+    analyzer.observe('http://t/', {'set_cookies': ['__cf_bm=abc; HttpOnly', 'laravel_session=xyz']})
+    assert analyzer.session_cookies() == [('t', 'laravel_session')]
+    assert analyzer.fingerprints() == {'cdn': {'Cloudflare'}, 'frameworks': {'Laravel'}, 'languages': {'PHP'}}
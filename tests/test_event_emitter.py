@@ -0,0 +1,78 @@
+import asyncio
+
+from web_security_scanner.events.event_emitter import ScanEventEmitter, ScanEventType
+
+
+def run_emitter(max_queue, emits):
+    """Emit everything before the listener gets a chance to run, then deliver; returns what it saw"""
+    received = []
+
+    def listener(**kwargs):
+        received.append(kwargs)
+
+    async def main():
+        emitter = ScanEventEmitter(max_queue=max_queue)
+        for event_type in ScanEventType:
+            emitter.on(event_type, listener)
+        for event_type, kwargs in emits:
+            await emitter.emit(event_type, **kwargs)
+        await emitter.close()
+        return emitter.stats()
+
+    stats = asyncio.run(main())
+    return received, next(iter(stats.values()))
+
+
+def test_pending_progress_is_merged_per_target():
+    emits = [(ScanEventType.PROGRESS_UPDATE, {'target': 'a', 'step': i}) for i in range(5)]
+    emits.append((ScanEventType.PROGRESS_UPDATE, {'target': 'b', 'step': 0}))
+    received, stats = run_emitter(100, emits)
+    assert received == [{'target': 'a', 'step': 4}, {'target': 'b', 'step': 0}]
+    assert stats['merged'] == 4 and stats['dropped'] == 0
+
+
+def test_full_queue_drops_oldest_log_line():
+    emits = [(ScanEventType.LOG_MESSAGE, {'message': str(i)}) for i in range(5)]
+    received, stats = run_emitter(2, emits)
+    assert [event['message'] for event in received] == ['3', '4']
+    assert stats['dropped'] == 3
+
+
+def test_log_line_makes_room_for_a_finding():
+    emits = [(ScanEventType.LOG_MESSAGE, {'message': 'x'}), (ScanEventType.LOG_MESSAGE, {'message': 'y'}),
+             (ScanEventType.VULNERABILITY_FOUND, {'vulnerability': {'type': 'XSS'}})]
+    received, _ = run_emitter(2, emits)
+    assert received == [{'message': 'y'}, {'vulnerability': {'type': 'XSS'}}]
+
+
+def test_newest_progress_wins_on_a_queue_full_of_findings():
+    findings = [(ScanEventType.VULNERABILITY_FOUND, {'vulnerability': {'id': i}}) for i in range(2)]
+    progress = [(ScanEventType.PROGRESS_UPDATE, {'target': 'a', 'step': 1}),
+                (ScanEventType.PROGRESS_UPDATE, {'target': 'b', 'step': 2})]
+    received, _ = run_emitter(2, findings + progress)
+    assert received[:2] == [{'vulnerability': {'id': 0}}, {'vulnerability': {'id': 1}}]
+    assert received[2:] == [{'target': 'b', 'step': 2}]
+
+
+def test_findings_are_never_dropped():
+    emits = [(ScanEventType.VULNERABILITY_FOUND, {'vulnerability': {'id': i}}) for i in range(10)]
+    received, stats = run_emitter(1, emits)
+    assert [event['vulnerability']['id'] for event in received] == list(range(10))
+    assert stats['dropped'] == 0
+
+
+def test_batch_listener_gets_consecutive_log_lines_at_once():
+    calls = []
+
+    def listener(events=None, **kwargs):
+        calls.append([event['message'] for event in events] if events is not None else kwargs)
+
+    async def main():
+        emitter = ScanEventEmitter()
+        emitter.on(ScanEventType.LOG_MESSAGE, listener, batch=True)
+        for i in range(3):
+            await emitter.emit(ScanEventType.LOG_MESSAGE, message=str(i))
+        await emitter.close()
+
+    asyncio.run(main())
+    assert calls == [['0', '1', '2']]
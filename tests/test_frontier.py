@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from web_security_scanner.modules.frontier import MemoryFrontier, SQLiteFrontier, shard_of
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def frontier(request, tmp_path):
+    backend = MemoryFrontier() if request.param == 'memory' else SQLiteFrontier(str(tmp_path / 'frontier.db'))
+    yield backend
+    backend.close()
+
+
+def test_add_urls_dedups(frontier):
+    assert frontier.add_urls([('http://a/', 0), ('http://a/x', 1), ('http://a/', 0)]) == 2
+    assert frontier.add_urls([('http://a/x', 2)]) == 0
+    assert frontier.queued() == 2
+
+
+def test_pop_done_and_pages(frontier):
+    frontier.add_urls([('http://a/', 0)])
+    assert frontier.pop(0) == ('http://a/', 0)
+    assert frontier.in_flight() == 1 and not frontier.is_idle()
+    frontier.done('http://a/', {'status': 200, 'links': []})
+    assert frontier.is_idle()
+    assert dict(frontier.iter_pages()) == {'http://a/': {'status': 200, 'links': []}}
+    assert frontier.pop(0) is None
+
+
+def test_failed_page_releases_slot_without_storing(frontier):
+    frontier.add_urls([('http://a/', 0)])
+    frontier.pop(0)
+    frontier.done('http://a/', None)
+    assert frontier.is_idle()
+    assert list(frontier.iter_pages()) == []
+
+
+def test_requeue_puts_url_back_first(frontier):
+    frontier.add_urls([('http://a/1', 1), ('http://a/2', 1)])
+    url, depth = frontier.pop(0)
+    frontier.requeue(url, depth)
+    assert frontier.in_flight() == 0
+    assert frontier.pop(0) == (url, depth)
+
+
+def test_clear_forgets_everything(frontier):
+    frontier.add_urls([('http://a/', 0), ('http://a/x', 1)])
+    frontier.pop(0)
+    frontier.done('http://a/', {'status': 200})
+    frontier.clear()
+    assert frontier.is_idle()
+    assert list(frontier.iter_pages()) == []
+    # Seen URLs are forgotten too: a new scan crawls them again
+    assert frontier.add_urls([('http://a/', 0)]) == 1
+
+
+def test_run_calls_backend_from_async_code(frontier):
+    async def main():
+        await frontier.run(frontier.add_urls, [('http://a/', 0)])
+        return await frontier.run(frontier.pop, 0)
+    assert asyncio.run(main()) == ('http://a/', 0)
+
+
+def test_sqlite_resume_requeues_in_flight(tmp_path):
+    path = str(tmp_path / 'frontier.db')
+    first = SQLiteFrontier(path)
+    first.add_urls([('http://a/', 0), ('http://a/x', 1)])
+    first.pop(0)
+    first.done('http://a/', {'status': 200})
+    assert first.pop(0) == ('http://a/x', 1)
+    first.close()  # the crawl died with http://a/x in flight
+
+    resumed = SQLiteFrontier(path)
+    assert resumed.requeue_in_flight() == 1
+    assert resumed.add_urls([('http://a/', 0), ('http://a/x', 1)]) == 0
+    assert resumed.pop(0) == ('http://a/x', 1)
+    assert dict(resumed.iter_pages()) == {'http://a/': {'status': 200}}
+    resumed.close()
+
+
+def test_shards_partition_urls():
+    frontier = MemoryFrontier(num_shards=4)
+    urls = [f'http://a/{i}' for i in range(20)]
+    frontier.add_urls([(url, 0) for url in urls])
+    for url in urls:
+        assert 0 <= shard_of(url, 4) < 4
+    popped = {frontier.pop(shard_of(url, 4))[0] for url in urls}
+    assert popped == set(urls)
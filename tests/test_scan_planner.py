@@ -0,0 +1,96 @@
+from web_security_scanner.modules import scan_planner
+from web_security_scanner.modules.endpoint_pipeline import page_parameters
+from web_security_scanner.modules.scan_planner import ScanPlanner, filter_payloads, payload_tags
+
+
+class FakeTester:
+    """Just the payload interface the planner relies on"""
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.excluded_tags = set()
+
+    def get_payloads(self):
+        return list(self.payloads)
+
+    def planned_payloads(self):
+        return filter_payloads(self.payloads, self.excluded_tags)
+
+
+UNIX_PAYLOAD = '; cat /etc/passwd'
+WINDOWS_PAYLOAD = '& type C:\\windows\\win.ini'
+PHP_PAYLOAD = 'php://filter/convert.base64-encode/resource=index.php'
+
+
+def test_payload_tags_from_text():
+    assert 'unix' in payload_tags(UNIX_PAYLOAD)
+    assert 'win' in payload_tags(WINDOWS_PAYLOAD)
+    assert 'php' in payload_tags(PHP_PAYLOAD)
+
+
+def test_os_family_prunes_other_os_payloads():
+    planner = ScanPlanner({'servers': ['IIS'], 'languages': ['ASP.NET']})
+    assert planner.os_family() == 'windows'
+    tester = FakeTester([UNIX_PAYLOAD, WINDOWS_PAYLOAD, "' OR 1=1--"])
+    plan = planner.plan({'command_injection': tester}, targets=2)
+    entry = plan.testers[0]
+    assert tester.planned_payloads() == [WINDOWS_PAYLOAD, "' OR 1=1--"]
+    assert (entry.payloads, entry.pruned_payloads, entry.requests) == (2, 1, 4)
+
+
+def test_landing_page_estimate_counts_query_and_form_fields():
+    landing = '<form method="post"><input name="user"><input name="pass"><input type="submit"></form>'
+    assert page_parameters('https://t/', '') == 1
+    assert page_parameters('https://t/?q=1&page=2', landing) == 4
+    plan = ScanPlanner({}).plan({'xss': FakeTester(['<svg onload=alert(1)>'])},
+                                targets=page_parameters('https://t/', landing))
+    assert plan.estimated_requests == 2
+
+
+def test_conflicting_or_missing_os_prunes_nothing():
+    assert ScanPlanner({'servers': ['IIS', 'Nginx']}).os_family() is None
+    assert ScanPlanner({}).excluded_tags() == set()
+
+
+def test_apache_counts_as_unix_unless_windows_is_seen():
+    assert ScanPlanner({'servers': ['Apache']}).os_family() == 'unix'
+    assert ScanPlanner({'servers': ['Apache']}, server_banner='Apache/2.4 (Win64)').os_family() == 'windows'
+
+
+def test_language_pruning_only_once_a_tagged_language_is_known():
+    php = ScanPlanner({'languages': ['PHP']}).excluded_tags()
+    assert {'python', 'java', 'asp'} <= php and 'php' not in php
+    assert ScanPlanner({'languages': ['Go']}).excluded_tags() == set()
+
+
+def test_xxe_kept_when_xml_support_is_unknown():
+    planner = ScanPlanner({}, content_types=['text/html', 'application/x-www-form-urlencoded'])
+    assert planner.accepts_xml() is None
+    assert planner.plan({'xxe': FakeTester(['<!DOCTYPE x>'])}, targets=1).is_enabled('xxe')
+
+
+def test_xxe_skipped_only_when_every_endpoint_refused_the_probe():
+    refused = ScanPlanner({}, xml_probe_statuses=[415, 405, 404])
+    assert refused.accepts_xml() is False
+    plan = refused.plan({'xxe': FakeTester(['<!DOCTYPE x>']), 'xss': FakeTester(['<svg>'])}, targets=1)
+    assert not plan.is_enabled('xxe') and plan.is_enabled('xss')
+    assert plan.estimated_requests == 1
+
+    assert ScanPlanner({}, xml_probe_statuses=[415, 200]).accepts_xml() is True
+    assert ScanPlanner({}, content_types=['text/xml']).accepts_xml() is True
+
+
+def test_tester_skipped_after_planning():
+    plan = ScanPlanner({}).plan({'xxe': FakeTester(['<!DOCTYPE x>']), 'xss': FakeTester(['<svg>'])}, targets=1)
+    assert plan.estimated_requests == 2
+    plan.skip('xxe', 'no endpoint accepts XML')
+    assert not plan.is_enabled('xxe') and plan.is_enabled('xss')
+    assert plan.estimated_requests == 1
+    assert '  - xxe: skipped (no endpoint accepts XML)' in plan.summary_lines()
+
+
+def test_tester_priority_by_key_or_class_name():
+    priority = scan_planner.tester_priority
+    assert scan_planner.tester_family('SQLInjectionTester') == 'sql_injection'
+    assert priority('SQLInjectionTester') == priority('sql_injection')
+    assert priority('sql_injection') > priority('xss') > priority('csrf')
+    assert priority('SomethingNewTester') == 50
@@ -0,0 +1,85 @@
+from web_security_scanner.core.waf_guard import ENCODINGS, WafGuard
+
+CLOUDFLARE_PAGE = '<title>Attention Required! | Cloudflare</title><div id="cf-error-details">blocked</div>'
+ERROR_PAGE = '<html><body><h1>Forbidden</h1><p>Request id 123</p></body></html>'
+
+
+def test_known_waf_page_is_a_block():
+    guard = WafGuard()
+    verdict = guard.observe('https://t/search?q=<script>', 403, {}, CLOUDFLARE_PAGE, probe=True)
+    assert verdict.blocked and verdict.waf == 'Cloudflare'
+    assert guard.waf_active('https://t/')
+
+
+def test_block_header_is_a_block_whatever_the_status():
+    verdict = WafGuard().observe('https://t/', 200, {'X-Sucuri-Block': '1'}, '')
+    assert verdict.blocked and verdict.waf == 'Sucuri'
+
+
+def test_ordinary_error_pages_without_payload_are_not_blocks():
+    guard = WafGuard()
+    guard.observe('https://t/', 200, {}, 'home')
+    for path in ('admin', 'private', 'backup', 'config'):
+        assert not guard.observe(f'https://t/{path}', 403, {}, ERROR_PAGE).blocked
+    assert not guard.observe('https://t/', 501, {}, 'Not Implemented').blocked
+    assert guard.report() == {}
+
+
+def test_path_that_fails_without_payload_is_never_a_block():
+    guard = WafGuard()
+    guard.observe('https://t/admin', 403, {}, ERROR_PAGE)
+    for i in range(5):
+        assert not guard.observe(f'https://t/admin?id={i}%27', 403, {}, 'Access denied', probe=True).blocked
+
+
+def test_generic_block_page_on_payload_request():
+    guard = WafGuard()
+    guard.observe('https://t/item', 200, {}, 'item page')
+    verdict = guard.observe("https://t/item?id=1'", 403, {}, 'Your request has been blocked', probe=True)
+    assert verdict.blocked and verdict.reason == 'block page'
+
+
+def test_baseline_drift_needs_several_urls():
+    guard = WafGuard(drift_threshold=3)
+    for path in ('a', 'b', 'c'):
+        guard.observe(f'https://t/{path}', 200, {}, 'ok')
+    verdicts = [guard.observe(f"https://t/{path}?q='", 403, {}, ERROR_PAGE, probe=True).blocked
+                for path in ('a', 'b', 'c')]
+    assert verdicts == [False, False, True]
+    # The page is now known: the next payload that gets it is blocked straight away
+    assert guard.observe("https://t/a?q=%22", 403, {}, ERROR_PAGE, probe=True).blocked
+
+
+def test_rate_limit_backs_off_without_escalating():
+    guard = WafGuard(backoff=1.0, escalate_after=1)
+    verdict = guard.observe('https://t/', 429, {'Retry-After': '7'}, '')
+    assert verdict.blocked and verdict.reason == 'rate limited'
+    assert guard.hosts['t'].delay == 7.0
+    assert guard.encoding('https://t/') == 'raw'
+
+
+def test_blocks_escalate_encoding_and_answers_recover_delay():
+    guard = WafGuard(backoff=1.0, recovery=0.5, escalate_after=2)
+    for _ in range(2):
+        guard.observe('https://t/?q=x', 403, {}, CLOUDFLARE_PAGE, probe=True)
+    assert guard.encoding('https://t/') == ENCODINGS[1]
+    assert guard.hosts['t'].delay == 2.0
+    guard.observe('https://t/', 200, {}, 'ok')
+    assert guard.hosts['t'].delay == 1.5
+
+
+def test_gives_up_only_after_last_encoding_and_default_cap():
+    assert WafGuard().give_up_after == 50
+    guard = WafGuard(escalate_after=1, give_up_after=5)
+    for _ in range(len(ENCODINGS) - 1):
+        guard.observe('https://t/?q=x', 403, {}, CLOUDFLARE_PAGE, probe=True)
+    assert not guard.gave_up('https://t/')
+    for _ in range(5):
+        guard.observe('https://t/?q=x', 403, {}, CLOUDFLARE_PAGE, probe=True)
+    assert guard.gave_up('https://t/')
+
+
+def test_disabled_guard_sees_nothing():
+    guard = WafGuard.from_config({'enabled': False})
+    assert not guard.observe('https://t/', 403, {}, CLOUDFLARE_PAGE, probe=True).blocked
+    assert guard.reserve('https://t/') == 0.0
@@ -0,0 +1,209 @@
+"""
+Batch scanning
+Scans many targets over one shared connection pool, scheduling requests fairly between them
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, TextIO, Union
+from urllib.parse import urlparse
+
+import aiohttp
+
+from .core.fair_limiter import FairLimiter
+from .core.scanner_core_async import AsyncScannerCore, ScanConfig
+from .events.event_emitter import ScanEventEmitter, ScanEventType
+from .web_security_scanner_async import WebSecurityScanner
+
+# Per-target start/complete events are turned into progress messages; the batch emits its own
+_BATCH_EVENTS = (ScanEventType.SCAN_START, ScanEventType.SCAN_COMPLETE)
+
+
+def normalize_target(line: str) -> str:
+    """'example.com' -> 'http://example.com'; '' for blank lines and '#' comments"""
+    target = line.split('#', 1)[0].strip()
+    if not target:
+        return ''
+    if '://' not in target:
+        target = 'http://' + target
+    return target
+
+
+def load_targets(source: Union[str, TextIO, Iterable[str]]) -> List[str]:
+    """Targets from a file path, '-' (stdin) or any iterable of lines; duplicates dropped, order kept"""
+    if source == '-':
+        lines: Iterable[str] = sys.stdin
+    elif isinstance(source, str):
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    else:
+        lines = source
+    targets, seen = [], set()
+    for line in lines:
+        target = normalize_target(line)
+        if target and target.rstrip('/') not in seen:
+            seen.add(target.rstrip('/'))
+            targets.append(target)
+    return targets
+
+
+class BatchScanner:
+    """
+    Scans a list of targets with one WebSecurityScanner each.
+
+    Every target gets its own core (cache, WAF guard, passive checks) but
+    they all share one aiohttp connector and one FairLimiter: `per_target`
+    caps the requests a target has in flight, `global_concurrency` caps the
+    whole batch and freed slots rotate between targets, so a large site
+    cannot starve the small ones. At most `max_targets` scans run at once
+    and results are yielded as each target finishes.
+    """
+    def __init__(self, config: Dict[str, Any] = None, max_targets: int = 10, per_target: int = 10,
+                 global_concurrency: int = 100, output_dir: str = 'reports',
+                 event_emitter: ScanEventEmitter = None, batch_dir: str = None):
+        self.config = config or {}
+        self.max_targets = max(1, max_targets)
+        self.per_target = max(1, per_target)
+        self.global_concurrency = max(1, global_concurrency)
+        # Worker processes of one batch share the directory their parent picked
+        self.output_dir = Path(batch_dir) if batch_dir else Path(output_dir) / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.event_emitter = event_emitter or ScanEventEmitter()
+        self.limiter: Optional[FairLimiter] = None
+        self._logger = logging.getLogger(__name__)
+
+    async def scan(self, targets: List[str], profile: str = "balanced",
+                   indexes: List[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Scan every target; yields each target's summary as soon as it completes.
+        indexes numbers the reports (default: position in targets), so shards
+        of one batch scanned by different processes do not overwrite each other.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        connector = aiohttp.TCPConnector(limit=self.global_concurrency, ssl=False)
+        self.limiter = FairLimiter(self.global_concurrency)
+        pending: asyncio.Queue = asyncio.Queue()
+        for index, target in zip(indexes or range(len(targets)), targets):
+            pending.put_nowait((index, target))
+        finished: asyncio.Queue = asyncio.Queue()
+
+        async def worker():
+            while True:
+                try:
+                    index, target = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await finished.put(await self._scan_target(index, target, profile, connector))
+
+        await self.event_emitter.emit(ScanEventType.SCAN_START, url=f"{len(targets)} targets", targets=targets)
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_targets, len(targets)))]
+        try:
+            for done in range(1, len(targets) + 1):
+                summary = await finished.get()
+                await self.event_emitter.emit(
+                    ScanEventType.PROGRESS_UPDATE,
+                    message=f"Finished {summary['url']} ({done}/{len(targets)})"
+                )
+                yield summary
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await connector.close()
+            await self.event_emitter.emit(ScanEventType.SCAN_COMPLETE, report=str(self.output_dir))
+            await self.event_emitter.close()
+
+    async def run(self, targets: List[str], profile: str = "balanced") -> List[Dict[str, Any]]:
+        """Scan every target and return all summaries (in completion order)"""
+        return [summary async for summary in self.scan(targets, profile)]
+
+    async def _scan_target(self, index: int, target: str, profile: str,
+                           connector: aiohttp.BaseConnector) -> Dict[str, Any]:
+        config = copy.deepcopy(self.config)
+        core_settings = dict(config.get('core', {}), max_concurrency=self.per_target)
+        host = re.sub(r'[^A-Za-z0-9_.-]', '_', urlparse(target).netloc) or 'target'
+        config.setdefault('mapping', {})['output_path'] = str(self.output_dir / f"{index:04d}_{host}.html")
+
+        core = AsyncScannerCore(ScanConfig(**core_settings), connector=connector,
+                                limiter=self.limiter, limiter_key=target)
+        scanner = WebSecurityScanner(config, core=core)
+        self._forward_events(scanner.event_emitter, target)
+        started = time.time()
+        try:
+            summary = await scanner.run_scan(target, profile)
+        except Exception as e:
+            self._logger.error(f"Scan of {target} failed: {e}")
+            summary = {'url': target, 'vulnerabilities': [], 'technologies': {}, 'report': None, 'error': str(e)}
+        summary['duration'] = round(time.time() - started, 2)
+        summary['requests'] = self.limiter.granted.get(target, 0)
+        return summary
+
+    def _forward_events(self, emitter: ScanEventEmitter, target: str):
+        """Re-emit a target's events on the batch emitter, tagged with target=url"""
+        for event_type in ScanEventType:
+            if event_type in _BATCH_EVENTS:
+                continue
+
+            async def forward(_event_type=event_type, **kwargs):
+                await self.event_emitter.emit(_event_type, target=target, **kwargs)
+            # Inline: forwarding only enqueues on the batch emitter, and keeps the target's event order
+            emitter.on(event_type, forward, inline=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scan many targets; one JSON line per finished target')
+    parser.add_argument('targets', help="File with one target per line, or '-' for stdin")
+    parser.add_argument('--profile', default='balanced', choices=['quick', 'balanced', 'intense', 'mapping'])
+    parser.add_argument('--max-targets', type=int, default=10, help='Targets scanned at the same time')
+    parser.add_argument('--per-target', type=int, default=10, help='Requests in flight per target')
+    parser.add_argument('--concurrency', type=int, default=100, help='Requests in flight for the whole batch')
+    parser.add_argument('--output-dir', default='reports', help='Directory for the per-target maps')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Worker processes to spread the targets over (0 = one per CPU core)')
+    parser.add_argument('-o', '--output', help='Write the JSON lines here instead of stdout')
+    parser.add_argument('--checkpoint', metavar='DB', help="SQLite file where every target's progress is saved")
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue interrupted scans from --checkpoint without resending completed payloads')
+    parser.add_argument('--max-time', type=float, metavar='SECONDS', help='Wall time budget per target')
+    parser.add_argument('--max-requests', type=int, metavar='N', help='Request budget per target')
+    parser.add_argument('--max-bytes', type=int, metavar='N', help='Response bytes budget per target')
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs --checkpoint')
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    targets = load_targets(args.targets)
+    config = {'checkpoint': {'path': args.checkpoint, 'resume': args.resume}} if args.checkpoint else {}
+    budget = {cap: getattr(args, cap) for cap in ('max_time', 'max_requests', 'max_bytes') if getattr(args, cap)}
+    if budget:
+        config['budget'] = budget
+    options = dict(config=config, max_targets=args.max_targets, per_target=args.per_target,
+                   global_concurrency=args.concurrency, output_dir=args.output_dir)
+    if args.processes != 1:
+        from .process_pool import ProcessPoolScanner
+        batch = ProcessPoolScanner(processes=args.processes or None, **options)
+    else:
+        batch = BatchScanner(**options)
+
+    async def run():
+        out = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+        try:
+            async for summary in batch.scan(targets, args.profile):
+                out.write(json.dumps(summary, default=str) + '\n')
+                out.flush()
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Headless async scanner
+Runs the async engine without a GUI and streams its events to stdout as JSON lines
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, TextIO
+
+# Engine modules are imported in main(), after the arguments were parsed: --help and bad
+# arguments cost no aiohttp import, and nothing here pulls in tkinter or the report backends
+
+PROFILES = ['quick', 'balanced', 'intense', 'mapping']
+
+
+class JsonLinesWriter:
+    """
+    Writes scan events as one JSON object per line:
+    scan_start, progress, finding, error, log (with --logs), summary
+    (one per target) and scan_complete. Every line has 'event' and 'time'.
+    """
+    def __init__(self, out: TextIO, logs: bool = False):
+        self.out = out
+        self.logs = logs
+        self.findings = 0
+        self.errors = 0
+
+    def write(self, event: str, **data: Any):
+        self.out.write(json.dumps(dict(event=event, time=round(time.time(), 3), **data), default=str) + '\n')
+        self.out.flush()
+
+    def subscribe(self, emitter):
+        from .events.event_emitter import ScanEventType
+
+        handlers = {
+            ScanEventType.PROGRESS_UPDATE: self._on_progress,
+            ScanEventType.VULNERABILITY_FOUND: self._on_finding,
+            ScanEventType.ERROR: self._on_error,
+        }
+        if self.logs:
+            handlers[ScanEventType.LOG_MESSAGE] = self._on_log
+        for event_type, handler in handlers.items():
+            # Inline: a line is written as the event happens, in order; a slow reader applies backpressure
+            emitter.on(event_type, handler, inline=True)
+
+    def _on_progress(self, target: str = None, message: str = '', progress: Dict[str, Any] = None, **kwargs):
+        if progress:
+            self.write('progress', target=target, **progress)
+        else:
+            self.write('progress', target=target, message=message)
+
+    def _on_finding(self, target: str = None, vulnerability: Dict[str, Any] = None, tester: str = None, **kwargs):
+        self.findings += 1
+        self.write('finding', target=target, tester=tester, vulnerability=vulnerability)
+
+    def _on_error(self, target: str = None, error: str = '', **kwargs):
+        self.errors += 1
+        self.write('error', target=target, error=error)
+
+    def _on_log(self, target: str = None, message: str = '', **kwargs):
+        self.write('log', target=target, message=message)
+
+
+def build_config(args: argparse.Namespace) -> Dict[str, Any]:
+    """Async scanner config: the --config YAML file, overridden by the command line options"""
+    config: Dict[str, Any] = {}
+    if args.config:
+        import yaml
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+    config.setdefault('progress', {})['interval'] = args.progress_interval
+    budget = {cap: getattr(args, cap) for cap in ('max_time', 'max_requests', 'max_bytes') if getattr(args, cap)}
+    if budget:
+        config.setdefault('budget', {}).update(budget)
+    if args.checkpoint:
+        config['checkpoint'] = {'path': args.checkpoint, 'resume': args.resume}
+    return config
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Headless async scan: findings, progress and one summary per target as JSON lines on stdout'
+    )
+    parser.add_argument('targets', nargs='*', help='Target URLs (example.com means http://example.com)')
+    parser.add_argument('-f', '--targets-file', help="File with one target per line, or '-' for stdin")
+    parser.add_argument('--profile', default='balanced', choices=PROFILES)
+    parser.add_argument('--config', help='YAML file with async scanner settings (core, mapping, testers, ...)')
+    parser.add_argument('--max-time', type=float, metavar='SECONDS', help='Wall time budget per target')
+    parser.add_argument('--max-requests', type=int, metavar='N', help='Request budget per target')
+    parser.add_argument('--max-bytes', type=int, metavar='N', help='Response bytes budget per target')
+    parser.add_argument('--max-targets', type=int, default=10, help='Targets scanned at the same time')
+    parser.add_argument('--per-target', type=int, default=10, help='Requests in flight per target')
+    parser.add_argument('--concurrency', type=int, default=100, help='Requests in flight in total')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Worker processes to spread the targets over (0 = one per CPU core)')
+    parser.add_argument('--progress-interval', type=float, default=5.0, metavar='SECONDS',
+                        help='Seconds between progress lines (0 disables them)')
+    parser.add_argument('--logs', action='store_true', help='Also stream log messages')
+    parser.add_argument('--output-dir', default='reports', help='Directory for the per-target HTML maps')
+    parser.add_argument('--checkpoint', metavar='DB', help='SQLite file where scan progress is saved')
+    parser.add_argument('--resume', action='store_true', help='Continue interrupted scans from --checkpoint')
+    parser.add_argument('--lang', default='en', help='Language of finding names and evidence (en, es)')
+    args = parser.parse_args(argv)
+    if not args.targets and not args.targets_file:
+        parser.error('give at least one target or --targets-file')
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs --checkpoint')
+    return args
+
+
+def main(argv=None) -> int:
+    """Exit status: 0 when every target was scanned, 1 when a scan failed, 130 when interrupted"""
+    args = parse_args(argv)
+
+    import asyncio
+    import logging
+
+    from .batch_scanner import BatchScanner, load_targets
+    from .utils.i18n import i18n
+
+    # stdout carries the JSON lines; logging goes to stderr and stays quiet unless something breaks
+    logging.basicConfig(level=logging.ERROR, stream=sys.stderr,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    i18n.load_languages(str(Path(__file__).parent / 'languages.yaml'))
+    i18n.set_language(args.lang)
+
+    targets = load_targets(args.targets)
+    if args.targets_file:
+        targets += [target for target in load_targets(args.targets_file) if target not in targets]
+
+    writer = JsonLinesWriter(sys.stdout, logs=args.logs)
+    options = dict(config=build_config(args), max_targets=args.max_targets, per_target=args.per_target,
+                   global_concurrency=args.concurrency, output_dir=args.output_dir)
+    if args.processes != 1:
+        from .process_pool import ProcessPoolScanner
+        batch = ProcessPoolScanner(processes=args.processes or None, **options)
+    else:
+        batch = BatchScanner(**options)
+    writer.subscribe(batch.event_emitter)
+    failed = 0
+
+    async def run():
+        nonlocal failed
+        started = time.time()
+        writer.write('scan_start', targets=targets, profile=args.profile)
+        async for summary in batch.scan(targets, args.profile):
+            failed += bool(summary.get('error'))
+            # Findings were already streamed one by one: the summary only counts them
+            summary = dict(summary, findings=len(summary.pop('vulnerabilities', None) or []))
+            writer.write('summary', **summary)
+        writer.write('scan_complete', targets=len(targets), findings=writer.findings, failed=failed,
+                     duration=round(time.time() - started, 2))
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        return 130
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,29 @@ Core module for Web Security Scanner
 Contains base classes and utilities
 """
 
-from .scanner_core import ScannerCore
-from .config import Config
-from .logger import setup_logger
-from .i18n import I18n, get_i18n, t
+import importlib
 
-__all__ = ['ScannerCore', 'Config', 'setup_logger', 'I18n', 'get_i18n', 't']
+# Imported on first access (PEP 562): the async engine imports core.scanner_core_async
+# without loading requests through ScannerCore
+_EXPORTS = {
+    'ScannerCore': '.scanner_core',
+    'Config': '.config',
+    'setup_logger': '.logger',
+    'I18n': '.i18n',
+    'get_i18n': '.i18n',
+    't': '.i18n',
+    'WafGuard': '.waf_guard',
+}
+
+__all__ = ['ScannerCore', 'Config', 'setup_logger', 'I18n', 'get_i18n', 't', 'WafGuard']
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = globals()[name] = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
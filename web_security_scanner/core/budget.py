@@ -0,0 +1,94 @@
+"""
+Scan budgets
+Hard caps on a scan's wall time, requests sent and bytes received
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Share of the tightest cap after which the scan stops running testers in parallel
+LOW_WATER = 0.8
+
+
+class ScanBudget:
+    """
+    Wall time (seconds), request and byte caps of one scan; None means no cap.
+
+    The core asks check() before sending each request and refuses to send
+    once a cap is reached, so the overshoot is bounded by the requests
+    already in flight (their responses still count towards the bytes). The
+    first cap reached is kept in exhausted_by; the scan then stops starting
+    new work and reports what it did not cover.
+    """
+    def __init__(self, max_time: Optional[float] = None, max_requests: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
+        self.max_time = max_time
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.started = time.time()
+        self.exhausted_by: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict[str, Any]]) -> Optional['ScanBudget']:
+        """Budget from {max_time, max_requests, max_bytes}; None when no cap is set"""
+        settings = settings or {}
+        caps = {key: settings.get(key) for key in ('max_time', 'max_requests', 'max_bytes')}
+        if not any(caps.values()):
+            return None
+        return cls(**{key: value or None for key, value in caps.items()})
+
+    def start(self):
+        """Restart the clock (the budget is created before the scan begins)"""
+        self.started = time.time()
+        self.exhausted_by = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.started
+
+    @property
+    def exhausted(self) -> bool:
+        return self.exhausted_by is not None
+
+    def check(self, requests: int, bytes_received: int) -> bool:
+        """True while another request fits in the budget"""
+        if self.exhausted_by is not None:
+            return False
+        reason = None
+        if self.max_time and self.elapsed >= self.max_time:
+            reason = 'time'
+        elif self.max_requests and requests >= self.max_requests:
+            reason = 'requests'
+        elif self.max_bytes and bytes_received >= self.max_bytes:
+            reason = 'bytes'
+        if reason is None:
+            return True
+        with self._lock:
+            if self.exhausted_by is None:
+                self.exhausted_by = reason
+        return False
+
+    def used(self, requests: int, bytes_received: int) -> float:
+        """Fraction of the tightest cap already spent (0.0 to 1.0)"""
+        shares = [0.0]
+        if self.max_time:
+            shares.append(self.elapsed / self.max_time)
+        if self.max_requests:
+            shares.append(requests / self.max_requests)
+        if self.max_bytes:
+            shares.append(bytes_received / self.max_bytes)
+        return min(1.0, max(shares))
+
+    def running_low(self, requests: int, bytes_received: int) -> bool:
+        """True once LOW_WATER of some cap is spent: remaining work should go to the most valuable tests first"""
+        return self.exhausted or self.used(requests, bytes_received) >= LOW_WATER
+
+    def report(self, requests: int, bytes_received: int) -> Dict[str, Any]:
+        """Caps, what was used and which cap stopped the scan (None when it finished within budget)"""
+        return {
+            'limits': {'max_time': self.max_time, 'max_requests': self.max_requests, 'max_bytes': self.max_bytes},
+            'used': {'time': round(self.elapsed, 1), 'requests': requests, 'bytes': bytes_received},
+            'exhausted_by': self.exhausted_by,
+        }
@@ -0,0 +1,211 @@
+"""
+Scan checkpoints
+Completed payloads, findings and resumable state of a scan, kept in a local SQLite file
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+# Payload value marking a whole parameter as done (e.g. it was found vulnerable, the rest are skipped)
+ALL_PAYLOADS = '*'
+
+PayloadKey = Tuple[str, str, str, str]
+
+
+class ScanCheckpoint:
+    """
+    Progress of one target's scan in the scans database.
+
+    Testers ask is_done() before sending a payload and call mark_done() once
+    its response was checked, findings go through add_finding() and anything
+    else resumable (queued forms, ...) through save_state(). Writes are
+    buffered and flushed every `interval` seconds and on close(), so a killed
+    scan loses at most that much work; findings are written at once. Safe to
+    share between threads (the sync testers use a thread pool).
+    """
+    def __init__(self, path: str = 'scans.db', target: str = '', interval: float = 5.0):
+        self.path = path
+        self.target = target
+        self.interval = interval
+        self.stats = {'skipped': 0, 'completed': 0, 'findings': 0}
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS checkpoint_scans (
+                target TEXT PRIMARY KEY, status TEXT, started REAL, updated REAL
+            );
+            CREATE TABLE IF NOT EXISTS checkpoint_payloads (
+                target TEXT, tester TEXT, endpoint TEXT, parameter TEXT, payload TEXT,
+                PRIMARY KEY (target, tester, endpoint, parameter, payload)
+            );
+            CREATE TABLE IF NOT EXISTS checkpoint_findings (
+                target TEXT, key TEXT, data TEXT, PRIMARY KEY (target, key)
+            );
+            CREATE TABLE IF NOT EXISTS checkpoint_state (
+                target TEXT, name TEXT, value TEXT, PRIMARY KEY (target, name)
+            );
+        """)
+        self._lock = threading.Lock()
+        self._done: Set[PayloadKey] = set()
+        self._finding_keys: Set[str] = set()
+        self._pending: List[PayloadKey] = []
+        self._pending_state: Dict[str, str] = {}
+        self._last_flush = time.time()
+
+    @staticmethod
+    def endpoint(url: str, method: str = 'GET', parameters: Optional[Iterable[str]] = None) -> str:
+        """'GET http://host/item?id' for http://host/item?id=7: the endpoint, not the values sent"""
+        parsed = urlparse(url)
+        if parameters is None:
+            parameters = [name for name, _ in parse_qsl(parsed.query, keep_blank_values=True)]
+        names = '&'.join(sorted(set(parameters)))
+        return f"{method.upper()} {parsed.scheme}://{parsed.netloc}{parsed.path}?{names}"
+
+    def frontier_path(self) -> str:
+        """Crawl frontier file of this target, next to the scans database"""
+        digest = hashlib.sha1(self.target.encode('utf-8')).hexdigest()[:16]
+        base = Path(self.path)
+        return str(base.with_name(f"{base.stem}_frontier_{digest}.db"))
+
+    def begin(self, resume: bool = False) -> bool:
+        """
+        Start (or continue) the target's scan. Without resume whatever a
+        previous run stored is dropped; returns True when a previous run's
+        progress was loaded.
+        """
+        row = self._conn.execute(
+            "SELECT status FROM checkpoint_scans WHERE target = ?", (self.target,)
+        ).fetchone()
+        resumed = bool(resume and row)
+        if not resumed:
+            self.reset()
+        else:
+            self._done = set(self._conn.execute(
+                "SELECT tester, endpoint, parameter, payload FROM checkpoint_payloads WHERE target = ?",
+                (self.target,)
+            ))
+            self._finding_keys = {key for (key,) in self._conn.execute(
+                "SELECT key FROM checkpoint_findings WHERE target = ?", (self.target,)
+            )}
+        now = time.time()
+        self._conn.execute(
+            "INSERT INTO checkpoint_scans VALUES (?, 'running', ?, ?) "
+            "ON CONFLICT(target) DO UPDATE SET status = 'running', updated = excluded.updated",
+            (self.target, now, now)
+        )
+        return resumed
+
+    def reset(self):
+        """Forget the target's progress, crawl frontier included"""
+        with self._lock:
+            for table in ('checkpoint_scans', 'checkpoint_payloads', 'checkpoint_findings', 'checkpoint_state'):
+                self._conn.execute(f"DELETE FROM {table} WHERE target = ?", (self.target,))
+            self._done.clear()
+            self._finding_keys.clear()
+            self._pending.clear()
+            self._pending_state.clear()
+        for suffix in ('', '-wal', '-shm'):
+            Path(self.frontier_path() + suffix).unlink(missing_ok=True)
+
+    @property
+    def completed(self) -> int:
+        return len(self._done)
+
+    def is_done(self, tester: str, endpoint: str, parameter: str, payload: str) -> bool:
+        done = ((tester, endpoint, parameter, payload) in self._done
+                or (tester, endpoint, parameter, ALL_PAYLOADS) in self._done)
+        if done:
+            with self._lock:
+                self.stats['skipped'] += 1
+        return done
+
+    def mark_done(self, tester: str, endpoint: str, parameter: str, payload: str = ALL_PAYLOADS):
+        key = (tester, endpoint, parameter, payload)
+        with self._lock:
+            if key in self._done:
+                return
+            self._done.add(key)
+            self._pending.append(key)
+            self.stats['completed'] += 1
+        self._maybe_flush()
+
+    @staticmethod
+    def finding_key(finding: Dict[str, Any]) -> str:
+        return hashlib.sha1(json.dumps(finding, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def add_finding(self, finding: Dict[str, Any]) -> bool:
+        """Store a finding; False when the same finding was already stored (e.g. before a resume)"""
+        data = json.dumps(finding, sort_keys=True, default=str)
+        key = self.finding_key(finding)
+        with self._lock:
+            if key in self._finding_keys:
+                return False
+            self._finding_keys.add(key)
+            self.stats['findings'] += 1
+            self._conn.execute("INSERT OR IGNORE INTO checkpoint_findings VALUES (?, ?, ?)",
+                               (self.target, key, data))
+        return True
+
+    def findings(self) -> List[Dict[str, Any]]:
+        return [json.loads(data) for (data,) in self._conn.execute(
+            "SELECT data FROM checkpoint_findings WHERE target = ? ORDER BY rowid", (self.target,)
+        )]
+
+    def save_state(self, name: str, value: Any):
+        with self._lock:
+            self._pending_state[name] = json.dumps(value, default=str)
+        self._maybe_flush()
+
+    def load_state(self, name: str, default: Any = None) -> Any:
+        with self._lock:
+            if name in self._pending_state:
+                return json.loads(self._pending_state[name])
+            row = self._conn.execute(
+                "SELECT value FROM checkpoint_state WHERE target = ? AND name = ?", (self.target, name)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _maybe_flush(self):
+        if time.time() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            payloads, self._pending = self._pending, []
+            state, self._pending_state = self._pending_state, {}
+            self._last_flush = time.time()
+            if not payloads and not state:
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO checkpoint_payloads VALUES (?, ?, ?, ?, ?)",
+                    [(self.target,) + key for key in payloads]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoint_state VALUES (?, ?, ?)",
+                    [(self.target, name, value) for name, value in state.items()]
+                )
+                self._conn.execute("UPDATE checkpoint_scans SET updated = ? WHERE target = ?",
+                                   (self._last_flush, self.target))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def finish(self):
+        """Flush and mark the scan complete (a later resume only rebuilds the report)"""
+        self.flush()
+        self._conn.execute("UPDATE checkpoint_scans SET status = 'complete', updated = ? WHERE target = ?",
+                           (time.time(), self.target))
+
+    def close(self):
+        self.flush()
+        self._conn.close()
@@ -87,7 +87,41 @@ class Config:
             'analyze_html': True,
             'analyze_scripts': True,
             'analyze_cookies': True,
-            'fingerprint_cms': True
+            'fingerprint_cms': True,
+            'site_wide': True,
+            'saturation': 5
+        },
+        'planning': {
+            'enabled': True
+        },
+        'pipeline': {
+            'enabled': True,  # test forms while the web map crawl is still running
+            'workers': 4,
+            'max_endpoints': 100  # forms (sync scanner) or URLs (async scanner) handed to the testers
+        },
+        'cookies': {
+            'enabled': True,
+            'sample_size': 10,  # fresh sessions opened to measure session id entropy (0 disables sampling)
+            'min_entropy_bits': 64
+        },
+        'subdomains': {
+            'ct_logs': []  # local certificate transparency dumps (JSON lines / CSV, optionally .gz)
+        },
+        'waf_guard': {
+            'enabled': True,
+            'backoff': 1.0,  # seconds between requests after the first block
+            'max_delay': 30.0,
+            'recovery': 0.25,  # seconds removed per normal response
+            'escalate_after': 3,  # blocks before switching to the next payload encoding
+            'give_up_after': 50  # consecutive blocks on the last encoding before skipping the host
+        },
+        'progress': {
+            'interval': 5  # seconds between progress lines with rates and ETA (0 disables)
+        },
+        'budget': {
+            'max_time': None,  # seconds of wall time before the scan stops sending requests
+            'max_requests': None,
+            'max_bytes': None  # response body bytes received
         },
         'reporting': {
             'formats': ['json', 'html', 'pdf'],
@@ -96,8 +130,9 @@ class Config:
             'detailed_mode': True
         },
         'database': {
-            'enabled': True,
+            'enabled': False,  # checkpoint scans to path; --checkpoint / --resume turn it on
             'path': 'scans.db',
+            'checkpoint_interval': 5,  # seconds between flushes of completed payloads (--resume)
             'keep_history': True,
             'max_history_days': 90
         },
@@ -195,7 +230,8 @@ class Config:
                 'threads': 20,
                 'timeout': 10,
                 'max_depth': 2,
-                'max_payloads_multiplier': 0.3
+                'max_payloads_multiplier': 0.3,
+                'budget': {'max_time': 600}
             },
             'normal': {
                 'threads': 10,
@@ -230,5 +266,10 @@ class Config:
                 for vuln in self.config['vulnerabilities'].values():
                     if 'max_payloads' in vuln:
                         vuln['max_payloads'] = int(vuln['max_payloads'] * value)
+            elif key == 'budget':
+                # Only caps the user left unset
+                for cap, limit in value.items():
+                    if self.get(f'budget.{cap}') is None:
+                        self.set(f'budget.{cap}', limit)
             else:
                 self.set(f'scanner.{key}', value)
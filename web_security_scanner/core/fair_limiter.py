@@ -0,0 +1,78 @@
+"""
+Fair concurrency limiter
+Global request slots handed out round-robin between scan targets
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Hashable
+
+
+class FairLimiter:
+    """
+    Global cap on in-flight requests shared by several targets.
+
+    A plain semaphore wakes waiters in arrival order, so a target with a big
+    crawl frontier keeps most of the slots. Here every key has its own wait
+    queue and freed slots go to the keys in turn, so each active target gets
+    an equal share whatever its backlog.
+    """
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self.granted: Dict[Hashable, int] = {}
+        self._waiters: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._waiters.values())
+
+    async def acquire(self, key: Hashable):
+        if self.active < self.limit and not self._waiters:
+            self._grant(key)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just before the cancellation landed
+                self.release()
+            else:
+                queue = self._waiters.get(key)
+                if queue and future in queue:
+                    queue.remove(future)
+                    if not queue:
+                        del self._waiters[key]
+            raise
+
+    def release(self):
+        self.active -= 1
+        self._wake()
+
+    def _grant(self, key: Hashable):
+        self.active += 1
+        self.granted[key] = self.granted.get(key, 0) + 1
+
+    def _wake(self):
+        while self.active < self.limit and self._waiters:
+            key, queue = next(iter(self._waiters.items()))
+            future = queue.popleft()
+            # The key goes to the back of the rotation (or leaves it when it has nobody waiting)
+            del self._waiters[key]
+            if queue:
+                self._waiters[key] = queue
+            if future.cancelled():
+                continue
+            self._grant(key)
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable):
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,138 @@
+"""
+Passive analysis bus
+Offers every response the core fetches to passive analyzers, off the request path
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+
+class PassiveAnalyzer(ABC):
+    """
+    A check that only looks at responses the scanner already has.
+
+    scope decides how often an analyzer sees the same site: 'host' runs it on
+    the first matching response per host, 'path' once per host and path
+    (query strings ignored).
+    """
+    name = 'passive'
+    scope = 'path'
+
+    def wants(self, response: Dict[str, Any]) -> bool:
+        """Whether this response is worth analyzing (checked before dedupe)"""
+        return response.get('status_code') == 200
+
+    @abstractmethod
+    def analyze(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Findings for one response, in the testers' vulnerability format"""
+
+
+class PassiveBus:
+    """
+    Fan-out of fetched responses to passive analyzers.
+
+    offer() is called from the request path and never blocks: it only does the
+    per-host/path dedupe and queues the response. A background task runs the
+    analyzers and hands findings to the listeners. drain() waits until every
+    queued response has been analyzed. When the queue is full, responses are
+    dropped (and counted) rather than slowing requests down.
+    """
+    def __init__(self, max_queue: int = 1000):
+        self.analyzers: List[PassiveAnalyzer] = []
+        self.max_queue = max_queue
+        self.stats = {'offered': 0, 'analyzed': 0, 'dropped': 0, 'findings': 0}
+        self._listeners: List[Callable[..., Any]] = []
+        self._seen: Set[Tuple[str, str]] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._logger = logging.getLogger(__name__)
+
+    def register(self, analyzer: PassiveAnalyzer):
+        if self.get(analyzer.name) is None:
+            self.analyzers.append(analyzer)
+
+    def get(self, name: str) -> Optional[PassiveAnalyzer]:
+        return next((analyzer for analyzer in self.analyzers if analyzer.name == name), None)
+
+    def on_finding(self, callback: Callable[..., Any]):
+        """callback(finding=..., analyzer=...) for every finding; may be a coroutine function"""
+        self._listeners.append(callback)
+
+    @staticmethod
+    def dedupe_key(analyzer: PassiveAnalyzer, url: str) -> str:
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        return host if analyzer.scope == 'host' else f"{host}{parsed.path or '/'}"
+
+    def offer(self, method: str, response: Dict[str, Any]):
+        """Queue a response for the analyzers that have not seen its host/path yet"""
+        if not self.analyzers or method.upper() != 'GET' or not response.get('status_code'):
+            return
+        url = response.get('url', '')
+        pending = []
+        for analyzer in self.analyzers:
+            if not analyzer.wants(response):
+                continue
+            key = (analyzer.name, self.dedupe_key(analyzer, url))
+            if key not in self._seen:
+                self._seen.add(key)
+                pending.append(analyzer)
+        if not pending:
+            return
+        self.stats['offered'] += 1
+        try:
+            self._ensure_worker()
+            self._queue.put_nowait((response, pending))
+        except (asyncio.QueueFull, RuntimeError):
+            self.stats['dropped'] += 1
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            response, analyzers = await self._queue.get()
+            try:
+                for analyzer in analyzers:
+                    try:
+                        findings = analyzer.analyze(response)
+                    except Exception as e:
+                        self._logger.debug(f"Passive analyzer {analyzer.name} failed on {response.get('url')}: {e}")
+                        continue
+                    for finding in findings:
+                        self.stats['findings'] += 1
+                        await self._notify(finding, analyzer)
+                self.stats['analyzed'] += 1
+            finally:
+                self._queue.task_done()
+
+    async def _notify(self, finding: Dict[str, Any], analyzer: PassiveAnalyzer):
+        for callback in self._listeners:
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(finding=finding, analyzer=analyzer.name)
+                else:
+                    callback(finding=finding, analyzer=analyzer.name)
+            except Exception as e:
+                self._logger.error(f"Error in passive finding listener: {e}")
+
+    async def drain(self):
+        """Wait until every queued response has been analyzed"""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def close(self):
+        await self.drain()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            self._worker = None
@@ -0,0 +1,141 @@
+"""
+Scan progress
+Planned and completed (tester, endpoint, payload) jobs, request rates and ETA of a running scan
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+class ScanProgress:
+    """
+    Job counters of one scan.
+
+    A job is one payload sent by one tester to one endpoint parameter. The
+    scanner opens a unit with start() when a tester begins on an endpoint
+    (its planned jobs: payloads x parameters, at least one), testers count
+    finished payloads with job_done() and finish() settles whatever the unit
+    skipped (the rest of a parameter found vulnerable, endpoints without
+    parameters); when the scan budget ran out those jobs are counted as
+    skipped instead, i.e. not covered. Counting is a dict lookup and two
+    increments under a lock, no event per job: snapshot() is what the
+    periodic progress event carries.
+    The crawl keeps adding endpoints, so the ETA covers the jobs known so far.
+    """
+    def __init__(self, window: float = 10.0):
+        self.window = window
+        self.started = time.time()
+        self._lock = threading.Lock()
+        # tester -> [planned, done, skipped]; (tester, key) -> [planned, done] for units still running
+        self._testers: Dict[str, list] = {}
+        self._units: Dict[Tuple[str, str], list] = {}
+        # (time, requests, jobs done) of recent snapshots, for the rates
+        self._samples: Deque[Tuple[float, int, int]] = deque()
+
+    def start(self, tester: str, key: str, jobs: int):
+        jobs = max(1, jobs)
+        with self._lock:
+            unit = self._units.setdefault((tester, key), [0, 0])
+            unit[0] += jobs
+            self._testers.setdefault(tester, [0, 0, 0])[0] += jobs
+
+    def job_done(self, tester: str, key: str):
+        with self._lock:
+            unit = self._units.get((tester, key))
+            if unit is None or unit[1] >= unit[0]:
+                return
+            unit[1] += 1
+            self._testers[tester][1] += 1
+
+    def finish(self, tester: str, key: str, skipped: bool = False):
+        """
+        Close the unit. Its jobs not sent (already checked, pruned by a
+        finding) count as done, or as skipped when the budget stopped it.
+        """
+        with self._lock:
+            unit = self._units.pop((tester, key), None)
+            if unit is not None:
+                self._testers[tester][2 if skipped else 1] += unit[0] - unit[1]
+
+    def skipped(self) -> Dict[str, int]:
+        """Jobs per tester the scan did not cover (budget), units still open included"""
+        with self._lock:
+            skipped = {name: counts[2] for name, counts in self._testers.items()}
+            for (name, _), (planned, done) in self._units.items():
+                skipped[name] += planned - done
+        return {name: jobs for name, jobs in skipped.items() if jobs}
+
+    @property
+    def planned(self) -> int:
+        with self._lock:
+            return sum(counts[0] for counts in self._testers.values())
+
+    @property
+    def done(self) -> int:
+        with self._lock:
+            return sum(counts[1] for counts in self._testers.values())
+
+    def snapshot(self, requests: int = 0, bytes_received: int = 0) -> Dict[str, Any]:
+        """
+        Totals, rates over the last `window` seconds and per-tester breakdown.
+        requests/bytes_received come from the core's counters.
+        """
+        now = time.time()
+        with self._lock:
+            testers = {name: {'planned': planned, 'done': done, 'skipped': skipped,
+                              'percent': _percent(done + skipped, planned)}
+                       for name, (planned, done, skipped) in sorted(self._testers.items())}
+            running = len(self._units)
+        planned = sum(tester['planned'] for tester in testers.values())
+        done = sum(tester['done'] for tester in testers.values())
+        skipped = sum(tester['skipped'] for tester in testers.values())
+
+        self._samples.append((now, requests, done))
+        while len(self._samples) > 2 and now - self._samples[1][0] >= self.window:
+            self._samples.popleft()
+        first_time, first_requests, first_done = self._samples[0]
+        if now - first_time < 1.0:
+            # Too little history: average since the scan started
+            first_time, first_requests, first_done = self.started, 0, 0
+        span = max(now - first_time, 1e-6)
+        requests_per_sec = (requests - first_requests) / span
+        jobs_per_sec = (done - first_done) / span
+
+        remaining = planned - done - skipped
+        eta = remaining / jobs_per_sec if jobs_per_sec > 0 else None
+        return {
+            'elapsed': round(now - self.started, 1),
+            'jobs_planned': planned,
+            'jobs_done': done,
+            'jobs_skipped': skipped,
+            'percent': _percent(done + skipped, planned),
+            'running': running,
+            'requests': requests,
+            'bytes': bytes_received,
+            'requests_per_sec': round(requests_per_sec, 1),
+            'jobs_per_sec': round(jobs_per_sec, 1),
+            'eta': round(eta, 1) if eta is not None else (0.0 if not remaining else None),
+            'testers': testers,
+        }
+
+
+def _percent(done: int, planned: int) -> float:
+    return round(100.0 * done / planned, 1) if planned else 0.0
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '?'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def progress_line(snapshot: Dict[str, Any]) -> str:
+    """'42.0% (120/286 jobs) | 35.2 req/s, 9.8 jobs/s | ETA 0:17'"""
+    skipped = f", {snapshot['jobs_skipped']} skipped" if snapshot.get('jobs_skipped') else ''
+    return (f"{snapshot['percent']:.1f}% ({snapshot['jobs_done']}/{snapshot['jobs_planned']} jobs{skipped}) | "
+            f"{snapshot['requests_per_sec']} req/s, {snapshot['jobs_per_sec']} jobs/s | "
+            f"ETA {format_duration(snapshot['eta'])}")
@@ -10,9 +10,22 @@ from typing import Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor
 from threading import Lock, Semaphore
 
+from .budget import ScanBudget
+from .waf_guard import WafGuard
+
 requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
 
 
+def raw_set_cookies(response) -> list:
+    """Every Set-Cookie header of a response and its redirects (requests merges them in response.headers)"""
+    values = []
+    for hop in [*getattr(response, 'history', []), response]:
+        raw_headers = getattr(getattr(hop, 'raw', None), 'headers', None)
+        if raw_headers is not None and hasattr(raw_headers, 'getlist'):
+            values.extend(raw_headers.getlist('Set-Cookie'))
+    return values
+
+
 class ResponseCache:
     """Thread-safe response cache with TTL support"""
     
@@ -60,7 +73,8 @@ class ResponseCache:
                     'headers': dict(response.headers),
                     'url': response.url,
                     'elapsed': response.elapsed.total_seconds(),
-                    'cookies': response.cookies.get_dict()
+                    'cookies': response.cookies.get_dict(),
+                    'set_cookies': raw_set_cookies(response)
                 }
                 self.access_times[key] = time.time()
     
@@ -138,11 +152,19 @@ class ScannerCore:
             requests_per_second=config.get('scanner.rate_limit')
         )
         
+        # WAF feedback loop: per-host backoff and payload encoding
+        self.waf_guard = WafGuard.from_config(config.get('waf_guard', {}))
+        
+        # Wall time, request and byte caps (budget section); requests past them are not sent
+        self.budget = ScanBudget.from_config(config.get('budget', {}))
+        
         # Statistics
         self.stats = {
             'total_requests': 0,
             'cached_responses': 0,
             'failed_requests': 0,
+            'blocked_requests': 0,
+            'bytes_received': 0,
             'total_time': 0
         }
         self.stats_lock = Lock()
@@ -154,7 +176,9 @@ class ScannerCore:
         data: dict = None,
         headers: dict = None,
         allow_redirects: bool = True,
-        timeout: int = None
+        timeout: int = None,
+        stateless: bool = False,
+        probe: bool = False
     ) -> Optional[requests.Response]:
         """
         Make HTTP request with caching, rate limiting, and retry logic
@@ -166,12 +190,14 @@ class ScannerCore:
             headers: Additional headers
             allow_redirects: Follow redirects
             timeout: Request timeout
+            stateless: Send no session cookies and skip the cache (fresh server session)
+            probe: The request carries a test payload (WAF guard heuristics)
             
         Returns:
             Response object or None if failed
         """
         # Check cache first
-        if self.cache and method.upper() == 'GET':
+        if self.cache and method.upper() == 'GET' and not stateless:
             cached = self.cache.get(url, method, data or {})
             if cached:
                 with self.stats_lock:
@@ -180,9 +206,23 @@ class ScannerCore:
                 self.logger.debug(f"Cache hit: {url}")
                 return self._create_mock_response(cached)
         
-        # Rate limiting
+        if self.waf_guard.gave_up(url):
+            self.logger.debug(f"Skipping request, host keeps blocking: {url}")
+            return None
+        
+        # Per-host backoff while a WAF is blocking, then the global rate limit
+        wait = self.waf_guard.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
         self.rate_limiter.wait()
         
+        if self.budget is not None:
+            with self.stats_lock:
+                sent, received = self.stats['total_requests'], self.stats['bytes_received']
+            if not self.budget.check(sent, received):
+                self.logger.debug(f"Scan budget exhausted ({self.budget.exhausted_by}), not sending: {url}")
+                return None
+        
         # Prepare request parameters
         timeout = timeout or self.config.get('scanner.timeout')
         verify_ssl = self.config.get('scanner.verify_ssl')
@@ -194,6 +234,8 @@ class ScannerCore:
         if headers:
             req_headers.update(headers)
         
+        client = requests if stateless else self.session
+        
         # Retry logic
         for attempt in range(max_retries):
             try:
@@ -201,7 +243,7 @@ class ScannerCore:
                 
                 # Make request
                 if method.upper() == 'POST':
-                    response = self.session.post(
+                    response = client.post(
                         url,
                         data=data,
                         headers=req_headers,
@@ -210,7 +252,7 @@ class ScannerCore:
                         allow_redirects=allow_redirects
                     )
                 else:
-                    response = self.session.get(
+                    response = client.get(
                         url,
                         params=data,
                         headers=req_headers,
@@ -225,12 +267,21 @@ class ScannerCore:
                 with self.stats_lock:
                     self.stats['total_requests'] += 1
                     self.stats['total_time'] += elapsed
+                    self.stats['bytes_received'] += len(response.content)
                 
                 # Log request
                 self.logger.request(method, url, response.status_code)
                 
+                verdict = self.waf_guard.observe(url, response.status_code, response.headers, response.text, probe)
+                response.waf_blocked = verdict.blocked
+                response.set_cookies = raw_set_cookies(response)
+                if verdict.blocked:
+                    with self.stats_lock:
+                        self.stats['blocked_requests'] += 1
+                    self.logger.debug(f"Blocked by WAF ({verdict.reason}): {url}")
+                
                 # Cache successful responses
-                if self.cache and method.upper() == 'GET' and response.status_code < 500:
+                if self.cache and method.upper() == 'GET' and response.status_code < 500 and not verdict.blocked and not stateless:
                     self.cache.put(url, method, data or {}, response)
                 
                 return response
@@ -267,6 +318,8 @@ class ScannerCore:
                 self.url = data['url']
                 self.elapsed = type('obj', (object,), {'total_seconds': lambda: data['elapsed']})()
                 self.cookies = data.get('cookies', {})
+                self.set_cookies = data.get('set_cookies', [])
+                self.waf_blocked = False
         
         return MockResponse(cached_data)
     
@@ -290,6 +343,8 @@ class ScannerCore:
                 'total_requests': 0,
                 'cached_responses': 0,
                 'failed_requests': 0,
+                'blocked_requests': 0,
+                'bytes_received': 0,
                 'total_time': 0
             }
     
@@ -1,5 +1,6 @@
 import aiohttp
 import asyncio
+import contextlib
 import time
 import hashlib
 import logging
@@ -7,6 +8,11 @@ from typing import Optional, Dict, Any, Union
 from dataclasses import dataclass, field
 from threading import Lock
 
+from .budget import ScanBudget
+from .fair_limiter import FairLimiter
+from .passive_bus import PassiveBus
+from .waf_guard import WafGuard
+
 @dataclass
 class ScanConfig:
     max_concurrency: int = 50
@@ -15,6 +21,12 @@ class ScanConfig:
     proxy: Optional[str] = None
     rate_limit: float = 0.0  # seconds between requests
     headers: Dict[str, str] = field(default_factory=dict)
+    waf_guard: Dict[str, Any] = field(default_factory=dict)  # WafGuard options, {'enabled': False} to disable
+    cookie_policy: str = "keep"  # keep: session jar | ignore: never send cookies back | unsafe: also keep cookies of IP hosts
+
+@contextlib.asynccontextmanager
+async def _no_limit():
+    yield
 
 class AsyncResponseCache:
     """Thread-safe and Async-friendly response cache."""
@@ -67,45 +79,107 @@ class AsyncScannerCore:
     """
     Core scanner functionality using asyncio and aiohttp.
     Handles connection pooling, rate limiting, and caching.
+    Batch scans pass a shared connector (one pool for every target) and a
+    FairLimiter; max_concurrency then caps this target only.
     """
-    def __init__(self, config: ScanConfig):
+    def __init__(self, config: ScanConfig, connector: Optional[aiohttp.BaseConnector] = None,
+                 limiter: Optional[FairLimiter] = None, limiter_key: Optional[str] = None):
         self.config = config
+        self._connector = connector
+        self._limiter = limiter
+        self._limiter_key = limiter_key
         self.session: Optional[aiohttp.ClientSession] = None
+        self._stateless_session: Optional[aiohttp.ClientSession] = None
         self.cache = AsyncResponseCache()
         self._semaphore = asyncio.Semaphore(config.max_concurrency)
         self._last_request_time = 0
+        # Requests actually sent (cache hits excluded) and body bytes received, read by progress reports
+        self.stats = {'requests': 0, 'bytes': 0, 'failed': 0}
+        # ScanBudget set by the scanner; once a cap is reached no more requests are sent
+        self.budget: Optional[ScanBudget] = None
+        self.waf_guard = WafGuard.from_config(config.waf_guard)
+        # Passive analyzers see every fetched response without extra requests
+        self.passive_bus = PassiveBus()
         self._logger = logging.getLogger(__name__)
 
     async def start(self):
         """Initialize the aiohttp session."""
         if not self.session:
-            connector = aiohttp.TCPConnector(limit=self.config.max_concurrency, ssl=False)
+            connector = self._connector or aiohttp.TCPConnector(limit=self.config.max_concurrency, ssl=False)
             headers = {"User-Agent": self.config.user_agent}
             headers.update(self.config.headers)
-            self.session = aiohttp.ClientSession(connector=connector, headers=headers)
+            self.session = aiohttp.ClientSession(connector=connector, connector_owner=self._connector is None,
+                                                 headers=headers,
+                                                 cookie_jar=self._cookie_jar(self.config.cookie_policy))
+
+    def _cookie_jar(self, policy: str) -> aiohttp.abc.AbstractCookieJar:
+        if policy == 'ignore':
+            return aiohttp.DummyCookieJar()
+        # aiohttp drops cookies set by bare IP hosts unless the jar is unsafe
+        return aiohttp.CookieJar(unsafe=policy == 'unsafe')
+
+    def _session_for(self, stateless: bool) -> aiohttp.ClientSession:
+        """The shared session, or a cookie-less one on the same connection pool for fresh-session requests."""
+        if not stateless:
+            return self.session
+        if not self._stateless_session:
+            self._stateless_session = aiohttp.ClientSession(connector=self.session.connector, connector_owner=False,
+                                                            headers=self.session.headers,
+                                                            cookie_jar=aiohttp.DummyCookieJar())
+        return self._stateless_session
 
     async def close(self):
-        """Close the aiohttp session."""
+        """Finish passive analysis and close the aiohttp session."""
+        await self.passive_bus.close()
+        if self._stateless_session:
+            await self._stateless_session.close()
+            self._stateless_session = None
         if self.session:
             await self.session.close()
             self.session = None
 
+    def _global_slot(self):
+        """Slot of the batch-wide limiter, or a no-op when scanning a single target."""
+        if self._limiter is None:
+            return _no_limit()
+        return self._limiter.slot(self._limiter_key)
+
     async def request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
         """
         Execute an HTTP request with caching and rate limiting.
         Returns a dictionary with status, text, headers, etc.
+        With raw=True the undecoded body is also returned as 'content' (bytes).
+        With stateless=True no cookies are sent and the cache is skipped, so the
+        server opens a fresh session (used to sample session ids).
+        Every Set-Cookie header, redirects included, is kept in 'set_cookies'.
+        Responses the WAF guard flags carry 'waf_blocked' (and 'waf' when known).
+        Requests refused because the scan budget ran out carry 'budget_exhausted'.
+        probe=True marks a request carrying a test payload, for the WAF guard's heuristics.
         """
         if not self.session:
             await self.start()
 
+        raw = kwargs.pop('raw', False)
+        stateless = kwargs.pop('stateless', False)
+        probe = kwargs.pop('probe', False)
+
         # Check cache
         data = kwargs.get('data') or kwargs.get('json')
-        cached = self.cache.get(url, method, data)
-        if cached:
+        cached = None if stateless else self.cache.get(url, method, data)
+        if cached and (not raw or 'content' in cached):
             return cached
 
+        if self.waf_guard.gave_up(url):
+            return {'status_code': 0, 'text': '', 'headers': {}, 'url': url, 'error': 'blocked by WAF',
+                    'waf_blocked': True}
+
+        # Per-host backoff while a WAF is blocking; waits outside the semaphore so other hosts keep going
+        wait = self.waf_guard.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
         # Rate limiting
-        async with self._semaphore:
+        async with self._semaphore, self._global_slot():
             if self.config.rate_limit > 0:
                 now = time.time()
                 elapsed = now - self._last_request_time
@@ -113,25 +187,48 @@ class AsyncScannerCore:
                     await asyncio.sleep(self.config.rate_limit - elapsed)
                 self._last_request_time = time.time()
 
+            if self.budget is not None and not self.budget.check(self.stats['requests'], self.stats['bytes']):
+                return {'status_code': 0, 'text': '', 'headers': {}, 'url': url, 'error': 'scan budget exhausted',
+                        'budget_exhausted': True}
+
             try:
                 timeout = aiohttp.ClientTimeout(total=self.config.timeout)
-                async with self.session.request(method, url, timeout=timeout, proxy=self.config.proxy, **kwargs) as response:
-                    # Read content immediately to release connection
-                    text = await response.text(errors='ignore')
+                self.stats['requests'] += 1
+                async with self._session_for(stateless).request(method, url, timeout=timeout, proxy=self.config.proxy, **kwargs) as response:
+                    # Read content immediately to release connection (text() reuses the body read here)
+                    content = await response.read()
+                    self.stats['bytes'] += len(content)
+                    if raw:
+                        text = content.decode(response.charset or 'utf-8', errors='ignore')
+                    else:
+                        text = await response.text(errors='ignore')
                     result = {
                         'status_code': response.status,
                         'text': text,
                         'headers': dict(response.headers),
                         'url': str(response.url),
+                        'set_cookies': [value for hop in (*response.history, response)
+                                        for value in hop.headers.getall('Set-Cookie', [])],
                         'elapsed': 0 # TODO: Calculate elapsed
                     }
+                    if raw:
+                        result['content'] = content
+
+                    verdict = self.waf_guard.observe(url, response.status, result['headers'], text, probe)
+                    if verdict.blocked:
+                        result['waf_blocked'] = True
+                        result['waf'] = verdict.waf
+                        self._logger.debug(f"Blocked by WAF ({verdict.reason}): {url}")
                     
                     # Cache successful GET requests
-                    if method.upper() == 'GET' and response.status == 200:
+                    if method.upper() == 'GET' and response.status == 200 and not verdict.blocked and not stateless:
                         self.cache.put(url, method, data, result)
+                    if not verdict.blocked:
+                        self.passive_bus.offer(method, result)
                     
                     return result
             except Exception as e:
+                self.stats['failed'] += 1
                 self._logger.debug(f"Request failed: {url} - {e}")
                 return {
                     'status_code': 0,
@@ -0,0 +1,286 @@
+"""
+WAF guard
+Detects block responses per host, backs off the request rate and escalates payload encoding
+"""
+
+import hashlib
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional, Set
+from urllib.parse import quote, urlparse
+
+MASTER_PAYLOADS = Path(__file__).resolve().parent.parent / 'PAYLOAD' / 'payloads_master.json'
+
+# Statuses WAFs answer with when they drop a request (429 is plain rate limiting)
+BLOCK_STATUSES = {403, 406, 419, 429, 501, 503}
+RATE_LIMIT_STATUSES = {429}
+
+# (WAF, body pattern of its block / challenge page, headers only sent on blocked requests)
+WAF_SIGNATURES = [
+    ('Cloudflare', re.compile(r'attention required! \| cloudflare|cf-error-details|cf-chl-|<title>just a moment\.\.\.</title>', re.I),
+     {'cf-mitigated'}),
+    ('Akamai', re.compile(r'reference #\d+\.[0-9a-f]+\.\d+\.[0-9a-f]+', re.I), set()),
+    ('Imperva', re.compile(r'incapsula incident id|_incapsula_resource', re.I), set()),
+    ('Sucuri', re.compile(r'sucuri website firewall|access denied - sucuri', re.I), {'x-sucuri-block'}),
+    ('ModSecurity', re.compile(r'mod_security|modsecurity|not acceptable!.{0,200}appropriate representation', re.I | re.S),
+     set()),
+    ('AWS WAF', re.compile(r'request blocked\. we can\'t connect to the server', re.I), {'x-amzn-waf-action'}),
+    ('F5 BIG-IP ASM', re.compile(r'the requested url was rejected\. please consult with your administrator', re.I),
+     set()),
+    ('Barracuda', re.compile(r'barracuda networks|you have been blocked.{0,100}barracuda', re.I | re.S), set()),
+    ('Wordfence', re.compile(r'generated by wordfence|your access to this site has been limited', re.I), set()),
+]
+GENERIC_BLOCK = re.compile(
+    r'access denied|request (?:has been )?(?:blocked|rejected)|web application firewall|'
+    r'security (?:policy|rules) (?:violation|blocked)|captcha', re.I
+)
+
+# Encoding ladder; a host climbs one step every `escalate_after` blocks
+ENCODINGS = ['raw', 'urlencoded', 'double_urlencoded', 'html']
+
+_master_variants: Optional[Dict[str, Dict[str, str]]] = None
+
+
+def master_variants() -> Dict[str, Dict[str, str]]:
+    """Raw payload -> its encoded forms ('urlencoded', 'html', ...) from payloads_master.json"""
+    global _master_variants
+    if _master_variants is None:
+        _master_variants = {}
+        try:
+            with open(MASTER_PAYLOADS, 'r', encoding='utf-8') as f:
+                master = json.load(f)
+        except Exception:
+            master = {}
+        for family in master.values():
+            for payload in family.get('payloads', []):
+                content = payload.get('content', {})
+                raw = content.get('raw')
+                if not isinstance(raw, str):
+                    continue
+                variants = {name: value for name, value in content.items()
+                            if isinstance(value, str) and name != 'raw' and value != raw}
+                # The master file spells percent-encoded forms both ways
+                if 'encoded' in variants:
+                    variants.setdefault('urlencoded', variants.pop('encoded'))
+                if variants:
+                    _master_variants[raw] = variants
+    return _master_variants
+
+
+def encode_payload(payload: str, encoding: str) -> str:
+    """Encoded form of a payload, preferring the hand-written variant in payloads_master.json"""
+    if encoding == 'raw':
+        return payload
+    variants = master_variants().get(payload, {})
+    if encoding == 'urlencoded':
+        return variants.get('urlencoded') or quote(payload, safe='')
+    if encoding == 'double_urlencoded':
+        return quote(variants.get('urlencoded') or quote(payload, safe=''), safe='')
+    if encoding == 'html':
+        return variants.get('html') or ''.join(f'&#{ord(c)};' if c in '<>"\'()' else c for c in payload)
+    raise ValueError(f"Unknown payload encoding: {encoding}")
+
+
+def _endpoint(url: str) -> str:
+    """scheme://host/path of a url, without query or fragment"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc.lower()}{parsed.path or '/'}"
+
+
+@dataclass
+class Verdict:
+    blocked: bool = False
+    waf: str = ''
+    reason: str = ''
+
+
+@dataclass
+class HostState:
+    delay: float = 0.0
+    next_slot: float = 0.0
+    baseline_status: Optional[int] = None
+    waf: str = ''
+    blocks: int = 0
+    streak: int = 0
+    escalation_blocks: int = 0
+    encoding_level: int = 0
+    block_pages: Set[str] = field(default_factory=set)
+    suspect_pages: Dict[str, Set[str]] = field(default_factory=dict)
+    # Status of each path (scheme://host/path) requested without a payload
+    endpoint_status: Dict[str, int] = field(default_factory=dict)
+
+
+class WafGuard:
+    """
+    Feedback loop between responses and the request path.
+
+    Every response is inspected for a known WAF block page or a WAF-only
+    header. Responses to payload-bearing requests (probe=True) are also judged
+    against the same path without a payload: a generic block page, or the same
+    error page on several paths that answered normally (baseline drift), counts
+    as a block. Paths that fail without a payload (a forbidden directory, a
+    HEAD answered 501) never do. Blocks back the host off multiplicatively, normal
+    answers recover additively (AIMD), and repeated blocks move the host up the
+    payload encoding ladder. Thread-safe, so the sync and async cores share it.
+    """
+    def __init__(self, enabled: bool = True, backoff: float = 1.0, max_delay: float = 30.0,
+                 recovery: float = 0.25, escalate_after: int = 3, give_up_after: int = 50,
+                 drift_threshold: int = 3):
+        self.enabled = enabled
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.recovery = recovery
+        self.escalate_after = escalate_after
+        self.give_up_after = give_up_after
+        self.drift_threshold = drift_threshold
+        self.hosts: Dict[str, HostState] = {}
+        self.lock = Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> 'WafGuard':
+        config = dict(config or {})
+        return cls(**{key: value for key, value in config.items()
+                      if key in ('enabled', 'backoff', 'max_delay', 'recovery', 'escalate_after',
+                                 'give_up_after', 'drift_threshold')})
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _state(self, host: str) -> HostState:
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState()
+        return state
+
+    def note_waf(self, url: str, waf: str):
+        """Seed the guard with a WAF identified by technology detection"""
+        with self.lock:
+            state = self._state(self.host_of(url))
+            state.waf = state.waf or waf
+
+    def reserve(self, url: str) -> float:
+        """Seconds to wait before sending a request to the url's host; books the slot"""
+        if not self.enabled:
+            return 0.0
+        with self.lock:
+            state = self._state(self.host_of(url))
+            if state.delay <= 0:
+                return 0.0
+            now = time.monotonic()
+            start = max(now, state.next_slot)
+            state.next_slot = start + state.delay
+            return start - now
+
+    def gave_up(self, url: str) -> bool:
+        """True once a host kept blocking after the last encoding step"""
+        if not self.enabled or not self.give_up_after:
+            return False
+        with self.lock:
+            state = self.hosts.get(self.host_of(url))
+            return bool(state and state.streak >= self.give_up_after
+                        and state.encoding_level == len(ENCODINGS) - 1)
+
+    def observe(self, url: str, status: int, headers: dict, text: str, probe: bool = False) -> Verdict:
+        """
+        Inspect a response and update the host's delay and encoding.
+        probe: the request carried a test payload.
+        """
+        if not self.enabled or not status:
+            return Verdict()
+        headers = {str(name).lower(): str(value) for name, value in (headers or {}).items()}
+        with self.lock:
+            state = self._state(self.host_of(url))
+            verdict = self._inspect(state, url, status, headers, text or '', probe)
+            if verdict.blocked:
+                self._on_block(state, verdict, headers)
+            else:
+                state.streak = 0
+                state.delay = max(0.0, state.delay - self.recovery)
+                if not probe:
+                    state.endpoint_status[_endpoint(url)] = status
+                    if state.baseline_status is None and status < 400:
+                        state.baseline_status = status
+            return verdict
+
+    def _inspect(self, state: HostState, url: str, status: int, headers: Dict[str, str], text: str,
+                 probe: bool) -> Verdict:
+        sample = text[:20000]
+        for waf, body, block_headers in WAF_SIGNATURES:
+            if block_headers & headers.keys():
+                return Verdict(True, waf, 'block header')
+            if status in BLOCK_STATUSES and body.search(sample):
+                return Verdict(True, waf, f'{waf} block page')
+        if status in RATE_LIMIT_STATUSES:
+            return Verdict(True, state.waf, 'rate limited')
+
+        if status not in BLOCK_STATUSES:
+            return Verdict()
+        # The same path without a payload: an error there says nothing about a WAF
+        baseline = state.endpoint_status.get(_endpoint(url))
+        if baseline is not None and baseline >= 400:
+            return Verdict()
+        page = hashlib.md5(re.sub(r'\d+', '', sample).encode('utf-8', 'ignore')).hexdigest()
+        if page in state.block_pages and (probe or baseline is not None):
+            return Verdict(True, state.waf, 'known block page')
+        if not probe:
+            return Verdict()
+        reference = baseline if baseline is not None else state.baseline_status
+        if GENERIC_BLOCK.search(sample) and (state.waf or reference is not None):
+            state.block_pages.add(page)
+            return Verdict(True, state.waf, 'block page')
+        # Baseline drift: payloads get the same error page on several URLs that answered normally without
+        if reference is not None:
+            urls = state.suspect_pages.setdefault(page, set())
+            urls.add(url)
+            if len(urls) >= self.drift_threshold:
+                state.block_pages.add(page)
+                return Verdict(True, state.waf, f'status {reference} -> {status}')
+        return Verdict()
+
+    def _on_block(self, state: HostState, verdict: Verdict, headers: Dict[str, str]):
+        state.blocks += 1
+        state.streak += 1
+        state.waf = state.waf or verdict.waf
+        delay = max(self.backoff, state.delay * 2)
+        retry_after = headers.get('retry-after', '')
+        if retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        state.delay = min(self.max_delay, delay)
+        # Rate limiting is about volume, not content: slow down but keep the encoding
+        if verdict.reason == 'rate limited':
+            return
+        state.escalation_blocks += 1
+        if state.escalation_blocks >= self.escalate_after and state.encoding_level < len(ENCODINGS) - 1:
+            state.encoding_level += 1
+            state.escalation_blocks = 0
+
+    def encoding(self, url: str) -> str:
+        """Payload encoding testers should use against the url's host"""
+        if not self.enabled:
+            return 'raw'
+        with self.lock:
+            state = self.hosts.get(self.host_of(url))
+            return ENCODINGS[state.encoding_level] if state else 'raw'
+
+    def adapt(self, url: str, payload: str) -> str:
+        """Payload in the encoding currently in use for the url's host"""
+        return encode_payload(payload, self.encoding(url))
+
+    def waf_active(self, url: str) -> bool:
+        with self.lock:
+            state = self.hosts.get(self.host_of(url))
+            return bool(state and state.blocks)
+
+    def report(self) -> Dict[str, dict]:
+        """Per-host WAF, block count, current delay and encoding"""
+        with self.lock:
+            return {
+                host: {'waf': state.waf, 'blocks': state.blocks, 'delay': round(state.delay, 2),
+                       'encoding': ENCODINGS[state.encoding_level]}
+                for host, state in self.hosts.items() if state.blocks or state.waf
+            }
@@ -1,7 +1,9 @@
-from typing import Callable, Dict, List, Any, Awaitable, Union
+from typing import Callable, Dict, List, Any, Awaitable, Deque, Hashable, Optional, Union
+from collections import deque
 from enum import Enum, auto
 import asyncio
 import logging
+import time
 
 class ScanEventType(Enum):
     SCAN_START = auto()
@@ -10,50 +12,271 @@ class ScanEventType(Enum):
     SCAN_COMPLETE = auto()
     ERROR = auto()
     LOG_MESSAGE = auto()
+    CONTENT_DISCOVERED = auto()
+    ENDPOINT_DISCOVERED = auto()
+
+# Droppable chatter: a full queue loses the oldest log line, progress only matters in its latest state
+LOSSY_EVENTS = (ScanEventType.LOG_MESSAGE, ScanEventType.PROGRESS_UPDATE)
+
+
+class _Subscriber:
+    """One listener: its bounded queue, the dispatcher task draining it and delivery metrics."""
+    def __init__(self, callback: Callable[..., Any], max_queue: int, batch: bool):
+        self.callback = callback
+        self.name = getattr(callback, '__qualname__', repr(callback))
+        self.max_queue = max(1, max_queue)
+        self.batch = batch
+        self.is_async = asyncio.iscoroutinefunction(callback)
+        # Entries are [event_type, kwargs, enqueued_at]
+        self.queue: Deque[list] = deque()
+        # Pending PROGRESS_UPDATE entry per target, merged in place by newer updates
+        self.progress: Dict[Hashable, list] = {}
+        self.stats = {'delivered': 0, 'dropped': 0, 'merged': 0, 'errors': 0, 'max_lag': 0.0}
+        self.task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.ready: Optional[asyncio.Event] = None
+        self.space: Optional[asyncio.Event] = None
+        self.idle: Optional[asyncio.Event] = None
+
+    @property
+    def full(self) -> bool:
+        return len(self.queue) >= self.max_queue
+
+    def lag(self) -> float:
+        """Age of the oldest undelivered event, in seconds."""
+        return time.time() - self.queue[0][2] if self.queue else 0.0
+
+    def offer(self, event_type: ScanEventType, kwargs: Dict[str, Any], force: bool = False) -> bool:
+        """Queue an event applying the merge/drop policies; False when it must wait for space."""
+        if event_type is ScanEventType.PROGRESS_UPDATE:
+            key = kwargs.get('target')
+            pending = self.progress.get(key)
+            if pending is not None:
+                pending[1] = kwargs
+                self.stats['merged'] += 1
+                return True
+        if self.full and not self._make_room(event_type) and not force:
+            if event_type is ScanEventType.LOG_MESSAGE:
+                self.stats['dropped'] += 1
+                return True
+            if event_type is not ScanEventType.PROGRESS_UPDATE:
+                return False
+            # Nothing lossy left to evict: the latest progress still gets in, at most one entry per target
+        entry = [event_type, kwargs, time.time()]
+        self.queue.append(entry)
+        if event_type is ScanEventType.PROGRESS_UPDATE:
+            self.progress[kwargs.get('target')] = entry
+        if self.ready is not None:
+            self.ready.set()
+            self.idle.clear()
+        return True
+
+    def _make_room(self, event_type: ScanEventType) -> bool:
+        """Drop the oldest pending log line, or for a progress update the oldest pending one, to fit a new event."""
+        for index, entry in enumerate(self.queue):
+            if entry[0] is ScanEventType.LOG_MESSAGE:
+                del self.queue[index]
+                self.stats['dropped'] += 1
+                return True
+        if event_type is ScanEventType.PROGRESS_UPDATE and self.progress:
+            key, stale = next(iter(self.progress.items()))
+            del self.progress[key]
+            self.queue.remove(stale)
+            self.stats['dropped'] += 1
+            return True
+        return False
+
+    def take(self, batch_size: int) -> List[list]:
+        """Next entry, or a run of consecutive log lines for batch subscribers."""
+        entries = [self.queue.popleft()]
+        if self.batch and entries[0][0] is ScanEventType.LOG_MESSAGE:
+            while self.queue and len(entries) < batch_size and self.queue[0][0] is ScanEventType.LOG_MESSAGE:
+                entries.append(self.queue.popleft())
+        for entry in entries:
+            if entry[0] is ScanEventType.PROGRESS_UPDATE and self.progress.get(entry[1].get('target')) is entry:
+                del self.progress[entry[1].get('target')]
+        if self.space is not None and not self.full:
+            self.space.set()
+        return entries
+
 
 class ScanEventEmitter:
     """
     Event emitter for the Web Security Scanner.
     Decouples the scanning logic from the UI/CLI.
+
+    emit() only enqueues: every listener has a bounded queue drained by its
+    own dispatcher task, so a slow listener (GUI, report writer) lags behind
+    instead of stalling the tester that emitted. PROGRESS_UPDATE events still
+    pending are merged into the newest one, a full queue drops its oldest
+    LOG_MESSAGE, and other events wait for space (backpressure). Listeners
+    subscribed with batch=True get consecutive log lines in one call
+    (events=[kwargs, ...]); inline=True runs a cheap listener inside emit()
+    as before. drain() waits until everything queued was delivered and
+    stats() reports each listener's lag.
     """
-    def __init__(self):
-        self._listeners: Dict[ScanEventType, List[Callable[..., Any]]] = {
+    def __init__(self, max_queue: int = 1000, batch_size: int = 100):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self._listeners: Dict[ScanEventType, List[_Subscriber]] = {
             event_type: [] for event_type in ScanEventType
         }
+        self._inline: Dict[ScanEventType, List[Callable[..., Any]]] = {
+            event_type: [] for event_type in ScanEventType
+        }
+        self._subscribers: Dict[Callable[..., Any], _Subscriber] = {}
         self._logger = logging.getLogger(__name__)
 
-    def on(self, event_type: ScanEventType, callback: Callable[..., Any]):
-        """Subscribe to an event."""
-        if event_type not in self._listeners:
-            self._listeners[event_type] = []
-        self._listeners[event_type].append(callback)
+    def on(self, event_type: ScanEventType, callback: Callable[..., Any], inline: bool = False, batch: bool = False):
+        """
+        Subscribe to an event. A callback subscribed to several types shares
+        one queue, so it sees them in emission order.
+        """
+        event_type = self._normalize(event_type)
+        if event_type is None:
+            return
+        if inline:
+            self._inline[event_type].append(callback)
+            return
+        subscriber = self._subscribers.get(callback)
+        if subscriber is None:
+            subscriber = self._subscribers[callback] = _Subscriber(callback, self.max_queue, batch)
+        self._listeners[event_type].append(subscriber)
+
+    def _normalize(self, event_type: Union[ScanEventType, str]) -> Optional[ScanEventType]:
+        """Some testers emit the type by name ("LOG_MESSAGE")."""
+        if isinstance(event_type, ScanEventType):
+            return event_type
+        try:
+            return ScanEventType[str(event_type)]
+        except KeyError:
+            self._logger.debug(f"Unknown event type: {event_type}")
+            return None
 
     async def emit(self, event_type: ScanEventType, **kwargs):
-        """Emit an event asynchronously."""
-        if event_type in self._listeners:
-            for callback in self._listeners[event_type]:
-                try:
-                    if asyncio.iscoroutinefunction(callback):
-                        await callback(**kwargs)
-                    else:
-                        callback(**kwargs)
-                except Exception as e:
-                    self._logger.error(f"Error in event listener for {event_type}: {e}")
+        """Emit an event asynchronously; waits only while a listener's queue is full of events that cannot be dropped."""
+        event_type = self._normalize(event_type)
+        if event_type is None:
+            return
+        for callback in self._inline[event_type]:
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(**kwargs)
+                else:
+                    callback(**kwargs)
+            except Exception as e:
+                self._logger.error(f"Error in event listener for {event_type}: {e}")
+        current = asyncio.current_task()
+        for subscriber in self._listeners[event_type]:
+            self._ensure_dispatcher(subscriber)
+            # A listener emitting into its own full queue would wait for itself
+            while not subscriber.offer(event_type, kwargs, force=current is subscriber.task):
+                subscriber.space.clear()
+                await subscriber.space.wait()
 
     def emit_sync(self, event_type: ScanEventType, **kwargs):
         """Emit an event synchronously (fire and forget for async listeners)."""
-        if event_type in self._listeners:
-            for callback in self._listeners[event_type]:
-                try:
-                    if asyncio.iscoroutinefunction(callback):
-                        # Schedule async callback in the running loop if possible
-                        try:
-                            loop = asyncio.get_running_loop()
-                            loop.create_task(callback(**kwargs))
-                        except RuntimeError:
-                            # No running loop
-                            pass 
-                    else:
-                        callback(**kwargs)
-                except Exception as e:
-                    self._logger.error(f"Error in event listener for {event_type}: {e}")
+        event_type = self._normalize(event_type)
+        if event_type is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        for callback in self._inline[event_type]:
+            self._call_sync(callback, loop, event_type, kwargs)
+        for subscriber in self._listeners[event_type]:
+            if loop is None:
+                # No running loop: nothing could dispatch, deliver right away
+                self._call_sync(subscriber.callback, loop, event_type, kwargs)
+                continue
+            self._ensure_dispatcher(subscriber)
+            # Cannot wait here: events that would need space go over the bound
+            subscriber.offer(event_type, kwargs, force=True)
+
+    def _call_sync(self, callback: Callable[..., Any], loop, event_type: ScanEventType, kwargs: Dict[str, Any]):
+        try:
+            if asyncio.iscoroutinefunction(callback):
+                if loop is not None:
+                    loop.create_task(callback(**kwargs))
+            else:
+                callback(**kwargs)
+        except Exception as e:
+            self._logger.error(f"Error in event listener for {event_type}: {e}")
+
+    def _ensure_dispatcher(self, subscriber: _Subscriber):
+        """Start the listener's dispatcher on the running loop (again, if an earlier scan ran on another loop)."""
+        loop = asyncio.get_running_loop()
+        if subscriber.task is not None and subscriber.loop is loop and not subscriber.task.done():
+            return
+        subscriber.loop = loop
+        subscriber.ready = asyncio.Event()
+        subscriber.space = asyncio.Event()
+        subscriber.idle = asyncio.Event()
+        if subscriber.queue:
+            subscriber.ready.set()
+        else:
+            subscriber.idle.set()
+        subscriber.task = loop.create_task(self._dispatch(subscriber))
+
+    async def _dispatch(self, subscriber: _Subscriber):
+        delivered = 0
+        while True:
+            if not subscriber.queue:
+                subscriber.idle.set()
+                subscriber.ready.clear()
+                await subscriber.ready.wait()
+                continue
+            entries = subscriber.take(self.batch_size)
+            event_type = entries[0][0]
+            lag = time.time() - entries[0][2]
+            subscriber.stats['max_lag'] = max(subscriber.stats['max_lag'], lag)
+            try:
+                if len(entries) > 1 or (subscriber.batch and event_type is ScanEventType.LOG_MESSAGE):
+                    result = subscriber.callback(events=[entry[1] for entry in entries])
+                else:
+                    result = subscriber.callback(**entries[0][1])
+                if subscriber.is_async:
+                    await result
+            except Exception as e:
+                subscriber.stats['errors'] += 1
+                self._logger.error(f"Error in event listener for {event_type}: {e}")
+            subscriber.stats['delivered'] += len(entries)
+            delivered += len(entries)
+            if delivered >= self.batch_size:
+                # Sync listeners never await: let the emitters run between bursts
+                delivered = 0
+                await asyncio.sleep(0)
+
+    async def drain(self):
+        """Wait until every queued event has been delivered."""
+        loop = asyncio.get_running_loop()
+        while True:
+            waiting = []
+            for subscriber in self._subscribers.values():
+                if subscriber.queue:
+                    self._ensure_dispatcher(subscriber)
+                if subscriber.loop is loop and subscriber.task is not None and not subscriber.idle.is_set():
+                    waiting.append(subscriber)
+            if not waiting:
+                return
+            for subscriber in waiting:
+                await subscriber.idle.wait()
+
+    async def close(self):
+        """Deliver what is queued and stop the dispatchers (they restart on the next emit)."""
+        await self.drain()
+        loop = asyncio.get_running_loop()
+        tasks = [s.task for s in self._subscribers.values() if s.task is not None and s.loop is loop]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for subscriber in self._subscribers.values():
+            subscriber.task = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per listener: delivered, dropped, merged, errors, pending events and lag (seconds)."""
+        return {
+            subscriber.name: dict(subscriber.stats, pending=len(subscriber.queue), lag=round(subscriber.lag(), 3))
+            for subscriber in self._subscribers.values()
+        }
@@ -1,8 +1,10 @@
 import asyncio
 import threading
-from typing import Callable, Any
+from typing import Callable, Any, List
 from ...web_security_scanner_async import WebSecurityScanner
+from ...batch_scanner import BatchScanner
 from ...events.event_emitter import ScanEventType
+from ..event_bridge import GuiEventBridge
 
 class ScanController:
     """
@@ -14,6 +16,8 @@ class ScanController:
         self.view_callbacks = {}
         self._scan_thread = None
         self._loop = None
+        # Events cross from the scan thread to the UI thread only through this queue
+        self.bridge = GuiEventBridge()
         
         # Subscribe to scanner events
         self.scanner.event_emitter.on(ScanEventType.SCAN_START, self._on_scan_start)
@@ -21,12 +25,35 @@ class ScanController:
         self.scanner.event_emitter.on(ScanEventType.VULNERABILITY_FOUND, self._on_vulnerability)
         self.scanner.event_emitter.on(ScanEventType.SCAN_COMPLETE, self._on_scan_complete)
         self.scanner.event_emitter.on(ScanEventType.ERROR, self._on_error)
-        self.scanner.event_emitter.on(ScanEventType.LOG_MESSAGE, self._on_log)
+        self.scanner.event_emitter.on(ScanEventType.LOG_MESSAGE, self._on_log, batch=True)
 
     def set_callback(self, event_type: str, callback: Callable[..., Any]):
-        """Register UI callbacks for events."""
+        """
+        Register UI callbacks for events. They run on the UI thread, from
+        dispatch_pending(); on_log receives a list of lines.
+        """
         self.view_callbacks[event_type] = callback
 
+    def dispatch_pending(self, max_events: int = 500) -> int:
+        """Hand queued events to the view callbacks; call from the UI thread only. Returns how many were handled."""
+        events = self.bridge.drain(max_events)
+        lines = []
+        for name, args in events:
+            if name == 'on_log':
+                lines.append(args[0])
+                continue
+            if lines:
+                self._call_view('on_log', lines)
+                lines = []
+            self._call_view(name, *args)
+        if lines:
+            self._call_view('on_log', lines)
+        return len(events)
+
+    def _call_view(self, name: str, *args):
+        if name in self.view_callbacks:
+            self.view_callbacks[name](*args)
+
     def start_scan(self, url: str, profile: str = "balanced"):
         """Start the scan in a separate thread."""
         if self._scan_thread and self._scan_thread.is_alive():
@@ -35,6 +62,24 @@ class ScanController:
         self._scan_thread = threading.Thread(target=self._run_async_scan, args=(url, profile), daemon=True)
         self._scan_thread.start()
 
+    def start_batch(self, urls: List[str], profile: str = "balanced", max_targets: int = 10):
+        """Scan several targets in a separate thread; events arrive on the scanner's emitter."""
+        if self._scan_thread and self._scan_thread.is_alive():
+            return
+
+        batch = BatchScanner(self.scanner.config, max_targets=max_targets,
+                             per_target=self.scanner.core.config.max_concurrency,
+                             event_emitter=self.scanner.event_emitter)
+        self._scan_thread = threading.Thread(target=self._run_async_batch, args=(batch, urls, profile), daemon=True)
+        self._scan_thread.start()
+
+    def _run_async_batch(self, batch: BatchScanner, urls: List[str], profile: str):
+        """Entry point for the batch thread."""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(batch.run(urls, profile))
+        self._loop.close()
+
     def _run_async_scan(self, url: str, profile: str):
         """Entry point for the scan thread."""
         self._loop = asyncio.new_event_loop()
@@ -42,30 +87,25 @@ class ScanController:
         self._loop.run_until_complete(self.scanner.run_scan(url, profile))
         self._loop.close()
 
-    # Event Handlers (called from async loop, need to be thread-safe for UI)
-    # In a real app, we might need to use queue or after() to update UI on main thread.
-    # Here we assume the view handles thread safety or we use a helper.
+    # Event Handlers (called from the scan thread's loop): they only queue for the UI thread
 
     def _on_scan_start(self, **kwargs):
-        if 'on_start' in self.view_callbacks:
-            self.view_callbacks['on_start'](kwargs.get('url'))
+        self.bridge.put('on_start', kwargs.get('url'))
 
     def _on_progress(self, **kwargs):
-        if 'on_progress' in self.view_callbacks:
-            self.view_callbacks['on_progress'](kwargs.get('message'))
+        # Batch events carry target=url: one bar cannot show several scans' percentages
+        progress = None if kwargs.get('target') else kwargs.get('progress')
+        self.bridge.put('on_progress', kwargs.get('message'), progress)
 
     def _on_vulnerability(self, **kwargs):
-        if 'on_vulnerability' in self.view_callbacks:
-            self.view_callbacks['on_vulnerability'](kwargs.get('vulnerability'))
+        self.bridge.put('on_vulnerability', kwargs.get('vulnerability'))
 
     def _on_scan_complete(self, **kwargs):
-        if 'on_complete' in self.view_callbacks:
-            self.view_callbacks['on_complete']()
+        # Single scans report the map file, batches their reports directory
+        self.bridge.put('on_complete', kwargs.get('report'))
 
     def _on_error(self, **kwargs):
-        if 'on_error' in self.view_callbacks:
-            self.view_callbacks['on_error'](kwargs.get('error'))
+        self.bridge.put('on_error', kwargs.get('error'))
 
-    def _on_log(self, **kwargs):
-        if 'on_log' in self.view_callbacks:
-            self.view_callbacks['on_log'](kwargs.get('message'))
+    def _on_log(self, events: List[dict] = None, **kwargs):
+        self.bridge.put_many('on_log', [event.get('message') for event in events or [kwargs]])
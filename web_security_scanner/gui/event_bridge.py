@@ -0,0 +1,75 @@
+"""
+GUI event bridge
+Hands scan events from the scan thread to the Tk main loop in throttled, batched frames
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+Event = Tuple[str, Tuple[Any, ...]]
+
+
+class GuiEventBridge:
+    """
+    Thread-safe queue between the scan thread and Tk.
+
+    The scan side only appends (it never touches a widget) and the UI pulls
+    with drain() from root.after at a fixed frame rate. Progress keeps only
+    its latest message, and log lines beyond max_pending_logs are counted
+    and skipped instead of queued, so a burst of payload logs costs the
+    scanner a list append and the UI one text insert per frame. Findings,
+    errors and start/complete are never dropped.
+    """
+    def __init__(self, max_pending_logs: int = 2000):
+        self.max_pending_logs = max_pending_logs
+        self.skipped_logs = 0
+        self._lock = threading.Lock()
+        self._events: Deque[Event] = deque()
+        self._progress: Optional[Tuple[Any, ...]] = None
+        self._pending_logs = 0
+        self._skipped_pending = 0
+
+    def put(self, kind: str, *args: Any):
+        with self._lock:
+            self._put(kind, args)
+
+    def put_many(self, kind: str, items: List[Any]):
+        """One event per item, under a single lock (batched log lines)."""
+        with self._lock:
+            for item in items:
+                self._put(kind, (item,))
+
+    def _put(self, kind: str, args: Tuple[Any, ...]):
+        if kind == 'on_progress':
+            self._progress = args
+            return
+        if kind == 'on_log':
+            if self._pending_logs >= self.max_pending_logs:
+                self.skipped_logs += 1
+                self._skipped_pending += 1
+                return
+            self._pending_logs += 1
+        self._events.append((kind, args))
+
+    def drain(self, max_events: int = 500) -> List[Event]:
+        """Up to max_events queued events in order, then the latest progress message."""
+        with self._lock:
+            events = []
+            while self._events and len(events) < max_events:
+                event = self._events.popleft()
+                if event[0] == 'on_log':
+                    self._pending_logs -= 1
+                events.append(event)
+            if self._skipped_pending and not self._pending_logs:
+                events.append(('on_log', (f"... {self._skipped_pending} log lines skipped",)))
+                self._skipped_pending = 0
+            if self._progress is not None:
+                events.append(('on_progress', self._progress))
+                self._progress = None
+            return events
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._events)
@@ -6,7 +6,11 @@ from ..utils.i18n import i18n
 class MainWindow:
     """
     Main Window for the Web Security Scanner GUI.
+    Scan events are pulled from the controller at a fixed frame rate, never pushed from the scan thread.
     """
+    FRAME_MS = 50  # event polling interval (20 frames per second)
+    MAX_LOG_LINES = 2000  # scrollback kept in the log area
+
     def __init__(self, root: tk.Tk, controller: ScanController):
         self.root = root
         self.controller = controller
@@ -19,6 +23,7 @@ class MainWindow:
         
         self._setup_ui()
         self._setup_callbacks()
+        self._poll_events()
 
     def _setup_ui(self):
         # Main container
@@ -106,6 +111,13 @@ class MainWindow:
         self.controller.set_callback('on_error', self.on_error)
         self.controller.set_callback('on_log', self.on_log)
 
+    def _poll_events(self):
+        """Apply the events queued since the last frame, then schedule the next frame."""
+        try:
+            self.controller.dispatch_pending()
+        finally:
+            self.root.after(self.FRAME_MS, self._poll_events)
+
     def _start_scan(self):
         url = self.url_var.get()
         if not url:
@@ -165,12 +177,10 @@ class MainWindow:
         
         ttk.Button(details_window, text=i18n.get('gui.details.close'), command=details_window.destroy).pack(pady=10)
 
-    # Thread-safe UI updates
+    # View callbacks: run on the Tk thread, from _poll_events
     def on_scan_start(self, url):
-        self.root.after(0, lambda: self._ui_scan_start(url))
-
-    def _ui_scan_start(self, url):
         self.scan_btn.config(state='disabled')
+        self.progress_bar.config(mode='indeterminate', value=0)
         self.progress_bar.start(10)
         self.progress_var.set(i18n.get('gui.scanning', url=url))
         self._log(f"Started scan on {url}")
@@ -178,13 +188,16 @@ class MainWindow:
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-    def on_progress(self, message):
-        self.root.after(0, lambda: self.progress_var.set(message))
-
-    def on_vulnerability(self, vulnerability):
-        self.root.after(0, lambda: self._ui_add_vulnerability(vulnerability))
+    def on_progress(self, message, progress=None):
+        self.progress_var.set(message)
+        if progress:
+            # Structured updates (jobs done / planned) turn the bar into a percentage
+            if str(self.progress_bar.cget('mode')) != 'determinate':
+                self.progress_bar.stop()
+                self.progress_bar.config(mode='determinate', maximum=100)
+            self.progress_bar.config(value=progress['percent'])
 
-    def _ui_add_vulnerability(self, vuln):
+    def on_vulnerability(self, vuln):
         values = (
             vuln.get('type', 'Unknown'),
             vuln.get('severity', 'Info'),
@@ -195,10 +208,10 @@ class MainWindow:
         self.vulnerabilities_map[item_id] = vuln
         self._log(f"FOUND: {vuln.get('type')} at {vuln.get('url')}")
 
-    def on_scan_complete(self):
-        self.root.after(0, self._ui_scan_complete)
-
-    def _ui_scan_complete(self):
+    def on_scan_complete(self, report=None):
+        if report:
+            self.report_path = report
+            self.open_report_btn.config(state="normal")
         self.scan_btn.config(state='normal')
         self.progress_bar.stop()
         self.progress_var.set(i18n.get('gui.status.complete'))
@@ -206,29 +219,13 @@ class MainWindow:
         messagebox.showinfo(i18n.get('gui.messages.done'), i18n.get('gui.messages.scan_finished'))
 
     def on_error(self, error):
-        self.root.after(0, lambda: self._ui_error(error))
-
-    def _ui_error(self, error):
         self._log(f"ERROR: {error}")
         self.progress_var.set(i18n.get('gui.status.error', error=error))
         self.scan_btn.config(state='normal')
         self.progress_bar.stop()
 
-    def on_log(self, message):
-        self.root.after(0, lambda: self._ui_log(message))
-
-    def _ui_log(self, message):
-        self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state='disabled')
-        
-        if "Report generated:" in message:
-            try:
-                self.report_path = message.split("Report generated:")[1].strip()
-                self.open_report_btn.config(state="normal")
-            except:
-                pass
+    def on_log(self, messages):
+        self._append_log(messages)
 
     def _open_report(self):
         if self.report_path:
@@ -247,7 +244,14 @@ class MainWindow:
                 messagebox.showerror("Error", f"Could not open report: {e}")
 
     def _log(self, message):
+        self._append_log([message])
+
+    def _append_log(self, messages):
+        """One insert for the whole batch; the oldest lines go beyond MAX_LOG_LINES."""
         self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, message + "\n")
+        self.log_text.insert(tk.END, "".join(f"{message}\n" for message in messages))
+        lines = int(self.log_text.index('end-1c').split('.')[0]) - 1
+        if lines > self.MAX_LOG_LINES:
+            self.log_text.delete('1.0', f"{lines - self.MAX_LOG_LINES + 1}.0")
         self.log_text.see(tk.END)
         self.log_text.config(state='disabled')
@@ -0,0 +1,99 @@
+"""
+Import-time benchmark
+Cold-start cost of the scanner entry points, measured in fresh interpreters with -X importtime
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ENTRY_POINTS = [
+    'web_security_scanner.cli_async',
+    'web_security_scanner.batch_scanner',
+    'web_security_scanner.web_security_scanner_async',
+    'web_security_scanner.launcher_async',
+]
+
+# Dependencies a headless async run should not pay for
+HEAVY_MODULES = ['tkinter', 'flask', 'openpyxl', 'docx', 'fpdf', 'requests', 'dns']
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def measure(module: str) -> Tuple[int, List[Tuple[int, int, str]]]:
+    """
+    Import `module` in a new interpreter. Returns its cumulative import time
+    in microseconds and every (self, cumulative, name) line -X importtime printed.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=str(ROOT),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True
+    )
+    if result.returncode:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(own), int(cumulative), name.strip()))
+    total = next((cumulative for _, cumulative, name in imports if name == module), 0)
+    return total, imports
+
+
+def benchmark(module: str, runs: int = 5, top: int = 10, watch: List[str] = HEAVY_MODULES) -> Dict[str, Any]:
+    """Median import time over `runs` cold starts, which `watch` modules got loaded and the slowest imports"""
+    totals = []
+    imports: List[Tuple[int, int, str]] = []
+    for _ in range(runs):
+        total, imports = measure(module)
+        totals.append(total)
+    loaded = {name for _, _, name in imports}
+    heavy = [name for name in watch if name in loaded]
+    slowest = sorted(imports, reverse=True)[:top]
+    return {
+        'module': module,
+        'median_ms': round(statistics.median(totals) / 1000, 1),
+        'min_ms': round(min(totals) / 1000, 1),
+        'modules_loaded': len(loaded),
+        'heavy': heavy,
+        'slowest': [{'module': name, 'self_ms': round(own / 1000, 1)} for own, _, name in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the cold import time of the scanner entry points')
+    parser.add_argument('modules', nargs='*', default=ENTRY_POINTS, help='Modules to import (default: entry points)')
+    parser.add_argument('-n', '--runs', type=int, default=5, help='Fresh interpreters per module (median is reported)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports (self time) listed per module')
+    parser.add_argument('--json', action='store_true', help='One JSON line per module instead of a table')
+    parser.add_argument('--forbid', action='append', default=[], metavar='MODULE',
+                        help='Exit with status 1 if an entry point loads MODULE (repeatable)')
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        watch = HEAVY_MODULES + [name for name in args.forbid if name not in HEAVY_MODULES]
+        result = benchmark(module, max(1, args.runs), args.top, watch)
+        forbidden = [name for name in args.forbid if name in result['heavy']]
+        failed = failed or bool(forbidden)
+        if args.json:
+            print(json.dumps(result))
+            continue
+        print(f"{module}: {result['median_ms']} ms median ({result['min_ms']} min), "
+              f"{result['modules_loaded']} modules")
+        print(f"  heavy dependencies: {', '.join(result['heavy']) or 'none'}")
+        for entry in result['slowest']:
+            print(f"  {entry['self_ms']:>8} ms  {entry['module']}")
+        if forbidden:
+            print(f"  FORBIDDEN: {', '.join(forbidden)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,18 @@
-import tkinter as tk
 import logging
 import sys
 import os
-import yaml
 from pathlib import Path
 
 # Ensure the package is in path if running directly
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from web_security_scanner.web_security_scanner_async import WebSecurityScanner
-from web_security_scanner.gui.controllers.scan_controller import ScanController
-from web_security_scanner.gui.main_window import MainWindow
-from web_security_scanner.utils.i18n import i18n
+# tkinter, yaml, the engine and the GUI are imported in the functions that use them:
+# importing this module (the console script entry point) stays cheap
 
 def load_config():
     """Load configuration from config.yaml"""
+    import yaml
+
     config_path = Path("config.yaml")
     if not config_path.exists():
         # Fallback to default if not found in root
@@ -26,6 +24,13 @@ def load_config():
     return {}
 
 def main():
+    import tkinter as tk
+
+    from web_security_scanner.web_security_scanner_async import WebSecurityScanner
+    from web_security_scanner.gui.controllers.scan_controller import ScanController
+    from web_security_scanner.gui.main_window import MainWindow
+    from web_security_scanner.utils.i18n import i18n
+
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
@@ -3,7 +3,24 @@ Modules package for Web Security Scanner
 Contains technology detection and vulnerability testers
 """
 
-from .technology_detector import TechnologyDetector
-from .web_mapper import WebMapper
+import importlib
+
+# Imported on first access (PEP 562): importing one module of the package
+# does not load the others' dependencies (bs4, dns, requests)
+_EXPORTS = {
+    'TechnologyDetector': '.technology_detector',
+    'WebMapper': '.web_mapper',
+}
 
 __all__ = ['TechnologyDetector', 'WebMapper']
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = globals()[name] = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
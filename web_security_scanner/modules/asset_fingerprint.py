@@ -0,0 +1,175 @@
+import asyncio
+import base64
+import logging
+import re
+import secrets
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from ..core.scanner_core_async import AsyncScannerCore
+from .content_discovery_async import Soft404Profile
+
+try:
+    import mmh3
+except ImportError:
+    mmh3 = None
+
+# Shodan-style favicon hashes (mmh3 of the base64-encoded icon) -> (technology, category)
+FAVICON_HASHES: Dict[int, Tuple[str, str]] = {
+    116323821: ('Spring Boot', 'frameworks'),
+    81586312: ('Jenkins', 'misc'),
+    1278323681: ('GitLab', 'misc'),
+    -335242539: ('F5 BIG-IP', 'waf'),
+    945408572: ('FortiGate', 'waf'),
+    2123863676: ('Grafana', 'misc'),
+}
+
+_ICON_LINK = re.compile(r'<link[^>]+rel\s*=\s*["\'][^"\']*icon[^"\']*["\'][^>]*>', re.I)
+_HREF = re.compile(r'''href\s*=\s*["']([^"']+)["']''', re.I)
+
+
+@dataclass(frozen=True)
+class AssetProbe:
+    """A static file whose presence identifies a technology."""
+    path: str
+    tech: str
+    category: str
+    marker: str
+    version_pattern: Optional[str] = None
+
+
+ASSET_PROBES: List[AssetProbe] = [
+    AssetProbe('/wp-includes/js/wp-emoji-release.min.js', 'WordPress', 'cms', 'emoji'),
+    AssetProbe('/readme.html', 'WordPress', 'cms', 'WordPress', r'Version\s+([\d.]+)'),
+    AssetProbe('/misc/drupal.js', 'Drupal', 'cms', 'Drupal'),
+    AssetProbe('/core/misc/drupal.js', 'Drupal', 'cms', 'Drupal'),
+    AssetProbe('/CHANGELOG.txt', 'Drupal', 'cms', 'Drupal', r'Drupal\s+([\d.]+)'),
+    AssetProbe('/media/system/js/core.js', 'Joomla', 'cms', 'Joomla'),
+    AssetProbe('/administrator/manifests/files/joomla.xml', 'Joomla', 'cms', '<extension',
+               r'<version>([\d.]+)</version>'),
+    AssetProbe('/static/admin/css/base.css', 'Django', 'frameworks', 'django'),
+]
+
+
+def _murmur3_32(data: bytes, seed: int = 0) -> int:
+    """Pure-Python MurmurHash3 x86 32-bit, signed like mmh3.hash."""
+    c1, c2, mask = 0xcc9e2d51, 0x1b873593, 0xffffffff
+    h = seed & mask
+    rounded = len(data) & ~3
+    for (k,) in struct.iter_unpack('<I', data[:rounded]):
+        k = (k * c1) & mask
+        k = ((k << 15) | (k >> 17)) & mask
+        h ^= (k * c2) & mask
+        h = ((h << 13) | (h >> 19)) & mask
+        h = (h * 5 + 0xe6546b64) & mask
+    tail = data[rounded:]
+    if tail:
+        k = int.from_bytes(tail, 'little')
+        k = (k * c1) & mask
+        k = ((k << 15) | (k >> 17)) & mask
+        h ^= (k * c2) & mask
+    h ^= len(data)
+    h ^= h >> 16
+    h = (h * 0x85ebca6b) & mask
+    h ^= h >> 13
+    h = (h * 0xc2b2ae35) & mask
+    h ^= h >> 16
+    return h - 0x100000000 if h & 0x80000000 else h
+
+
+def murmur3_32(data: bytes) -> int:
+    return mmh3.hash(data) if mmh3 is not None else _murmur3_32(data)
+
+
+def favicon_hash(content: bytes) -> int:
+    """Hash an icon the way Shodan does: mmh3 over its line-wrapped base64."""
+    return murmur3_32(base64.encodebytes(content))
+
+
+class AssetFingerprinter:
+    """
+    Identifies technologies from the favicon hash and from well-known static
+    files, which often survive when banners and HTML markers are stripped.
+
+    Costs one request per icon and per probe (plus a soft-404 calibration per
+    extension); probes run concurrently through the core's limiter.
+    """
+    def __init__(self, scanner_core: AsyncScannerCore, probes: List[AssetProbe] = None,
+                 favicon_hashes: Dict[int, Tuple[str, str]] = None):
+        self.scanner = scanner_core
+        self.probes = probes if probes is not None else ASSET_PROBES
+        self.favicon_hashes = favicon_hashes if favicon_hashes is not None else FAVICON_HASHES
+        self.logger = logging.getLogger("AssetFingerprinter")
+        self.favicons: Dict[str, int] = {}
+
+    async def fingerprint(self, base_url: str) -> List[Dict[str, Any]]:
+        """Run the favicon and asset probes; returns one finding per technology and source."""
+        parsed = urlparse(base_url)
+        root = f"{parsed.scheme}://{parsed.netloc}/"
+        icon_urls = await self._icon_urls(base_url, root)
+        extensions = {self._extension_of(probe.path) for probe in self.probes}
+        profiles = dict(zip(extensions, await asyncio.gather(*[
+            self._calibrate(root, extension) for extension in extensions
+        ])))
+
+        results = await asyncio.gather(
+            *[self._check_favicon(url) for url in icon_urls],
+            *[self._check_probe(root, probe, profiles[self._extension_of(probe.path)]) for probe in self.probes]
+        )
+        findings = [finding for finding in results if finding]
+        for finding in findings:
+            self.logger.info(f"{finding['name']} identified by {finding['evidence']}")
+        return findings
+
+    async def _icon_urls(self, base_url: str, root: str) -> List[str]:
+        urls = [urljoin(root, 'favicon.ico')]
+        response = await self.scanner.request("GET", base_url)
+        for tag in _ICON_LINK.findall(response.get('text', '')):
+            href = _HREF.search(tag)
+            if href:
+                url = urljoin(base_url, href.group(1))
+                if url not in urls and not url.startswith('data:'):
+                    urls.append(url)
+        return urls
+
+    async def _check_favicon(self, url: str) -> Optional[Dict[str, Any]]:
+        response = await self.scanner.request("GET", url, raw=True)
+        content = response.get('content')
+        if response.get('status_code') != 200 or not content:
+            return None
+        digest = favicon_hash(content)
+        self.favicons[url] = digest
+        match = self.favicon_hashes.get(digest)
+        if match is None:
+            return None
+        tech, category = match
+        return {'name': tech, 'category': category, 'confidence': 'high', 'version': '',
+                'url': url, 'evidence': f"favicon hash {digest}"}
+
+    async def _check_probe(self, root: str, probe: AssetProbe, profile: Soft404Profile) -> Optional[Dict[str, Any]]:
+        url = urljoin(root, probe.path.lstrip('/'))
+        response = await self.scanner.request("GET", url, allow_redirects=False)
+        text = response.get('text', '')
+        if response.get('status_code') != 200 or profile.matches(response, probe.path.rsplit('/', 1)[-1]):
+            return None
+        if probe.marker.lower() not in text.lower():
+            return None
+        version = ''
+        if probe.version_pattern:
+            match = re.search(probe.version_pattern, text)
+            version = match.group(1) if match else ''
+        return {'name': probe.tech, 'category': probe.category, 'confidence': 'high', 'version': version,
+                'url': url, 'evidence': f"asset {probe.path}"}
+
+    async def _calibrate(self, root: str, extension: str) -> Soft404Profile:
+        profile = Soft404Profile()
+        name = secrets.token_hex(8) + extension
+        profile.add_sample(await self.scanner.request("GET", root + name, allow_redirects=False), name)
+        return profile
+
+    @staticmethod
+    def _extension_of(path: str) -> str:
+        last = path.rsplit('/', 1)[-1]
+        return '.' + last.rsplit('.', 1)[1] if '.' in last else ''
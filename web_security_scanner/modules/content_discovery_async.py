@@ -0,0 +1,290 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import secrets
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from ..core.scanner_core_async import AsyncScannerCore
+from ..events.event_emitter import ScanEventEmitter, ScanEventType
+
+DEFAULT_EXTENSIONS = ['', '.php', '.html', '.txt', '.bak']
+
+# HEAD is not reliable on every server; these statuses mean "ask again with GET"
+HEAD_FALLBACK_STATUSES = {0, 405, 501}
+DIRECTORY_STATUSES = {200, 401, 403}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+def _normalize_body(text: str, token: str) -> str:
+    """Remove the probed name and volatile numbers so soft-404 pages hash equally."""
+    if len(token) >= 4:
+        text = text.replace(token, '')
+    return re.sub(r'\d+', '', text)
+
+
+def _body_hash(text: str, token: str) -> str:
+    return hashlib.md5(_normalize_body(text, token).encode('utf-8', 'ignore')).hexdigest()
+
+
+def _normalize_location(location: str, token: str) -> str:
+    return location.replace(token, '') if len(token) >= 4 else location
+
+
+@dataclass
+class Soft404Profile:
+    """
+    Fingerprint of how a directory answers for paths that do not exist.
+    Built by requesting random paths before brute-forcing.
+    """
+    statuses: Set[int] = field(default_factory=set)
+    hashes: Set[str] = field(default_factory=set)
+    lengths: List[int] = field(default_factory=list)
+    header_lengths: List[int] = field(default_factory=list)
+    locations: Set[str] = field(default_factory=set)
+
+    @property
+    def is_wildcard(self) -> bool:
+        """True when the server answers random paths with something other than 404."""
+        return bool(self.statuses - {404})
+
+    def add_sample(self, response: Dict[str, Any], token: str):
+        status = response.get('status_code', 0)
+        if status == 0:
+            return
+        self.statuses.add(status)
+        text = response.get('text', '')
+        self.hashes.add(_body_hash(text, token))
+        self.lengths.append(len(text.encode('utf-8', 'ignore')))
+        header_length = _header_length(response)
+        if header_length >= 0:
+            self.header_lengths.append(header_length)
+        location = _location(response)
+        if location:
+            self.locations.add(_normalize_location(location, token))
+
+    def matches(self, response: Dict[str, Any], name: str = '') -> bool:
+        """Return True if a GET response for `name` looks like this directory's not-found page."""
+        status = response.get('status_code', 0)
+        if status == 404 or status not in self.statuses:
+            return status == 404
+
+        if status in REDIRECT_STATUSES:
+            return self.location_matches(response, name)
+
+        text = response.get('text', '')
+        if _body_hash(text, name) in self.hashes:
+            return True
+        return _within_tolerance(len(text.encode('utf-8', 'ignore')), self.lengths)
+
+    def location_matches(self, response: Dict[str, Any], name: str = '') -> bool:
+        return _normalize_location(_location(response), name) in self.locations
+
+    def header_length_matches(self, response: Dict[str, Any]) -> Optional[bool]:
+        """Compare a HEAD Content-Length with the calibration; None when undecidable."""
+        length = _header_length(response)
+        if length < 0 or not self.header_lengths:
+            return None
+        return _within_tolerance(length, self.header_lengths)
+
+
+def _location(response: Dict[str, Any]) -> str:
+    headers = response.get('headers', {})
+    return headers.get('Location', '') or headers.get('location', '')
+
+
+def _header_length(response: Dict[str, Any]) -> int:
+    headers = response.get('headers', {})
+    value = headers.get('Content-Length') or headers.get('content-length')
+    try:
+        return int(value) if value is not None else -1
+    except ValueError:
+        return -1
+
+
+def _within_tolerance(length: int, samples: List[int]) -> bool:
+    return any(abs(sample - length) <= max(32, int(sample * 0.03)) for sample in samples)
+
+
+class ContentDiscoveryAsync:
+    """
+    Concurrent directory and file brute-forcer built on AsyncScannerCore.
+
+    Each directory is calibrated with random paths first, so catch-all sites
+    that answer 200 to everything do not report every word as found.
+    Hits are streamed as CONTENT_DISCOVERED events while the scan runs.
+    """
+    def __init__(self, scanner_core: AsyncScannerCore, event_emitter: ScanEventEmitter = None,
+                 wordlist: List[str] = None, extensions: List[str] = None,
+                 max_depth: int = 2, concurrency: int = None, calibration_samples: int = 2):
+        self.scanner = scanner_core
+        self.event_emitter = event_emitter
+        self.wordlist = wordlist if wordlist is not None else self._load_default_wordlist()
+        self.extensions = extensions if extensions is not None else DEFAULT_EXTENSIONS
+        self.max_depth = max_depth
+        self.concurrency = concurrency or scanner_core.config.max_concurrency
+        self.calibration_samples = calibration_samples
+        self.logger = logging.getLogger("ContentDiscoveryAsync")
+
+        self.found: List[Dict[str, Any]] = []
+        self._seen: Set[str] = set()
+        self._scanned_dirs: Set[str] = set()
+        self._profiles: Dict[Tuple[str, str], Soft404Profile] = {}
+        self._calibration_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    @staticmethod
+    def _load_default_wordlist() -> List[str]:
+        wordlist_file = Path(__file__).parent.parent / 'PAYLOAD' / 'subdirectorios.json'
+        try:
+            with open(wordlist_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return []
+
+    async def discover(self, base_url: str) -> List[Dict[str, Any]]:
+        """
+        Brute-force files and directories below base_url.
+        Returns every confirmed hit; hits are also emitted as they are found.
+        """
+        root = base_url.split('#')[0].split('?')[0]
+        if not root.endswith('/'):
+            last = urlparse(root).path.rsplit('/', 1)[-1]
+            root = root[:-len(last)] if '.' in last else root + '/'
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._enqueue_directory(queue, root, depth=0)
+
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        self.logger.info(f"Content discovery finished: {len(self.found)} hits under {root}")
+        return self.found
+
+    def _enqueue_directory(self, queue: asyncio.Queue, directory: str, depth: int):
+        if directory in self._scanned_dirs:
+            return
+        self._scanned_dirs.add(directory)
+        for word in self.wordlist:
+            word = str(word).strip().strip('/')
+            if not word:
+                continue
+            candidates = [word] if '.' in word else [word + ext for ext in self.extensions]
+            for candidate in candidates:
+                url = directory + candidate
+                if url not in self._seen:
+                    self._seen.add(url)
+                    queue.put_nowait((url, directory, depth))
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            url, directory, depth = await queue.get()
+            try:
+                hit = await self._probe(url, directory)
+                if hit:
+                    hit['depth'] = depth
+                    self.found.append(hit)
+                    await self._emit_hit(hit)
+                    if hit['is_directory'] and depth < self.max_depth:
+                        self._enqueue_directory(queue, hit['url'].rstrip('/') + '/', depth + 1)
+            except Exception as e:
+                self.logger.debug(f"Error probing {url}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _probe(self, url: str, directory: str) -> Optional[Dict[str, Any]]:
+        name = url[len(directory):]
+        extension = self._extension_of(url)
+        profile = await self._get_profile(directory, extension)
+
+        response = await self.scanner.request("HEAD", url, allow_redirects=False)
+        method = 'HEAD'
+        if self._needs_body(response, profile):
+            response = await self.scanner.request("GET", url, allow_redirects=False)
+            method = 'GET'
+            if profile.matches(response, name):
+                return None
+        elif self._head_is_miss(response, profile, name):
+            return None
+
+        status = response.get('status_code', 0)
+        if status in HEAD_FALLBACK_STATUSES:
+            return None
+
+        location = _location(response)
+        path = urlparse(url).path.rstrip('/')
+        is_directory = not extension and (
+            status in DIRECTORY_STATUSES or
+            (status in REDIRECT_STATUSES and urlparse(location).path == path + '/')
+        )
+        headers = response.get('headers', {})
+        text = response.get('text')
+        return {
+            'url': url,
+            'status_code': status,
+            'length': len(text) if text else _header_length(response),
+            'content_type': headers.get('Content-Type', '') or headers.get('content-type', ''),
+            'location': location,
+            'method': method,
+            'is_directory': is_directory,
+        }
+
+    @staticmethod
+    def _needs_body(response: Dict[str, Any], profile: Soft404Profile) -> bool:
+        """Decide whether the HEAD answer is conclusive or a GET is required."""
+        status = response.get('status_code', 0)
+        if status in HEAD_FALLBACK_STATUSES:
+            return True
+        # On catch-all directories a HEAD status alone cannot tell hits from soft-404s
+        if not profile.is_wildcard or status not in profile.statuses or status in REDIRECT_STATUSES:
+            return False
+        return profile.header_length_matches(response) is not False
+
+    @staticmethod
+    def _head_is_miss(response: Dict[str, Any], profile: Soft404Profile, name: str) -> bool:
+        status = response.get('status_code', 0)
+        if status == 404:
+            return True
+        return (status in profile.statuses and status in REDIRECT_STATUSES
+                and profile.location_matches(response, name))
+
+    async def _get_profile(self, directory: str, extension: str) -> Soft404Profile:
+        key = (directory, extension)
+        if key in self._profiles:
+            return self._profiles[key]
+        lock = self._calibration_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key not in self._profiles:
+                self._profiles[key] = await self._calibrate(directory, extension)
+        return self._profiles[key]
+
+    async def _calibrate(self, directory: str, extension: str) -> Soft404Profile:
+        profile = Soft404Profile()
+        names = [secrets.token_hex(8) + extension for _ in range(self.calibration_samples)]
+        responses = await asyncio.gather(*[
+            self.scanner.request("GET", directory + name, allow_redirects=False)
+            for name in names
+        ])
+        for name, response in zip(names, responses):
+            profile.add_sample(response, name)
+        if profile.is_wildcard:
+            self.logger.debug(f"Soft-404 behaviour on {directory}*{extension}: {sorted(profile.statuses)}")
+        return profile
+
+    @staticmethod
+    def _extension_of(url: str) -> str:
+        last = urlparse(url).path.rsplit('/', 1)[-1]
+        return '.' + last.rsplit('.', 1)[1] if '.' in last else ''
+
+    async def _emit_hit(self, hit: Dict[str, Any]):
+        self.logger.info(f"Found: {hit['url']} [{hit['status_code']}]")
+        if self.event_emitter:
+            await self.event_emitter.emit(ScanEventType.CONTENT_DISCOVERED, result=hit)
@@ -0,0 +1,291 @@
+"""
+Cookie Analysis
+Flags, session ids, token entropy and stack fingerprints from raw Set-Cookie headers of either core
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+# Session cookie name (lowercase; a trailing '*' matches as prefix) -> technologies it reveals
+SESSION_COOKIES: Dict[str, List[Tuple[str, str]]] = {
+    'phpsessid': [('languages', 'PHP')],
+    'jsessionid': [('languages', 'Java')],
+    'asp.net_sessionid': [('languages', 'ASP.NET')],
+    '.aspxauth': [('languages', 'ASP.NET')],
+    'aspsessionid*': [('languages', 'ASP'), ('servers', 'IIS')],
+    'cfid': [('languages', 'ColdFusion')],
+    'cftoken': [('languages', 'ColdFusion')],
+    'laravel_session': [('frameworks', 'Laravel'), ('languages', 'PHP')],
+    'ci_session': [('frameworks', 'CodeIgniter'), ('languages', 'PHP')],
+    'symfony': [('frameworks', 'Symfony'), ('languages', 'PHP')],
+    'connect.sid': [('frameworks', 'Express'), ('languages', 'Node.js')],
+    'sessionid': [],
+    'csrftoken': [('frameworks', 'Django'), ('languages', 'Python')],
+    '_rails_session': [('frameworks', 'Ruby on Rails'), ('languages', 'Ruby')],
+    '_session_id': [('frameworks', 'Ruby on Rails'), ('languages', 'Ruby')],
+    'rack.session': [('languages', 'Ruby')],
+    'wordpress_*': [('cms', 'WordPress')],
+    'wp-settings-*': [('cms', 'WordPress')],
+    'drupal.visitor.*': [('cms', 'Drupal')],
+    'sess*': [],
+}
+# Infrastructure cookies: fingerprints, never session ids
+INFRASTRUCTURE_COOKIES: Dict[str, List[Tuple[str, str]]] = {
+    '__cf_bm': [('cdn', 'Cloudflare')],
+    '__cfduid': [('cdn', 'Cloudflare')],
+    'awsalb': [('cdn', 'AWS ELB')],
+    'awselb': [('cdn', 'AWS ELB')],
+    'bigipserver*': [('waf', 'F5 BIG-IP')],
+    'incap_ses_*': [('waf', 'IMPERVA')],
+    'visid_incap_*': [('waf', 'IMPERVA')],
+    'barra_counter_session': [('waf', 'BARRACUDA')],
+}
+SESSION_NAME = re.compile(r'sess|sid\b|^sid|auth|token|jwt|login|remember', re.I)
+MIN_ENTROPY_BITS = 64  # OWASP minimum for session identifiers
+# Cookies only guessed to be sessions by SESSION_NAME are judged as ids from this many characters on
+MIN_TOKEN_LENGTH = 16
+_COOKIE_SPLIT = re.compile(r',\s*(?=[^;,=\s]+=)')
+
+
+def _lookup(table: Dict[str, List[Tuple[str, str]]], name: str) -> Optional[List[Tuple[str, str]]]:
+    name = name.lower()
+    if name in table:
+        return table[name]
+    for key, techs in table.items():
+        if key.endswith('*') and name.startswith(key[:-1]):
+            return techs
+    return None
+
+
+@dataclass
+class ParsedCookie:
+    name: str
+    value: str
+    attributes: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def secure(self) -> bool:
+        return 'secure' in self.attributes
+
+    @property
+    def httponly(self) -> bool:
+        return 'httponly' in self.attributes
+
+    @property
+    def samesite(self) -> str:
+        return self.attributes.get('samesite', '')
+
+    @property
+    def deleted(self) -> bool:
+        return self.attributes.get('max-age', '').lstrip('-') == '0' or not self.value
+
+    @property
+    def is_session(self) -> bool:
+        if _lookup(INFRASTRUCTURE_COOKIES, self.name) is not None:
+            return False
+        return _lookup(SESSION_COOKIES, self.name) is not None or bool(SESSION_NAME.search(self.name))
+
+    @property
+    def known_session(self) -> bool:
+        """Session cookie of a known stack, not just a name that looks like one"""
+        return self.is_session and _lookup(SESSION_COOKIES, self.name) is not None
+
+    @property
+    def technologies(self) -> List[Tuple[str, str]]:
+        return _lookup(SESSION_COOKIES, self.name) or _lookup(INFRASTRUCTURE_COOKIES, self.name) or []
+
+    def missing_flags(self, https: bool) -> List[str]:
+        missing = []
+        if https and not self.secure:
+            missing.append('Secure')
+        if self.is_session:
+            if not self.httponly:
+                missing.append('HttpOnly')
+            if not self.samesite:
+                missing.append('SameSite')
+            elif self.samesite.lower() == 'none' and not self.secure:
+                missing.append('Secure (required by SameSite=None)')
+        return missing
+
+
+def parse_set_cookie(header: str) -> Optional[ParsedCookie]:
+    parts = header.split(';')
+    name, sep, value = parts[0].partition('=')
+    if not sep or not name.strip():
+        return None
+    attributes = {}
+    for part in parts[1:]:
+        key, _, attribute = part.strip().partition('=')
+        if key:
+            attributes[key.lower()] = attribute.strip()
+    return ParsedCookie(name.strip(), value.strip().strip('"'), attributes)
+
+
+def split_set_cookie(value: str) -> List[str]:
+    """Undo the comma join some clients apply to repeated Set-Cookie headers (Expires dates survive)"""
+    return [part for part in _COOKIE_SPLIT.split(value) if part.strip()]
+
+
+def set_cookie_headers(response: Any) -> List[str]:
+    """
+    Raw Set-Cookie values of a response from either core: async result dicts
+    and cached sync responses carry 'set_cookies', requests responses keep the
+    repeated headers in raw.headers; anything else falls back to splitting the
+    merged header.
+    """
+    if isinstance(response, dict):
+        if 'set_cookies' in response:
+            return list(response['set_cookies'])
+        headers = response.get('headers') or {}
+    else:
+        if getattr(response, 'set_cookies', None) is not None:
+            return list(response.set_cookies)
+        raw_headers = getattr(getattr(response, 'raw', None), 'headers', None)
+        if raw_headers is not None and hasattr(raw_headers, 'getlist'):
+            return list(raw_headers.getlist('Set-Cookie'))
+        headers = getattr(response, 'headers', None) or {}
+    for name, value in headers.items():
+        if str(name).lower() == 'set-cookie':
+            return split_set_cookie(str(value))
+    return []
+
+
+def response_cookies(response: Any) -> List[ParsedCookie]:
+    return [cookie for cookie in map(parse_set_cookie, set_cookie_headers(response)) if cookie]
+
+
+def token_entropy(values: Iterable[str]) -> Dict[str, Any]:
+    """
+    Entropy estimate for a sample of tokens.
+
+    Alphabet size comes from every character seen; only positions that vary
+    across the sample count, so fixed prefixes, timestamps frozen within the
+    sample or a static token drag the estimate down. A single token can only
+    be judged by its length and alphabet (upper bound).
+    """
+    values = [value for value in values if value]
+    if not values:
+        return {'samples': 0, 'bits': 0.0}
+    unique = sorted(set(values))
+    alphabet = len(set(''.join(unique)))
+    bits_per_char = math.log2(alphabet) if alphabet > 1 else 0.0
+    length = max(len(value) for value in unique)
+    if len(unique) > 1:
+        varying = sum(1 for position in range(length)
+                      if len({value[position] if position < len(value) else '' for value in unique}) > 1)
+    else:
+        varying = length
+    # Shannon entropy of the character distribution, a second look at skewed alphabets
+    counts = Counter(''.join(unique))
+    total = sum(counts.values())
+    shannon = -sum(count / total * math.log2(count / total) for count in counts.values())
+    return {
+        'samples': len(values),
+        'unique': len(unique),
+        'length': length,
+        'alphabet': alphabet,
+        'varying_positions': varying,
+        'bits': round(varying * min(bits_per_char, shannon + 0.5), 1),
+        'repeated': len(unique) < len(values),
+    }
+
+
+class CookieAnalyzer:
+    """
+    Cookie and session analysis shared by the sync and async scanners.
+
+    observe() takes any response (requests, cached mock or async dict) and
+    only reads its Set-Cookie headers, so it can run on responses that were
+    fetched anyway. Session cookie values are kept as samples (per host and
+    name) for the entropy check.
+    """
+    def __init__(self, max_samples: int = 20, min_entropy_bits: int = MIN_ENTROPY_BITS):
+        self.max_samples = max_samples
+        self.min_entropy_bits = min_entropy_bits
+        self.cookies: Dict[Tuple[str, str], ParsedCookie] = {}
+        self.urls: Dict[Tuple[str, str], str] = {}
+        self.samples: Dict[Tuple[str, str], List[str]] = {}
+
+    def observe(self, url: str, response: Any) -> List[ParsedCookie]:
+        cookies = response_cookies(response)
+        host = urlparse(url).netloc.lower()
+        for cookie in cookies:
+            if cookie.deleted:
+                continue
+            key = (host, cookie.name)
+            self.cookies.setdefault(key, cookie)
+            self.urls.setdefault(key, url)
+            if cookie.is_session:
+                samples = self.samples.setdefault(key, [])
+                if len(samples) < self.max_samples and cookie.value not in samples:
+                    samples.append(cookie.value)
+        return cookies
+
+    def session_cookies(self) -> List[Tuple[str, str]]:
+        """(host, name) of every session cookie seen"""
+        return [key for key, cookie in self.cookies.items() if cookie.is_session]
+
+    def add_samples(self, host: str, name: str, values: Iterable[str]):
+        samples = self.samples.setdefault((host, name), [])
+        for value in values:
+            if value and len(samples) < self.max_samples:
+                # Duplicates are kept on purpose: a server reissuing an id is what the check looks for
+                samples.append(value)
+
+    def fingerprints(self) -> Dict[str, Set[str]]:
+        """Technologies revealed by cookie names, like TechnologyDetector.detected"""
+        detected: Dict[str, Set[str]] = {}
+        for cookie in self.cookies.values():
+            for category, tech in cookie.technologies:
+                detected.setdefault(category, set()).add(tech)
+        return detected
+
+    def entropy(self, host: str, name: str) -> Dict[str, Any]:
+        return token_entropy(self.samples.get((host, name), []))
+
+    def needs_samples(self, sample_size: int) -> List[Tuple[str, str, str]]:
+        """(host, name, url) of session cookies with fewer than sample_size values collected"""
+        return [(host, name, self.urls[(host, name)]) for host, name in self.session_cookies()
+                if len(self.samples.get((host, name), [])) < min(sample_size, self.max_samples)]
+
+    def findings(self, include_flags: bool = True) -> List[Dict[str, Any]]:
+        """
+        One entry per cookie with problems: missing flags (unless include_flags
+        is False, when the passive check already reported them) and, for
+        session ids, weak or repeated tokens.
+
+        Cookies of known session stacks are always judged as ids. Cookies that
+        only have a session-like name (theme_token, remember_view) are judged
+        only when their values look like ids: at least MIN_TOKEN_LENGTH long
+        and not the same value in every fresh session, since that is a
+        preference or a constant rather than an id. A repeated value is only
+        reuse if the same name also received fresh values in other sessions.
+        """
+        results = []
+        for (host, name), cookie in sorted(self.cookies.items()):
+            url = self.urls[(host, name)]
+            issues = []
+            if include_flags:
+                issues = [f"missing {flag}" for flag in cookie.missing_flags(url.startswith('https://'))]
+            entropy = None
+            reused = weak = False
+            if cookie.is_session:
+                entropy = self.entropy(host, name)
+                if cookie.known_session:
+                    reused = entropy['samples'] > 1 and entropy['repeated']
+                    weak = entropy['samples'] > 0 and entropy['bits'] < self.min_entropy_bits
+                elif entropy['samples'] and entropy['length'] >= MIN_TOKEN_LENGTH and entropy['unique'] > 1:
+                    reused = entropy['repeated']
+                    weak = entropy['bits'] < self.min_entropy_bits
+                if reused:
+                    issues.append(f"same session id issued twice in {entropy['samples']} fresh sessions")
+                if weak:
+                    issues.append(f"low token entropy (~{entropy['bits']} bits over {entropy['samples']} samples)")
+            if issues:
+                results.append({'host': host, 'name': name, 'url': url, 'session': cookie.is_session,
+                                'issues': issues, 'entropy': entropy, 'reused': reused, 'weak': weak})
+        return results
@@ -0,0 +1,161 @@
+import json
+import math
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Pages not re-checked for this long are always revisited, whatever their history
+MAX_REVISIT_AGE = 30 * 24 * 3600
+
+
+@dataclass
+class PageRecord:
+    """Persisted state of one crawled page."""
+    url: str
+    status: int = 0
+    content_hash: str = ''
+    etag: str = ''
+    last_modified: str = ''
+    outlinks: List[Tuple[str, str]] = field(default_factory=list)
+    external: List[str] = field(default_factory=list)
+    forms: List[Dict[str, Any]] = field(default_factory=list)
+    js_endpoints: List[Dict[str, Any]] = field(default_factory=list)
+    depth: int = 0
+    first_seen: float = 0.0
+    last_checked: float = 0.0
+    last_changed: float = 0.0
+    checks: int = 0
+    changes: int = 0
+
+    def change_likelihood(self, now: float = None) -> float:
+        """
+        Probability that the page changed since it was last checked, assuming
+        changes arrive as a Poisson process with the rate observed so far.
+        """
+        now = now or time.time()
+        elapsed = now - self.last_checked
+        if self.checks == 0 or elapsed >= MAX_REVISIT_AGE:
+            return 1.0
+        span = max(now - self.first_seen, 3600.0)
+        rate = (self.changes + 0.5) / span
+        return 1.0 - math.exp(-rate * elapsed)
+
+
+def form_signature(form: Dict[str, Any]) -> str:
+    """Stable identity of a form: where it posts, how, and which fields it has."""
+    fields = ','.join(sorted(form.get('fields', [])))
+    return f"{form.get('method', 'GET')} {form.get('action', '')} [{fields}]"
+
+
+class CrawlGraphStore:
+    """
+    SQLite-backed crawl graph used by incremental mapping.
+    Stores one row per page (validators, content hash, outlinks, forms) per site.
+    """
+    def __init__(self, path: str, site: str):
+        self.path = path
+        self.site = site
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_pages (
+                site TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status INTEGER,
+                content_hash TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                outlinks TEXT,
+                external TEXT,
+                forms TEXT,
+                depth INTEGER,
+                first_seen REAL,
+                last_checked REAL,
+                last_changed REAL,
+                checks INTEGER,
+                changes INTEGER,
+                js_endpoints TEXT,
+                PRIMARY KEY (site, url)
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(crawl_pages)")}
+        if 'js_endpoints' not in columns:
+            # Graphs saved before JS endpoints were tracked
+            self._conn.execute("ALTER TABLE crawl_pages ADD COLUMN js_endpoints TEXT")
+        self._conn.commit()
+
+    def load(self) -> Dict[str, PageRecord]:
+        """Load every page recorded for this site."""
+        rows = self._conn.execute(
+            "SELECT url, status, content_hash, etag, last_modified, outlinks, external, forms, depth,"
+            " first_seen, last_checked, last_changed, checks, changes, js_endpoints FROM crawl_pages WHERE site = ?",
+            (self.site,)
+        )
+        records = {}
+        for row in rows:
+            records[row[0]] = PageRecord(
+                url=row[0], status=row[1], content_hash=row[2] or '', etag=row[3] or '',
+                last_modified=row[4] or '',
+                outlinks=[tuple(link) for link in json.loads(row[5] or '[]')],
+                external=json.loads(row[6] or '[]'), forms=json.loads(row[7] or '[]'),
+                depth=row[8] or 0, first_seen=row[9] or 0.0, last_checked=row[10] or 0.0,
+                last_changed=row[11] or 0.0, checks=row[12] or 0, changes=row[13] or 0,
+                js_endpoints=json.loads(row[14] or '[]')
+            )
+        return records
+
+    def save(self, records: List[PageRecord]):
+        """Insert or replace the given pages in one transaction."""
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO crawl_pages (site, url, status, content_hash, etag, last_modified, outlinks,"
+            " external, forms, depth, first_seen, last_checked, last_changed, checks, changes, js_endpoints)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (self.site, r.url, r.status, r.content_hash, r.etag, r.last_modified,
+                 json.dumps(r.outlinks), json.dumps(r.external), json.dumps(r.forms), r.depth,
+                 r.first_seen, r.last_checked, r.last_changed, r.checks, r.changes, json.dumps(r.js_endpoints))
+                for r in records
+            ]
+        )
+        self._conn.commit()
+
+    def delete(self, urls: List[str]):
+        """Forget pages that are no longer reachable."""
+        self._conn.executemany(
+            "DELETE FROM crawl_pages WHERE site = ? AND url = ?",
+            [(self.site, url) for url in urls]
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def compute_structure_diff(previous: Dict[str, PageRecord], current: Dict[str, PageRecord],
+                           changed: List[str]) -> Dict[str, Any]:
+    """
+    Structural diff between two crawls: endpoints and forms that appeared or disappeared.
+    Only pages that answered 200 count as live endpoints.
+    """
+    prev_live = {url for url, rec in previous.items() if rec.status == 200}
+    curr_live = {url for url, rec in current.items() if rec.status == 200}
+
+    def forms_of(records: Dict[str, PageRecord], live: set) -> Dict[str, Dict[str, Any]]:
+        forms = {}
+        for url in live:
+            for form in records[url].forms:
+                forms.setdefault(form_signature(form), dict(form, url=url))
+        return forms
+
+    prev_forms = forms_of(previous, prev_live)
+    curr_forms = forms_of(current, curr_live)
+
+    return {
+        'new_endpoints': sorted(curr_live - prev_live),
+        'removed_endpoints': sorted(prev_live - curr_live),
+        'changed_endpoints': sorted(url for url in changed if url in prev_live and url in curr_live),
+        'new_forms': [curr_forms[sig] for sig in sorted(set(curr_forms) - set(prev_forms))],
+        'removed_forms': [prev_forms[sig] for sig in sorted(set(prev_forms) - set(curr_forms))],
+    }
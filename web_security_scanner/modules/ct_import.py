@@ -0,0 +1,144 @@
+"""
+Certificate Transparency import
+Streams local CT log dumps (crt.sh-style JSON lines or CSV) for names under the target domains
+"""
+
+import csv
+import gzip
+import json
+import logging
+import mmap
+import os
+import re
+from typing import Any, Iterable, Iterator, List, Set
+
+_HOSTNAME = re.compile(r'^(?:[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9])?\.)+[a-z0-9-]{2,63}$')
+_SPLIT = re.compile(r'[\s,;]+')
+
+
+def normalize_name(name: str) -> str:
+    """'*.API.example.com.' -> 'api.example.com'; '' when it is not a hostname"""
+    name = name.strip().strip('"\'').lower().rstrip('.')
+    while name.startswith('*.'):
+        name = name[2:]
+    return name if _HOSTNAME.match(name) else ''
+
+
+def _strings(value: Any) -> Iterator[str]:
+    """Every string inside a decoded JSON record"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+class SuffixIndex:
+    """Base domains looked up by walking a name's label suffixes: O(labels) per name"""
+    def __init__(self, domains: Iterable[str]):
+        self.domains: Set[str] = {normalize_name(domain) for domain in domains} - {''}
+
+    def match(self, name: str) -> str:
+        """Base domain the name falls under ('' when none); the domain itself does not count"""
+        position = name.find('.')
+        while position != -1:
+            suffix = name[position + 1:]
+            if suffix in self.domains:
+                return suffix
+            position = name.find('.', position + 1)
+        return ''
+
+
+class CTLogImporter:
+    """
+    Imports subdomains from certificate transparency dumps on disk.
+
+    Files are memory-mapped and only the lines that contain one of the base
+    domains are decoded (a byte search skips everything else), so memory stays
+    flat whatever the file size; only the set of unique names grows. Gzip
+    dumps are streamed line by line with the same prefilter.
+    """
+    def __init__(self, domains: Iterable[str]):
+        self.index = SuffixIndex(domains)
+        self.needles = [domain.encode('ascii') for domain in self.index.domains]
+        self.names: Set[str] = set()
+        self.lines_parsed = 0
+        self.logger = logging.getLogger("CTLogImporter")
+
+    def import_file(self, path: str) -> Set[str]:
+        """Names under the base domains found in path (also accumulated in self.names)"""
+        found: Set[str] = set()
+        for line in self._candidate_lines(path):
+            for name in self._names_in(line):
+                if self.index.match(name):
+                    found.add(name)
+        self.logger.info(f"{len(found)} names imported from {path} ({self.lines_parsed} lines parsed)")
+        self.names.update(found)
+        return found
+
+    def import_files(self, paths: Iterable[str]) -> Set[str]:
+        found: Set[str] = set()
+        for path in paths:
+            try:
+                found |= self.import_file(path)
+            except OSError as e:
+                self.logger.error(f"Could not read CT log {path}: {e}")
+        return found
+
+    def _candidate_lines(self, path: str) -> Iterator[bytes]:
+        if not self.needles:
+            return
+        if path.endswith('.gz'):
+            with gzip.open(path, 'rb') as f:
+                for line in f:
+                    lowered = line.lower()
+                    if any(needle in lowered for needle in self.needles):
+                        yield line
+            return
+        if os.path.getsize(path) == 0:
+            return
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from self._mmap_lines(mm)
+
+    def _mmap_lines(self, mm: mmap.mmap) -> Iterator[bytes]:
+        """Lines holding any needle, each once, in file order (CT logs store names lowercase)"""
+        positions = {needle: mm.find(needle) for needle in self.needles}
+        while True:
+            live = [position for position in positions.values() if position != -1]
+            if not live:
+                return
+            hit = min(live)
+            start = mm.rfind(b'\n', 0, hit) + 1
+            end = mm.find(b'\n', hit)
+            end = len(mm) if end == -1 else end
+            yield mm[start:end]
+            for needle, position in positions.items():
+                if position != -1 and position < end:
+                    positions[needle] = mm.find(needle, end)
+
+    def _names_in(self, line: bytes) -> List[str]:
+        self.lines_parsed += 1
+        text = line.decode('utf-8', 'replace').strip()
+        if text.startswith('{'):
+            try:
+                values = list(_strings(json.loads(text)))
+            except ValueError:
+                values = [text]
+        else:
+            values = next(csv.reader([text]), [])
+        names = []
+        for value in values:
+            # crt.sh packs several SANs into name_value, newline separated
+            for part in _SPLIT.split(value):
+                name = normalize_name(part)
+                if name:
+                    names.append(name)
+        return names
+
+
+def import_ct_logs(paths: Iterable[str], domain: str) -> Set[str]:
+    """Subdomains of domain found in the given CT dumps"""
+    return CTLogImporter([domain]).import_files(paths)
@@ -0,0 +1,138 @@
+"""
+Endpoint pipeline
+Streams endpoints found while crawling to the vulnerability testers as they are discovered
+"""
+
+import asyncio
+import itertools
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+EndpointKey = Tuple[str, FrozenSet[str]]
+
+# Parameter names that usually end up in a query, a file path, a command or a redirect
+_VALUABLE_PARAMS = re.compile(
+    r'^(?:id|.*_id|uid|user(?:name)?|q|query|search|s|file(?:name)?|path|dir|page|doc|template|'
+    r'url|uri|redirect|next|return(?:_?url)?|dest|cmd|exec|command|host|ip|sort|order|cat(?:egory)?)$', re.I
+)
+SOURCE_PRIORITY = {'target': 1000, 'crawl': 5, 'js': 0}
+
+
+def endpoint_key(url: str) -> EndpointKey:
+    """/item?id=1 and /item?id=2 are the same endpoint for the testers: path plus parameter names"""
+    parsed = urlparse(url)
+    params = frozenset(name for name, _ in parse_qsl(parsed.query, keep_blank_values=True))
+    return f"{parsed.scheme}://{parsed.netloc}{parsed.path}", params
+
+
+def form_url(page_url: str, form: Dict[str, Any]) -> str:
+    """GET form as a URL with every named field set, '' for other methods or forms without fields"""
+    if form.get('method', 'GET').upper() != 'GET' or not form.get('fields'):
+        return ''
+    action = urljoin(page_url, form.get('action') or page_url).split('#')[0].split('?')[0]
+    return action + '?' + urlencode({name: '1' for name in form['fields']})
+
+
+def page_parameters(url: str, text: str) -> int:
+    """Query parameters of url plus named form fields of its page (at least 1): the targets known before the crawl"""
+    names = {name for name, _ in parse_qsl(urlparse(url).query, keep_blank_values=True)}
+    fields = 0
+    if text:
+        for form in BeautifulSoup(text, 'html.parser').find_all('form'):
+            fields += sum(1 for field in form.find_all(['input', 'textarea', 'select']) if field.get('name'))
+    return max(1, len(names) + fields)
+
+
+def js_endpoint_url(endpoint: Dict[str, Any]) -> str:
+    """GET endpoint found in JavaScript as a testable URL, '' when it cannot be tested as is"""
+    if endpoint['method'] != 'GET' or not endpoint['params'] or '{' in endpoint['path']:
+        return ''
+    return endpoint['url'].split('?')[0] + '?' + urlencode({param: '1' for param in endpoint['params']})
+
+
+def endpoint_priority(url: str, source: str = 'crawl') -> int:
+    """Value of testing an endpoint: the target first, then more (and more telling) parameters"""
+    names = {name for name, _ in parse_qsl(urlparse(url).query, keep_blank_values=True)}
+    return (SOURCE_PRIORITY.get(source, 0) + 10 * len(names)
+            + 5 * sum(1 for name in names if _VALUABLE_PARAMS.match(name)))
+
+
+def page_endpoints(url: str, links: List[Tuple[str, str]], forms: List[Dict[str, Any]]) -> List[str]:
+    """Testable URLs on a crawled page: the page itself and links with parameters, GET forms"""
+    urls = [link for link in [url] + [to_url for to_url, _ in links] if urlparse(link).query]
+    urls.extend(filter(None, (form_url(url, form) for form in forms)))
+    return urls
+
+
+class EndpointPipeline:
+    """
+    Queue between the crawler (producer) and the testers (consumers).
+
+    submit() is cheap and synchronous, so crawl workers and page observers
+    can call it inline; endpoints are deduplicated by path and parameter
+    names and capped per source. A fixed pool of workers runs the handler on
+    each endpoint as soon as it arrives, so testing overlaps the crawl.
+    With a priority function (url, source) -> number, waiting endpoints are
+    taken highest first instead of in arrival order.
+    """
+    def __init__(self, handler: Callable[[str, str], Awaitable[Any]], workers: int = 4,
+                 limits: Optional[Dict[str, int]] = None,
+                 priority: Optional[Callable[[str, str], float]] = None):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.limits = limits or {}
+        self.priority = priority
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self.seen: Set[EndpointKey] = set()
+        self.counts: Dict[str, int] = {}
+        self.stats = {'submitted': 0, 'tested': 0, 'duplicates': 0, 'over_limit': 0, 'errors': 0}
+        self._tasks: List[asyncio.Task] = []
+        self._logger = logging.getLogger(__name__)
+
+    def submit(self, url: str, source: str = 'crawl') -> bool:
+        """Queue an endpoint; False when it was already queued or the source hit its limit"""
+        key = endpoint_key(url)
+        if key in self.seen:
+            self.stats['duplicates'] += 1
+            return False
+        limit = self.limits.get(source)
+        if limit is not None and self.counts.get(source, 0) >= limit:
+            self.stats['over_limit'] += 1
+            return False
+        self.seen.add(key)
+        self.counts[source] = self.counts.get(source, 0) + 1
+        self.stats['submitted'] += 1
+        priority = self.priority(url, source) if self.priority else 0
+        self.queue.put_nowait((-priority, next(self._sequence), url, source))
+        return True
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self):
+        while True:
+            _, _, url, source = await self.queue.get()
+            try:
+                await self.handler(url, source)
+                self.stats['tested'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                self._logger.error(f"Testing {url} failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def join(self):
+        """Wait until every submitted endpoint has been tested"""
+        await self.queue.join()
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,140 @@
+"""
+Fingerprint Index
+Precompiled multi-pattern matcher over all technology signature tables
+"""
+
+import re
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from ..Tecnologias import TECNOLOGIAS
+    from ..cms_fingerprints import CMS_fingerprints
+    from ..js_frameworks import JSframeworks
+    from ..analytics_patterns import ANALYTICS_PATTERNS
+except ImportError:
+    from Tecnologias import TECNOLOGIAS
+    from cms_fingerprints import CMS_fingerprints
+    from js_frameworks import JSframeworks
+    from analytics_patterns import ANALYTICS_PATTERNS
+
+# source: which signature table the pattern comes from ('tech', 'cms', 'js', 'analytics')
+Fingerprint = namedtuple('Fingerprint', ['source', 'category', 'tech', 'confidence'])
+
+
+def _trie_regex(patterns: Iterable[str]) -> str:
+    """
+    Build a regex equivalent to an alternation of literal patterns, factored
+    as a trie so matching costs one pass regardless of the number of patterns.
+    At each position the longest pattern along the trie path wins.
+    """
+    trie: Dict = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class FingerprintIndex:
+    """
+    Case-insensitive substring index over fingerprint patterns.
+
+    All patterns are compiled into a single regex; a text is lowercased and
+    scanned once, and every matched pattern maps back to the fingerprints
+    (category, tech, confidence) that declared it.
+    """
+    def __init__(self):
+        self._fingerprints: Dict[str, List[Fingerprint]] = {}
+        self._regex: Optional[re.Pattern] = None
+        self._prefixes: Dict[str, List[str]] = {}
+
+    def add(self, pattern: str, source: str, category: str, tech: str, confidence: str = 'medium'):
+        pattern = pattern.lower()
+        if not pattern:
+            return
+        self._fingerprints.setdefault(pattern, []).append(Fingerprint(source, category, tech, confidence))
+        self._regex = None
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def without(self, excluded: Set[tuple]) -> 'FingerprintIndex':
+        """Copy of the index without the fingerprints of the given (category, tech) pairs."""
+        index = FingerprintIndex()
+        for pattern, fingerprints in self._fingerprints.items():
+            for fp in fingerprints:
+                if (fp.category, fp.tech) not in excluded:
+                    index.add(pattern, *fp)
+        return index
+
+    def compile(self):
+        patterns = list(self._fingerprints)
+        # Zero-width lookahead so overlapping matches at every position are reported
+        self._regex = re.compile('(?=(' + _trie_regex(patterns) + '))', re.S)
+        # A match is the longest pattern at its position; shorter patterns it starts with matched too
+        pattern_set = set(patterns)
+        self._prefixes = {
+            pattern: [pattern[:i] for i in range(1, len(pattern) + 1) if pattern[:i] in pattern_set]
+            for pattern in patterns
+        }
+
+    def scan(self, text: str) -> Set[str]:
+        """Return the set of patterns found in text."""
+        if self._regex is None:
+            self.compile()
+        found: Set[str] = set()
+        for match in self._regex.finditer(text.lower()):
+            longest = match.group(1)
+            if longest and longest not in found:
+                found.update(self._prefixes[longest])
+        return found
+
+    def fingerprints(self, patterns: Iterable[str], sources: Iterable[str] = None) -> List[Fingerprint]:
+        """Fingerprints declared by the given patterns, optionally limited to some sources."""
+        sources = set(sources) if sources else None
+        result = []
+        for pattern in patterns:
+            for fingerprint in self._fingerprints.get(pattern, ()):
+                if sources is None or fingerprint.source in sources:
+                    result.append(fingerprint)
+        return result
+
+    def match(self, text: str, sources: Iterable[str] = None) -> List[Fingerprint]:
+        """Scan text and return the fingerprints that matched."""
+        return self.fingerprints(self.scan(text), sources)
+
+
+def build_default_index() -> FingerprintIndex:
+    """Index over TECNOLOGIAS, CMS_fingerprints, JSframeworks and ANALYTICS_PATTERNS."""
+    index = FingerprintIndex()
+    for category, techs in TECNOLOGIAS.items():
+        confidence = 'high' if category in ('servers', 'languages') else 'medium'
+        for tech, patterns in techs.items():
+            for pattern in patterns:
+                index.add(pattern, 'tech', category, tech, confidence)
+    # CMS and JS tables map a pattern to the technology name
+    for pattern, cms in CMS_fingerprints.items():
+        index.add(pattern, 'cms', 'cms', cms, 'medium')
+    for pattern, framework in JSframeworks.items():
+        index.add(pattern, 'js', 'js_frameworks', framework, 'medium')
+    for tool, patterns in ANALYTICS_PATTERNS.items():
+        for pattern in patterns:
+            index.add(pattern, 'analytics', 'analytics', tool, 'high')
+    index.compile()
+    return index
+
+
+FINGERPRINT_INDEX = build_default_index()
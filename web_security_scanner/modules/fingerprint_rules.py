@@ -0,0 +1,379 @@
+"""
+Fingerprint Rules
+Structured technology rules with version extraction, scoping and implied technologies
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .fingerprint_index import FingerprintIndex
+
+RULES_FILE = Path(__file__).resolve().parent.parent / 'fingerprint_rules.json'
+# Per-user cache (not the shared temp dir): only the user running the scanner writes there
+DEFAULT_CACHE_DIR = Path(os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+                         or Path.home() / '.cache') / 'web_security_scanner'
+
+# Bump when the cached layout changes so stale cache files are ignored
+CACHE_FORMAT = 2
+
+# Keyed scopes match a named header / cookie / meta tag; text scopes match free text
+KEYED_SCOPES = ('headers', 'cookies', 'meta')
+TEXT_SCOPES = ('html', 'scriptSrc', 'url')
+
+# Literal anchors shorter than this are useless as a prefilter
+MIN_ANCHOR = 3
+
+# rule: technology name; key: header/cookie/meta name (lowercase) or ''
+RulePattern = namedtuple('RulePattern', ['rule', 'scope', 'key', 'regex', 'version', 'confidence', 'anchor'])
+
+_META_TAG = re.compile(r'<meta\s[^>]*>', re.I)
+_META_NAME = re.compile(r'''(?:name|property|http-equiv)\s*=\s*["']([^"']+)["']''', re.I)
+_META_CONTENT = re.compile(r'''content\s*=\s*["']([^"']*)["']''', re.I)
+_SCRIPT_SRC = re.compile(r'''<script[^>]+src\s*=\s*["']([^"']+)["']''', re.I)
+_SET_COOKIE_NAME = re.compile(r'(?:^|,\s*)([^=;,\s]+)=')
+
+_REGEX_META = set('.^$*+?{}[]()|')
+_OPTIONAL_QUANTIFIERS = ('?', '*', '{0')
+
+
+def parse_pattern(raw: str) -> Tuple[str, str, int]:
+    """Split 'regex\\;version:\\1\\;confidence:50' into (regex, version template, confidence)"""
+    parts = raw.split('\\;')
+    version, confidence = '', 100
+    for tag in parts[1:]:
+        key, _, value = tag.partition(':')
+        if key == 'version':
+            version = value
+        elif key == 'confidence':
+            confidence = int(value)
+    return parts[0], version, confidence
+
+
+def literal_anchor(regex: str) -> str:
+    """
+    Longest literal run every match of the regex must contain, lowercased.
+    Returns '' when no safe anchor exists (alternation at top level, too short).
+    """
+    depth, i = 0, 0
+    runs: List[str] = []
+    current: List[str] = []
+
+    def close_run():
+        if current:
+            runs.append(''.join(current))
+            current.clear()
+
+    while i < len(regex):
+        char = regex[i]
+        literal = None
+        if char == '\\' and i + 1 < len(regex):
+            escaped = regex[i + 1]
+            i += 2
+            if not escaped.isalnum():
+                literal = escaped
+        elif char == '[':
+            # Skip the character class, including escaped ']'
+            i += 1
+            while i < len(regex) and regex[i] != ']':
+                i += 2 if regex[i] == '\\' else 1
+            i += 1
+        elif char == '(':
+            depth += 1
+            i += 1
+        elif char == ')':
+            depth -= 1
+            i += 1
+        elif char == '|':
+            if depth == 0:
+                return ''
+            i += 1
+        elif char in _REGEX_META:
+            i += 1
+        else:
+            literal = char
+            i += 1
+
+        if literal is None or depth > 0:
+            close_run()
+            continue
+        if regex.startswith(_OPTIONAL_QUANTIFIERS, i):
+            # The literal itself is optional: it ends the run and is not part of it
+            close_run()
+            continue
+        current.append(literal)
+    close_run()
+
+    best = max(runs, key=len, default='')
+    return best.lower() if len(best) >= MIN_ANCHOR else ''
+
+
+@dataclass
+class RuleMatch:
+    """One technology found by the rules on a page"""
+    tech: str
+    category: str
+    confidence: int = 0
+    version: str = ''
+    evidence: List[str] = field(default_factory=list)
+    version_confidence: int = field(default=0, repr=False)
+
+    def add(self, confidence: int, version: str, evidence: str):
+        self.confidence = min(100, self.confidence + confidence)
+        # Versions from stronger patterns win; on a tie, the most specific one
+        if version and (confidence, len(version)) > (self.version_confidence, len(self.version)):
+            self.version = version
+            self.version_confidence = confidence
+        if evidence not in self.evidence:
+            self.evidence.append(evidence)
+
+    @property
+    def level(self) -> str:
+        """Confidence on the low/medium/high scale used by the detectors"""
+        if self.confidence >= 80:
+            return 'high'
+        if self.confidence >= 50:
+            return 'medium'
+        return 'low'
+
+
+class RuleSet:
+    """
+    Compiled rule set.
+
+    Every pattern with a literal anchor is registered in a FingerprintIndex per
+    text scope, so one pass over the page finds the candidate rules; only those
+    candidates run their full regex (compiled on first use). Keyed scopes are
+    looked up by header / cookie / meta name.
+    """
+    def __init__(self):
+        self.categories: Dict[str, str] = {}
+        self.implies: Dict[str, List[Tuple[str, int]]] = {}
+        self.patterns: List[RulePattern] = []
+        self._keyed: Dict[Tuple[str, str], List[int]] = {}
+        self._anchored: Dict[Tuple[str, str], List[int]] = {}
+        self._unanchored: Dict[str, List[int]] = {scope: [] for scope in TEXT_SCOPES}
+        self._indexes: Dict[str, FingerprintIndex] = {}
+        self._compiled: Dict[int, Optional[re.Pattern]] = {}
+
+    @classmethod
+    def from_rules(cls, rules: Dict[str, Dict]) -> 'RuleSet':
+        """Build step: parse every rule and compile the anchor indexes"""
+        ruleset = cls()
+        for tech, rule in rules.items():
+            ruleset.categories[tech] = rule.get('category', 'misc')
+            implied = [parse_pattern(name) for name in rule.get('implies', [])]
+            if implied:
+                ruleset.implies[tech] = [(name, confidence) for name, _, confidence in implied]
+            for scope in KEYED_SCOPES:
+                for key, raw in rule.get(scope, {}).items():
+                    ruleset._add(tech, scope, key.lower(), raw)
+            for scope in TEXT_SCOPES:
+                raws = rule.get(scope, [])
+                for raw in [raws] if isinstance(raws, str) else raws:
+                    ruleset._add(tech, scope, '', raw)
+        ruleset._build_indexes()
+        return ruleset
+
+    def to_cache(self) -> Dict:
+        """Parsed rules as plain JSON data (no code, unlike a pickle)"""
+        return {
+            'categories': self.categories,
+            'implies': self.implies,
+            'patterns': [list(pattern) for pattern in self.patterns],
+        }
+
+    @classmethod
+    def from_cache(cls, data: Dict) -> 'RuleSet':
+        """RuleSet from to_cache() data: patterns are already parsed and anchored"""
+        ruleset = cls()
+        ruleset.categories = {str(tech): str(category) for tech, category in data['categories'].items()}
+        ruleset.implies = {str(tech): [(str(name), int(confidence)) for name, confidence in implied]
+                           for tech, implied in data['implies'].items()}
+        for tech, scope, key, regex, version, confidence, anchor in data['patterns']:
+            if scope not in KEYED_SCOPES + TEXT_SCOPES:
+                raise ValueError(f"unknown scope {scope!r}")
+            ruleset._register(RulePattern(str(tech), scope, str(key), str(regex), str(version),
+                                          int(confidence), str(anchor)))
+        ruleset._build_indexes()
+        return ruleset
+
+    def _build_indexes(self):
+        for (scope, anchor) in self._anchored:
+            index = self._indexes.get(scope)
+            if index is None:
+                index = self._indexes[scope] = FingerprintIndex()
+            index.add(anchor, 'rules', scope, anchor)
+        for index in self._indexes.values():
+            index.compile()
+
+    def _add(self, tech: str, scope: str, key: str, raw: str):
+        regex, version, confidence = parse_pattern(raw)
+        anchor = literal_anchor(regex) if scope in TEXT_SCOPES else ''
+        self._register(RulePattern(tech, scope, key, regex, version, confidence, anchor))
+
+    def _register(self, pattern: RulePattern):
+        scope, key, anchor = pattern.scope, pattern.key, pattern.anchor
+        position = len(self.patterns)
+        self.patterns.append(pattern)
+        if scope in KEYED_SCOPES:
+            self._keyed.setdefault((scope, key), []).append(position)
+        elif anchor:
+            self._anchored.setdefault((scope, anchor), []).append(position)
+        else:
+            self._unanchored[scope].append(position)
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def _regex(self, position: int) -> Optional[re.Pattern]:
+        if position not in self._compiled:
+            try:
+                self._compiled[position] = re.compile(self.patterns[position].regex, re.I)
+            except re.error:
+                self._compiled[position] = None
+        return self._compiled[position]
+
+    def _candidates(self, scope: str, text: str) -> List[int]:
+        candidates = list(self._unanchored[scope])
+        index = self._indexes.get(scope)
+        if index is not None:
+            for anchor in index.scan(text):
+                candidates.extend(self._anchored[(scope, anchor)])
+        return candidates
+
+    def analyze(self, url: str = '', html: str = '', headers: dict = None, cookies: dict = None,
+                exclude: Iterable[str] = ()) -> Dict[str, RuleMatch]:
+        """
+        Match all rules against one page. Meta tags and script sources are
+        pulled out of the HTML; cookies default to the names in Set-Cookie.
+        """
+        exclude = set(exclude)
+        headers = {name.lower(): str(value) for name, value in (headers or {}).items()}
+        if cookies is None:
+            cookies = {name: '' for name in _SET_COOKIE_NAME.findall(headers.get('set-cookie', ''))}
+        matches: Dict[str, RuleMatch] = {}
+
+        def check(position: int, scope: str, text: str):
+            pattern = self.patterns[position]
+            if pattern.rule in exclude:
+                return
+            found = None
+            if pattern.regex:
+                regex = self._regex(position)
+                found = regex.search(text) if regex else None
+                if found is None:
+                    return
+            version = self._version(pattern.version, found)
+            match = matches.get(pattern.rule)
+            if match is None:
+                match = matches[pattern.rule] = RuleMatch(pattern.rule, self.categories[pattern.rule])
+            evidence = f"{scope} {pattern.key}".strip() if pattern.key else scope
+            match.add(pattern.confidence, version, evidence)
+
+        for name, value in headers.items():
+            for position in self._keyed.get(('headers', name), ()):
+                check(position, 'headers', value)
+        for name, value in cookies.items():
+            for (scope, key), positions in self._keyed.items():
+                # Cookie names are matched by prefix (e.g. phpbb3_ → phpbb3_sid)
+                if scope == 'cookies' and name.lower().startswith(key):
+                    for position in positions:
+                        check(position, 'cookies', str(value))
+        if html:
+            for tag in _META_TAG.findall(html):
+                name, content = _META_NAME.search(tag), _META_CONTENT.search(tag)
+                if name and content:
+                    for position in self._keyed.get(('meta', name.group(1).lower()), ()):
+                        check(position, 'meta', content.group(1))
+            for position in self._candidates('html', html):
+                check(position, 'html', html)
+            for src in _SCRIPT_SRC.findall(html):
+                for position in self._candidates('scriptSrc', src):
+                    check(position, 'scriptSrc', src)
+        if url:
+            for position in self._candidates('url', url):
+                check(position, 'url', url)
+
+        self._resolve_implies(matches, exclude)
+        return matches
+
+    @staticmethod
+    def _version(template: str, found: Optional[re.Match]) -> str:
+        if not template or found is None:
+            return ''
+
+        def group(match):
+            index = int(match.group(1))
+            if index > (found.re.groups or 0):
+                return ''
+            return found.group(index) or ''
+
+        return re.sub(r'\\(\d+)', group, template).strip()
+
+    def _resolve_implies(self, matches: Dict[str, RuleMatch], exclude: set):
+        pending = list(matches)
+        while pending:
+            tech = pending.pop()
+            parent = matches[tech]
+            for implied, confidence in self.implies.get(tech, ()):
+                if implied in exclude or implied not in self.categories:
+                    continue
+                if implied not in matches:
+                    matches[implied] = RuleMatch(implied, self.categories[implied])
+                    pending.append(implied)
+                match = matches[implied]
+                # An implied technology is never more certain than what implies it
+                match.confidence = max(match.confidence, min(parent.confidence, confidence))
+                if f"implied by {tech}" not in match.evidence:
+                    match.evidence.append(f"implied by {tech}")
+
+
+def load_rules(path: Path = RULES_FILE, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> RuleSet:
+    """
+    Load and compile a rules file. With a cache_dir the parsed rules are
+    saved as JSON next to a hash of the source, so later runs skip the parse
+    step. The cache holds data only and is rebuilt when it does not load.
+    """
+    path = Path(path)
+    source = path.read_bytes()
+    digest = hashlib.sha256(source + str(CACHE_FORMAT).encode()).hexdigest()[:16]
+    cache_file = Path(cache_dir) / f"fingerprint_rules-{digest}.json" if cache_dir else None
+
+    if cache_file is not None and cache_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') == CACHE_FORMAT and data.get('digest') == digest:
+                return RuleSet.from_cache(data)
+        except Exception:
+            pass
+
+    ruleset = RuleSet.from_rules(json.loads(source.decode('utf-8')))
+
+    if cache_file is not None:
+        try:
+            cache_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(dict(ruleset.to_cache(), format=CACHE_FORMAT, digest=digest), f)
+            tmp_file.replace(cache_file)
+        except OSError:
+            pass
+    return ruleset
+
+
+_default_rules: Optional[RuleSet] = None
+
+
+def default_rules() -> RuleSet:
+    """Shared RuleSet for the bundled rules file, loaded on first use"""
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = load_rules()
+    return _default_rules
@@ -0,0 +1,365 @@
+import asyncio
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+FrontierItem = Tuple[str, int]  # (url, depth)
+
+
+def shard_of(url: str, num_shards: int) -> int:
+    """Owner shard of a URL; stable across processes and hosts."""
+    if num_shards <= 1:
+        return 0
+    digest = hashlib.md5(url.encode('utf-8', 'ignore')).digest()
+    return int.from_bytes(digest[:8], 'big') % num_shards
+
+
+class FrontierBackend(ABC):
+    """
+    Shared crawl state: the seen-set, one work queue per shard, an in-flight
+    counter used to detect global termination, and the crawled pages.
+    Methods are synchronous (worker processes use them directly); async code
+    calls them through run(), which keeps SQLite / Redis I/O off the event loop.
+    """
+    # Backends that do I/O are called from a thread by run()
+    blocking = True
+
+    def __init__(self, num_shards: int = 1):
+        self.num_shards = num_shards
+
+    async def run(self, method, *args):
+        """Call one of this frontier's methods without blocking the event loop."""
+        if not self.blocking:
+            return method(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(method, *args))
+
+    def add_urls(self, items: List[FrontierItem]) -> int:
+        """Mark URLs as seen and queue the new ones on their owner shard. Returns how many were new."""
+        return self._add_urls([(url, depth, shard_of(url, self.num_shards)) for url, depth in items])
+
+    @abstractmethod
+    def _add_urls(self, items: List[Tuple[str, int, int]]) -> int:
+        pass
+
+    @abstractmethod
+    def pop(self, shard: int) -> Optional[FrontierItem]:
+        """Take the next URL of a shard and count it as in flight."""
+        pass
+
+    @abstractmethod
+    def done(self, url: str, page: Optional[Dict[str, Any]]):
+        """Store the crawled page (None on failure) and release the in-flight slot."""
+        pass
+
+    @abstractmethod
+    def requeue(self, url: str, depth: int):
+        """Release the in-flight slot of a URL that was not crawled and queue it again first."""
+        pass
+
+    @abstractmethod
+    def in_flight(self) -> int:
+        pass
+
+    @abstractmethod
+    def queued(self) -> int:
+        pass
+
+    def is_idle(self) -> bool:
+        """
+        True when no shard has work and nobody is processing a URL.
+        in_flight is read first: a worker pushes children before releasing its slot.
+        """
+        return self.in_flight() == 0 and self.queued() == 0
+
+    @abstractmethod
+    def iter_pages(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (url, page) for every page crawled by any worker."""
+        pass
+
+    def requeue_in_flight(self) -> int:
+        """
+        Put back URLs popped by a crawl that died before finishing them.
+        Only safe when no worker is running; returns how many were requeued.
+        """
+        return 0
+
+    @abstractmethod
+    def clear(self):
+        """Forget everything: seen URLs, queues, in-flight slots and pages (start a fresh crawl)."""
+        pass
+
+    def close(self):
+        pass
+
+
+class MemoryFrontier(FrontierBackend):
+    """In-process frontier; the default for single-process crawls."""
+    blocking = False
+
+    def __init__(self, num_shards: int = 1):
+        super().__init__(num_shards)
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._queues = [deque() for _ in range(num_shards)]
+        self._in_flight = 0
+        self._pages: Dict[str, Dict[str, Any]] = {}
+
+    def _add_urls(self, items):
+        added = 0
+        with self._lock:
+            for url, depth, shard in items:
+                if url not in self._seen:
+                    self._seen.add(url)
+                    self._queues[shard].append((url, depth))
+                    added += 1
+        return added
+
+    def pop(self, shard):
+        with self._lock:
+            if not self._queues[shard]:
+                return None
+            self._in_flight += 1
+            return self._queues[shard].popleft()
+
+    def done(self, url, page):
+        with self._lock:
+            if page is not None:
+                self._pages[url] = page
+            self._in_flight -= 1
+
+    def requeue(self, url, depth):
+        with self._lock:
+            self._queues[shard_of(url, self.num_shards)].appendleft((url, depth))
+            self._in_flight -= 1
+
+    def in_flight(self):
+        return self._in_flight
+
+    def queued(self):
+        return sum(len(q) for q in self._queues)
+
+    def iter_pages(self):
+        return iter(list(self._pages.items()))
+
+    def clear(self):
+        with self._lock:
+            self._seen.clear()
+            for queue in self._queues:
+                queue.clear()
+            self._in_flight = 0
+            self._pages.clear()
+
+
+class SQLiteFrontier(FrontierBackend):
+    """
+    Frontier in a SQLite file, shared by worker processes on the same host.
+    Every operation is a single short transaction; the lock serializes the
+    threads run() calls it from.
+    """
+    def __init__(self, path: str, num_shards: int = 1):
+        super().__init__(num_shards)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS frontier_seen (url TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS frontier_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, shard INTEGER, url TEXT, depth INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS frontier_queue_shard ON frontier_queue (shard, id);
+            CREATE TABLE IF NOT EXISTS frontier_state (key TEXT PRIMARY KEY, value INTEGER);
+            INSERT OR IGNORE INTO frontier_state VALUES ('in_flight', 0);
+            CREATE TABLE IF NOT EXISTS frontier_pages (url TEXT PRIMARY KEY, page TEXT);
+            CREATE TABLE IF NOT EXISTS frontier_in_flight (url TEXT PRIMARY KEY, shard INTEGER, depth INTEGER);
+        """)
+
+    def _transaction(self, body):
+        """Run body(conn) in one IMMEDIATE transaction, holding the lock."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = body(self._conn)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _add_urls(self, items):
+        def body(conn):
+            added = 0
+            for url, depth, shard in items:
+                cursor = conn.execute("INSERT OR IGNORE INTO frontier_seen VALUES (?)", (url,))
+                if cursor.rowcount:
+                    conn.execute("INSERT INTO frontier_queue (shard, url, depth) VALUES (?, ?, ?)", (shard, url, depth))
+                    added += 1
+            return added
+        return self._transaction(body)
+
+    def pop(self, shard):
+        def body(conn):
+            row = conn.execute(
+                "SELECT id, url, depth FROM frontier_queue WHERE shard = ? ORDER BY id LIMIT 1", (shard,)
+            ).fetchone()
+            if row:
+                conn.execute("DELETE FROM frontier_queue WHERE id = ?", (row[0],))
+                conn.execute("INSERT OR REPLACE INTO frontier_in_flight VALUES (?, ?, ?)", (row[1], shard, row[2]))
+                conn.execute("UPDATE frontier_state SET value = value + 1 WHERE key = 'in_flight'")
+            return row
+        row = self._transaction(body)
+        return (row[1], row[2]) if row else None
+
+    def done(self, url, page):
+        # Serialized before the transaction: a page that cannot be stored fails without touching the slot
+        data = json.dumps(page) if page is not None else None
+
+        def body(conn):
+            if data is not None:
+                conn.execute("INSERT OR REPLACE INTO frontier_pages VALUES (?, ?)", (url, data))
+            conn.execute("DELETE FROM frontier_in_flight WHERE url = ?", (url,))
+            conn.execute("UPDATE frontier_state SET value = value - 1 WHERE key = 'in_flight'")
+        self._transaction(body)
+
+    def requeue(self, url, depth):
+        def body(conn):
+            conn.execute("DELETE FROM frontier_in_flight WHERE url = ?", (url,))
+            # Negative id: ahead of everything queued on the shard
+            first = conn.execute("SELECT MIN(id) FROM frontier_queue").fetchone()[0]
+            conn.execute("INSERT INTO frontier_queue (id, shard, url, depth) VALUES (?, ?, ?, ?)",
+                         (min(first or 0, 0) - 1, shard_of(url, self.num_shards), url, depth))
+            conn.execute("UPDATE frontier_state SET value = value - 1 WHERE key = 'in_flight'")
+        self._transaction(body)
+
+    def in_flight(self):
+        return self._query("SELECT value FROM frontier_state WHERE key = 'in_flight'")[0][0]
+
+    def queued(self):
+        return self._query("SELECT COUNT(*) FROM frontier_queue")[0][0]
+
+    def iter_pages(self):
+        for url, page in self._query("SELECT url, page FROM frontier_pages"):
+            yield url, json.loads(page)
+
+    def requeue_in_flight(self):
+        def body(conn):
+            rows = conn.execute("SELECT shard, url, depth FROM frontier_in_flight").fetchall()
+            conn.executemany("INSERT INTO frontier_queue (shard, url, depth) VALUES (?, ?, ?)", rows)
+            conn.execute("DELETE FROM frontier_in_flight")
+            conn.execute("UPDATE frontier_state SET value = 0 WHERE key = 'in_flight'")
+            return len(rows)
+        return self._transaction(body)
+
+    def clear(self):
+        def body(conn):
+            for table in ('frontier_seen', 'frontier_queue', 'frontier_pages', 'frontier_in_flight'):
+                conn.execute(f"DELETE FROM {table}")
+            conn.execute("UPDATE frontier_state SET value = 0 WHERE key = 'in_flight'")
+        self._transaction(body)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisFrontier(FrontierBackend):
+    """
+    Frontier in a Redis-compatible store, for workers spread over several hosts.
+    Accepts any client exposing the redis-py API (redis.Redis, fakeredis, ...).
+    """
+    def __init__(self, client, num_shards: int = 1, namespace: str = 'wss:frontier'):
+        super().__init__(num_shards)
+        self._redis = client
+        self._ns = namespace
+
+    @classmethod
+    def from_url(cls, url: str, num_shards: int = 1, namespace: str = 'wss:frontier') -> 'RedisFrontier':
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("RedisFrontier requires the 'redis' package: pip install redis")
+        return cls(redis.Redis.from_url(url), num_shards, namespace)
+
+    def _key(self, *parts) -> str:
+        return ':'.join((self._ns,) + tuple(str(p) for p in parts))
+
+    def _add_urls(self, items):
+        if not items:
+            return 0
+        pipe = self._redis.pipeline()
+        for url, _, _ in items:
+            pipe.sadd(self._key('seen'), url)
+        is_new = pipe.execute()
+        pipe = self._redis.pipeline()
+        added = 0
+        for (url, depth, shard), new in zip(items, is_new):
+            if new:
+                pipe.lpush(self._key('queue', shard), json.dumps([url, depth]))
+                added += 1
+        pipe.execute()
+        return added
+
+    def pop(self, shard):
+        # Claim the slot before popping so an empty queue never hides in-flight work
+        self._redis.incr(self._key('in_flight'))
+        raw = self._redis.rpop(self._key('queue', shard))
+        if raw is None:
+            self._redis.decr(self._key('in_flight'))
+            return None
+        url, depth = json.loads(raw)
+        return url, depth
+
+    def done(self, url, page):
+        if page is not None:
+            self._redis.hset(self._key('pages'), url, json.dumps(page))
+        self._redis.decr(self._key('in_flight'))
+
+    def requeue(self, url, depth):
+        # Popped from the right end: pushing there makes it the next one out
+        self._redis.rpush(self._key('queue', shard_of(url, self.num_shards)), json.dumps([url, depth]))
+        self._redis.decr(self._key('in_flight'))
+
+    def in_flight(self):
+        return int(self._redis.get(self._key('in_flight')) or 0)
+
+    def queued(self):
+        pipe = self._redis.pipeline()
+        for shard in range(self.num_shards):
+            pipe.llen(self._key('queue', shard))
+        return sum(pipe.execute())
+
+    def iter_pages(self):
+        for url, page in self._redis.hscan_iter(self._key('pages')):
+            if isinstance(url, bytes):
+                url = url.decode('utf-8')
+            yield url, json.loads(page)
+
+    def clear(self):
+        """Remove every key of this crawl (start a fresh one under the same namespace)."""
+        keys = [self._key('seen'), self._key('in_flight'), self._key('pages')]
+        keys += [self._key('queue', shard) for shard in range(self.num_shards)]
+        self._redis.delete(*keys)
+
+
+def frontier_from_spec(spec: str, num_shards: int = 1) -> FrontierBackend:
+    """
+    Build a frontier from a short spec string:
+    'memory', 'sqlite:///path/to/frontier.db' or 'redis://host:6379/0'.
+    """
+    if not spec or spec == 'memory':
+        return MemoryFrontier(num_shards)
+    if spec.startswith('sqlite:///'):
+        return SQLiteFrontier(spec[len('sqlite:///'):], num_shards)
+    if spec.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisFrontier.from_url(spec, num_shards)
+    raise ValueError(f"Unknown frontier spec: {spec}")
@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse, parse_qsl
+
+from bs4 import BeautifulSoup
+
+from ..core.scanner_core_async import AsyncScannerCore
+from ..events.event_emitter import ScanEventEmitter, ScanEventType
+
+HTTP_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS')
+
+# Bundles larger than this are skipped (minified vendor blobs, source maps inlined, ...)
+MAX_BUNDLE_SIZE = 5 * 1024 * 1024
+
+_URL = r"""(?P<q>['"`])(?P<url>(?:\\.|(?!(?P=q))[^\\\n]){1,400})(?P=q)"""
+
+_CALL_PATTERNS = [
+    # fetch('/api/x', { method: 'POST' })
+    ('fetch', re.compile(
+        r"\bfetch\(\s*" + _URL + r"(?:\s*,\s*\{[^{}]{0,300}?\bmethod\s*:\s*['\"](?P<method>\w+)['\"])?")),
+    # axios('/x'), axios.get('/x'), axios.post('/x', ...)
+    ('axios', re.compile(
+        r"\baxios(?:\.(?P<method>get|post|put|delete|patch|head|options))?\(\s*" + _URL, re.I)),
+    # $.get('/x'), $.post('/x'), $.getJSON('/x'), jQuery.ajax('/x')
+    ('jquery', re.compile(r"(?:\$|\bjQuery)\.(?P<method>get|post|getJSON|ajax)\(\s*" + _URL)),
+    # xhr.open('POST', '/x')
+    ('xhr', re.compile(
+        r"\.open\(\s*['\"](?P<method>GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS)['\"]\s*,\s*" + _URL, re.I)),
+    # url: '/x' inside $.ajax / axios config objects
+    ('config', re.compile(r"\burl\s*:\s*" + _URL)),
+]
+
+# Client-side route tables (Vue/Angular/React Router)
+_ROUTE_PATTERN = re.compile(r"""\bpath\s*[:=]\s*(['"])(/?[A-Za-z0-9_\-./:*]*)\1""")
+
+# Any string literal that looks like an absolute path or a URL
+_PATH_LITERAL = re.compile(
+    r"""(['"`])((?:https?:)?//?[A-Za-z0-9_\-.~%]+(?:/[A-Za-z0-9_\-.~%{}$:@]*)*(?:\?[^\s'"`<>\\]*)?)\1"""
+)
+
+# Keys of `params: {...}` / `data: {...}` objects next to a call
+_PARAMS_OBJECT = re.compile(r"\b(?:params|data|body)\s*:\s*\{([^{}]{0,400})\}")
+_OBJECT_KEY = re.compile(r"""(?:^|,)\s*['"]?([A-Za-z_][A-Za-z0-9_\-]*)['"]?\s*(?::|,|$)""")
+_METHOD_KEY = re.compile(r"""\b(?:method|type)\s*:\s*['"](\w+)['"]""")
+_TEMPLATE_EXPR = re.compile(r"\$\{\s*([^}]*)\}")
+_ROUTE_PARAM = re.compile(r"(?:^|/):([A-Za-z_][A-Za-z0-9_]*)")
+
+_STATIC_EXTENSIONS = (
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp', '.css', '.woff', '.woff2', '.ttf',
+    '.eot', '.map', '.mp4', '.mp3', '.webm', '.js', '.mjs'
+)
+
+
+@dataclass
+class JSEndpoint:
+    """An endpoint referenced from JavaScript."""
+    path: str
+    method: str = 'GET'
+    kind: str = 'string'
+    params: Set[str] = field(default_factory=set)
+    sources: Set[str] = field(default_factory=set)
+
+    def to_dict(self, base_url: str) -> Dict[str, Any]:
+        return {
+            'url': urljoin(base_url, self.path),
+            'path': self.path,
+            'method': self.method,
+            'kind': self.kind,
+            'params': sorted(self.params),
+            'sources': sorted(self.sources),
+        }
+
+
+def _clean_path(raw: str) -> Tuple[str, Set[str]]:
+    """Normalize template expressions to {name} and collect parameter names."""
+    params: Set[str] = set()
+
+    def template(match):
+        name = re.sub(r'\W+', '_', match.group(1).split('.')[-1]).strip('_') or 'param'
+        params.add(name)
+        return '{' + name + '}'
+
+    path = _TEMPLATE_EXPR.sub(template, raw.strip())
+    path, _, query = path.partition('?')
+    for key, _ in parse_qsl(query, keep_blank_values=True):
+        params.add(key)
+    for key in re.findall(r'[?&]([A-Za-z_][A-Za-z0-9_\-]*)=', '?' + query):
+        params.add(key)
+    params.update(_ROUTE_PARAM.findall(path))
+    return path, params
+
+
+def _looks_like_endpoint(path: str) -> bool:
+    if not path or len(path) < 2 or ' ' in path:
+        return False
+    bare = path.split('?')[0].lower()
+    if bare.endswith(_STATIC_EXTENSIONS):
+        return False
+    if bare.startswith(('http://', 'https://', '//')):
+        return True
+    # Needs at least one real segment: '/', '//', '/*' are not endpoints
+    return bare.startswith('/') and re.search(r'[A-Za-z0-9]', bare) is not None
+
+
+def analyze_source(text: str) -> List[JSEndpoint]:
+    """
+    Scan JavaScript source for endpoints: fetch/axios/jQuery/XHR calls, route
+    tables and path-like string literals. Pure function of the text.
+    """
+    found: Dict[Tuple[str, str], JSEndpoint] = {}
+    call_spans: Set[int] = set()
+
+    def add(raw: str, method: str, kind: str, extra_params: Set[str] = None, position: int = -1):
+        path, params = _clean_path(raw)
+        if not _looks_like_endpoint(path):
+            return
+        method = (method or 'GET').upper()
+        if method not in HTTP_METHODS:
+            method = 'GET'
+        key = (method, path)
+        endpoint = found.get(key)
+        if endpoint is None:
+            endpoint = found[key] = JSEndpoint(path=path, method=method, kind=kind)
+        endpoint.params.update(params)
+        if extra_params:
+            endpoint.params.update(extra_params)
+        if position >= 0:
+            call_spans.add(position)
+
+    def call_window(end: int) -> Tuple[int, int]:
+        # The rest of the statement: up to the next ';' (minified code has no newlines)
+        stop = text.find(';', end, end + 500)
+        return end, stop if stop >= 0 else min(len(text), end + 500)
+
+    def nearby_params(end: int) -> Set[str]:
+        match = _PARAMS_OBJECT.search(text, *call_window(end))
+        return {key for key in _OBJECT_KEY.findall(match.group(1)) if key} if match else set()
+
+    for kind, pattern in _CALL_PATTERNS:
+        if kind == 'fetch' and 'fetch(' not in text:
+            continue
+        if kind == 'axios' and 'axios' not in text:
+            continue
+        if kind == 'xhr' and '.open(' not in text:
+            continue
+        for match in pattern.finditer(text):
+            method = match.groupdict().get('method')
+            if kind == 'jquery' and method in ('ajax', 'getJSON'):
+                method = None
+            if kind == 'config':
+                # $.ajax({ url: '/x', type: 'POST' }) / axios({ url: '/x', method: 'put' })
+                method_match = _METHOD_KEY.search(text, *call_window(match.end()))
+                method = method_match.group(1) if method_match else None
+            add(match.group('url'), method, kind, nearby_params(match.end()), match.start('url'))
+
+    for match in _ROUTE_PATTERN.finditer(text):
+        route = match.group(2)
+        if route and route not in ('*', '**'):
+            add(route if route.startswith('/') else '/' + route, 'GET', 'route')
+
+    for match in _PATH_LITERAL.finditer(text):
+        if match.start(2) in call_spans:
+            continue
+        add(match.group(2), 'GET', 'string')
+
+    return list(found.values())
+
+
+class JSEndpointExtractor:
+    """
+    Finds API endpoints in the JavaScript referenced by crawled pages.
+
+    Bundles are downloaded concurrently, each URL once; analysis results are
+    cached by content hash, so the same vendor bundle served under several
+    URLs is only scanned once.
+    """
+    def __init__(self, scanner_core: AsyncScannerCore, event_emitter: ScanEventEmitter = None,
+                 include_external: bool = False, max_bundle_size: int = MAX_BUNDLE_SIZE):
+        self.scanner = scanner_core
+        self.event_emitter = event_emitter
+        self.include_external = include_external
+        self.max_bundle_size = max_bundle_size
+        self.logger = logging.getLogger("JSEndpointExtractor")
+
+        self.endpoints: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._analysis_cache: Dict[str, List[JSEndpoint]] = {}
+        self._bundle_hashes: Dict[str, Optional[str]] = {}
+        self._downloads: Dict[str, asyncio.Task] = {}
+
+    async def analyze_page(self, page_url: str, html: str) -> List[Dict[str, Any]]:
+        """Analyze inline and referenced scripts of a page; returns the endpoints found."""
+        sources, inline = self._collect_scripts(page_url, html)
+        bundle_hashes = await asyncio.gather(*[self._bundle_hash(src) for src in sources])
+
+        results = []
+        for src, digest in zip(sources, bundle_hashes):
+            if digest:
+                results.extend((endpoint, src) for endpoint in self._analysis_cache[digest])
+        for script in inline:
+            results.extend((endpoint, page_url) for endpoint in self._analyze_text(script))
+
+        page_endpoints = []
+        for endpoint, source in results:
+            data = endpoint.to_dict(page_url)
+            if not self._is_in_scope(page_url, data['url']):
+                continue
+            data['sources'] = [source]
+            page_endpoints.append(data)
+            await self._merge(data)
+        return page_endpoints
+
+    def _collect_scripts(self, page_url: str, html: str) -> Tuple[List[str], List[str]]:
+        soup = BeautifulSoup(html, 'html.parser')
+        sources, inline = [], []
+        for script in soup.find_all('script'):
+            src = script.get('src')
+            if src:
+                absolute = urljoin(page_url, src).split('#')[0]
+                if (self.include_external or self._is_in_scope(page_url, absolute)) and absolute not in sources:
+                    sources.append(absolute)
+            elif script.string:
+                inline.append(script.string)
+        return sources, inline
+
+    @staticmethod
+    def _is_in_scope(page_url: str, url: str) -> bool:
+        host = urlparse(url).netloc
+        return not host or host == urlparse(page_url).netloc
+
+    def _analyze_text(self, text: str) -> List[JSEndpoint]:
+        digest = hashlib.md5(text.encode('utf-8', 'ignore')).hexdigest()
+        if digest not in self._analysis_cache:
+            self._analysis_cache[digest] = analyze_source(text)
+        return self._analysis_cache[digest]
+
+    async def _bundle_hash(self, src: str) -> Optional[str]:
+        if src in self._bundle_hashes:
+            return self._bundle_hashes[src]
+        # Pages sharing a bundle wait on the same download
+        if src not in self._downloads:
+            self._downloads[src] = asyncio.ensure_future(self._download(src))
+        return await asyncio.shield(self._downloads[src])
+
+    async def _download(self, src: str) -> Optional[str]:
+        digest = None
+        try:
+            response = await self.scanner.request("GET", src)
+            text = response.get('text', '')
+            if response.get('status_code') == 200 and text and len(text) <= self.max_bundle_size:
+                digest = hashlib.md5(text.encode('utf-8', 'ignore')).hexdigest()
+                if digest not in self._analysis_cache:
+                    self._analysis_cache[digest] = analyze_source(text)
+                else:
+                    self.logger.debug(f"Bundle already analyzed: {src}")
+        except Exception as e:
+            self.logger.debug(f"Error downloading {src}: {e}")
+        self._bundle_hashes[src] = digest
+        return digest
+
+    async def _merge(self, data: Dict[str, Any]):
+        key = (data['method'], data['url'])
+        existing = self.endpoints.get(key)
+        if existing is None:
+            self.endpoints[key] = data
+            self.logger.info(f"JS endpoint: {data['method']} {data['url']}")
+            if self.event_emitter:
+                await self.event_emitter.emit(ScanEventType.ENDPOINT_DISCOVERED, endpoint=data)
+            return
+        existing['params'] = sorted(set(existing['params']) | set(data['params']))
+        existing['sources'] = sorted(set(existing['sources']) | set(data['sources']))
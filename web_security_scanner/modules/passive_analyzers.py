@@ -0,0 +1,205 @@
+"""
+Passive analyzers
+Checks that run on responses the crawl and the testers already fetched
+"""
+
+import re
+from typing import Any, Dict, List, Set, Tuple
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from ..core.passive_bus import PassiveAnalyzer
+from .cookie_analyzer import CookieAnalyzer, set_cookie_headers
+from ..utils.i18n import i18n
+
+SECURITY_HEADERS = {
+    "X-Frame-Options": "Clickjacking protection",
+    "X-Content-Type-Options": "MIME sniffing protection",
+    "Content-Security-Policy": "Content Security Policy",
+    "Strict-Transport-Security": "HSTS (SSL/TLS security)",
+    "X-XSS-Protection": "XSS Protection"
+}
+INFO_HEADERS = ["Server", "X-Powered-By", "X-AspNet-Version"]
+
+# Common CSRF token field names
+CSRF_NAMES = [
+    'csrf', 'csrf_token', 'csrftoken', 'csrf-token', '_csrf', '_csrf_token', 'authenticity_token',
+    'token', 'xsrf', 'xsrf_token', '__requestverificationtoken', 'anti-csrf-token',
+]
+STATE_CHANGING_METHODS = {'POST', 'PUT', 'DELETE', 'PATCH'}
+# Field names of forms that change account or business state (a search or contact form does not)
+STATE_FIELDS = re.compile(r'mail|pass|user|account|role|admin|amount|price|qty|quantity|transfer|'
+                          r'address|phone|delete|remove|status|permission', re.I)
+
+_CSP_HOST = re.compile(r'https?://([a-zA-Z0-9.-]+)')
+
+
+def lower_headers(response: Dict[str, Any]) -> Dict[str, str]:
+    return {str(name).lower(): str(value) for name, value in (response.get('headers') or {}).items()}
+
+
+def is_html(response: Dict[str, Any]) -> bool:
+    content_type = lower_headers(response).get('content-type', '')
+    return not content_type or 'html' in content_type
+
+
+def has_csrf_token(form, page=None) -> bool:
+    """True if a form (or the page's meta tags, as Rails / Laravel do) carries a CSRF token"""
+    for input_field in form.find_all('input'):
+        name = (input_field.get('name') or '').lower()
+        field_id = (input_field.get('id') or '').lower()
+        if any(csrf_name in name or csrf_name in field_id for csrf_name in CSRF_NAMES):
+            return True
+    for meta in (page or form).find_all('meta'):
+        name = (meta.get('name') or '').lower()
+        if any(csrf_name in name for csrf_name in CSRF_NAMES):
+            return True
+    return False
+
+
+class SecurityHeadersAnalyzer(PassiveAnalyzer):
+    """Missing security headers and technology-revealing headers, once per host"""
+    name = 'security_headers'
+    scope = 'host'
+
+    def wants(self, response: Dict[str, Any]) -> bool:
+        return response.get('status_code') == 200 and is_html(response)
+
+    def analyze(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        url = response.get('url', '')
+        headers = response.get('headers', {})
+        names = {name.lower() for name in headers}
+        findings = []
+        for header in SECURITY_HEADERS:
+            if header.lower() not in names:
+                findings.append({
+                    "type": i18n.get('vulnerabilities.missing_header'),
+                    "url": url,
+                    "severity": "Low",
+                    "payload": header,
+                    "evidence": i18n.get('vulnerabilities.evidence.missing_header', header=header)
+                })
+        info_headers = {header.lower() for header in INFO_HEADERS}
+        for h_name, h_val in headers.items():
+            if h_name.lower() in info_headers:
+                findings.append({
+                    "type": i18n.get('vulnerabilities.info_disclosure'),
+                    "url": url,
+                    "severity": "Info",
+                    "payload": h_name,
+                    "evidence": i18n.get('vulnerabilities.evidence.info_header', value=h_val)
+                })
+        return findings
+
+
+class CookieFlagsAnalyzer(PassiveAnalyzer):
+    """Cookies set without Secure (over HTTPS) or, for session cookies, HttpOnly / SameSite; also samples session ids"""
+    name = 'cookie_flags'
+    scope = 'path'
+
+    def __init__(self, cookies: CookieAnalyzer = None):
+        self.cookies = cookies or CookieAnalyzer()
+        self.reported: Set[Tuple[str, str]] = set()
+
+    def wants(self, response: Dict[str, Any]) -> bool:
+        return bool(set_cookie_headers(response))
+
+    def analyze(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        url = response.get('url', '')
+        parsed = urlparse(url)
+        findings = []
+        for cookie in self.cookies.observe(url, response):
+            if cookie.deleted or (parsed.netloc, cookie.name) in self.reported:
+                continue
+            missing = cookie.missing_flags(parsed.scheme == 'https')
+            if not missing:
+                continue
+            self.reported.add((parsed.netloc, cookie.name))
+            findings.append({
+                "type": i18n.get('vulnerabilities.insecure_cookie'),
+                "url": url,
+                "severity": "Medium" if 'HttpOnly' in missing else "Low",
+                "payload": cookie.name,
+                "evidence": i18n.get('vulnerabilities.evidence.cookie_flags', name=cookie.name, flags=', '.join(missing))
+            })
+        return findings
+
+
+class CsrfTokenAnalyzer(PassiveAnalyzer):
+    """
+    State-changing forms without a CSRF token, once per form action.
+
+    Severity follows what a forged request could do: High for password forms
+    or when the host issued a session cookie (the victim has something to
+    lose), Medium for forms with hidden or state-changing fields, Low for the
+    rest (search, newsletter or contact forms posted anonymously).
+    """
+    name = 'csrf_token'
+    scope = 'path'
+
+    def __init__(self, cookies: CookieAnalyzer = None):
+        self.cookies = cookies
+        self.reported: Set[str] = set()
+
+    def _severity(self, form, url: str) -> str:
+        fields = form.find_all(['input', 'textarea', 'select'])
+        host = urlparse(url).netloc.lower()
+        if any((field.get('type') or '').lower() == 'password' for field in fields):
+            return "High"
+        if self.cookies is not None and any(key[0] == host for key in self.cookies.session_cookies()):
+            return "High"
+        if any((field.get('type') or '').lower() == 'hidden' or STATE_FIELDS.search(field.get('name') or '')
+               for field in fields):
+            return "Medium"
+        return "Low"
+
+    def wants(self, response: Dict[str, Any]) -> bool:
+        return (response.get('status_code') == 200 and is_html(response)
+                and '<form' in response.get('text', '').lower())
+
+    def analyze(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        url = response.get('url', '')
+        soup = BeautifulSoup(response.get('text', ''), 'html.parser')
+        findings = []
+        for form in soup.find_all('form'):
+            method = (form.get('method') or 'GET').upper()
+            if method not in STATE_CHANGING_METHODS:
+                continue
+            action = urljoin(url, form.get('action') or url).split('#')[0]
+            if action in self.reported or has_csrf_token(form, soup):
+                continue
+            self.reported.add(action)
+            findings.append({
+                "type": i18n.get('vulnerabilities.csrf'),
+                "url": action,
+                "severity": self._severity(form, url),
+                "payload": "N/A",
+                "evidence": i18n.get('vulnerabilities.evidence.csrf_token', action=action)
+            })
+        return findings
+
+
+class CspDomainAnalyzer(PassiveAnalyzer):
+    """Collects the hosts named in Content-Security-Policy headers (subdomain discovery, no findings)"""
+    name = 'csp_domains'
+    scope = 'path'
+
+    def __init__(self):
+        self.domains: Set[str] = set()
+
+    def wants(self, response: Dict[str, Any]) -> bool:
+        return 'content-security-policy' in lower_headers(response)
+
+    def analyze(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        csp = lower_headers(response)['content-security-policy']
+        self.domains.update(domain.lower() for domain in _CSP_HOST.findall(csp))
+        return []
+
+    def subdomains_of(self, base_domain: str) -> Set[str]:
+        return {domain for domain in self.domains if base_domain in domain}
+
+
+def default_analyzers(cookies: CookieAnalyzer = None) -> List[PassiveAnalyzer]:
+    cookies = cookies or CookieAnalyzer()
+    return [SecurityHeadersAnalyzer(), CookieFlagsAnalyzer(cookies), CsrfTokenAnalyzer(cookies), CspDomainAnalyzer()]
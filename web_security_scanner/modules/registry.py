@@ -1,11 +1,20 @@
 import importlib
-import pkgutil
-import inspect
 import logging
-import os
 from typing import List, Type
 from .vulnerability_testers.base_tester_async import VulnerabilityTester
 
+# Async tester modules and the class each one provides. Discovery imports exactly these,
+# instead of every module in vulnerability_testers (the sync testers and their dependencies).
+# A new async tester is added here.
+TESTER_MANIFEST = {
+    'command_injection_async': 'CommandInjectionTester',
+    'header_security_async': 'HeaderSecurityTester',
+    'open_redirect_async': 'OpenRedirectTester',
+    'path_traversal_async': 'PathTraversalTester',
+    'sql_injection_async': 'SQLInjectionTester',
+    'xss_tester_async': 'XSSTester',
+}
+
 class TesterRegistry:
     """
     Registry for vulnerability testers.
@@ -29,24 +38,14 @@ class TesterRegistry:
     @classmethod
     def discover_testers(cls):
         """
-        Automatically discover and register testers from the vulnerability_testers package.
+        Register the testers listed in TESTER_MANIFEST, importing only their modules.
         """
-        # Import the package containing testers
-        from . import vulnerability_testers
-        
-        package_path = os.path.dirname(vulnerability_testers.__file__)
-        
-        for _, name, _ in pkgutil.iter_modules([package_path]):
-            if name.startswith('base_tester'):
-                continue
-                
+        for module_name, class_name in TESTER_MANIFEST.items():
             try:
-                module = importlib.import_module(f".vulnerability_testers.{name}", package="web_security_scanner.modules")
-                
-                for name, obj in inspect.getmembers(module):
-                    if (inspect.isclass(obj) and 
-                        issubclass(obj, VulnerabilityTester) and 
-                        obj is not VulnerabilityTester):
-                        cls.register(obj)
+                module = importlib.import_module(f".vulnerability_testers.{module_name}", package=__package__)
+                tester_class = getattr(module, class_name)
+                if not issubclass(tester_class, VulnerabilityTester):
+                    raise TypeError(f"{class_name} is not a VulnerabilityTester")
+                cls.register(tester_class)
             except Exception as e:
-                cls._logger.error(f"Failed to load module {name}: {e}")
+                cls._logger.error(f"Failed to load tester {module_name}.{class_name}: {e}")
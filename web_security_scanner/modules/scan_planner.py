@@ -0,0 +1,253 @@
+"""
+Scan Planner
+Prunes testers and payload families using the detected technologies before any attack traffic is sent
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+MASTER_PAYLOADS = Path(__file__).resolve().parent.parent / 'PAYLOAD' / 'payloads_master.json'
+
+WINDOWS_TECHS = {'IIS', 'ASP.NET', 'Windows Server', 'Microsoft SQL Server'}
+UNIX_TECHS = {'Nginx', 'OpenResty', 'Tengine', 'LiteSpeed', 'Gunicorn', 'uWSGI', 'Caddy'}
+WINDOWS_BANNER = re.compile(r'win(?:32|64|dows)|microsoft', re.I)
+UNIX_BANNER = re.compile(r'unix|ubuntu|debian|centos|red ?hat|fedora|alpine|freebsd', re.I)
+
+# Payload tags that only make sense on one OS family
+OS_TAGS = {
+    'windows': {'win', 'windows', 'powershell', 'cmd'},
+    'unix': {'bash', 'linux', 'unix'},
+}
+
+# Payload tag -> technology the payload targets; pruned when languages / databases are known and it is absent
+LANGUAGE_TAGS = {'php': 'PHP', 'pickle': 'Python', 'python': 'Python', 'java': 'Java', 'asp': 'ASP.NET'}
+DATABASE_TAGS = {'mysql': 'MySQL', 'pgsql': 'PostgreSQL', 'mssql': 'Microsoft SQL Server', 'oracle': 'Oracle'}
+
+# Testers that are pointless without a precondition
+XML_TESTERS = {'xxe'}
+
+# Value of each tester family's findings; a scan budget is spent on the highest first
+TESTER_PRIORITY = {
+    'sql_injection': 100, 'command_injection': 95, 'path_traversal': 85, 'xxe': 80, 'ssrf': 80,
+    'nosql_injection': 75, 'xss': 70, 'idor': 60, 'open_redirect': 50, 'csrf': 40, 'header_security': 30,
+}
+XML_CONTENT = re.compile(r'xml|soap', re.I)
+
+# Body sent with Content-Type: application/xml to see whether an endpoint takes XML at all,
+# and the answers that refuse it (anything else may have parsed it)
+XML_PROBE = '<?xml version="1.0"?><probe>1</probe>'
+XML_REJECTED_STATUSES = {404, 405, 415, 501}
+
+_WINDOWS_PAYLOAD = re.compile(
+    r'win\.ini|boot\.ini|[a-z]:\\|\\windows\\|\.\.\\|powershell|\bcmd(?:\.exe)?\b|\btype\s|[;&|]\s*(?:ver|dir)\b|\btimeout \d|ping -n', re.I
+)
+_UNIX_PAYLOAD = re.compile(r'/etc/|/proc/|\buname\b|[;&|`]\s*(?:id|ls|cat|pwd)\b|\$\(|\bbash\b|\bsh -c\b')
+_PHP_PAYLOAD = re.compile(r'php://|phar://|expect://|<\?php', re.I)
+
+_master_tags: Optional[Dict[str, Set[str]]] = None
+
+
+def master_payload_tags() -> Dict[str, Set[str]]:
+    """Tags of every payload string in payloads_master.json (all encodings), loaded once"""
+    global _master_tags
+    if _master_tags is None:
+        _master_tags = {}
+        try:
+            with open(MASTER_PAYLOADS, 'r', encoding='utf-8') as f:
+                master = json.load(f)
+        except Exception:
+            master = {}
+        for family in master.values():
+            for payload in family.get('payloads', []):
+                tags = {tag.lower() for tag in payload.get('tags', [])}
+                # "Linux:Bash" / "Windows:Powershell" style subcategories are tags too
+                tags.update(part.strip().lower() for part in payload.get('subcategory', '').split(':') if part.strip())
+                for content in payload.get('content', {}).values():
+                    if isinstance(content, str):
+                        _master_tags.setdefault(content, set()).update(tags)
+    return _master_tags
+
+
+def payload_tags(payload: str) -> Set[str]:
+    """Tags from payloads_master.json, plus tags inferred from the payload text"""
+    tags = set(master_payload_tags().get(payload, ()))
+    if _WINDOWS_PAYLOAD.search(payload):
+        tags.add('win')
+    if _UNIX_PAYLOAD.search(payload):
+        tags.add('unix')
+    if _PHP_PAYLOAD.search(payload):
+        tags.add('php')
+    return tags
+
+
+def filter_payloads(payloads: Iterable[str], excluded_tags: Set[str]) -> List[str]:
+    """Drop payloads carrying any excluded tag"""
+    payloads = list(payloads)
+    if not excluded_tags:
+        return payloads
+    return [payload for payload in payloads if not (payload_tags(payload) & excluded_tags)]
+
+
+def tester_family(key: str) -> str:
+    """'sql_injection' stays as is; 'SQLInjectionTester' becomes 'sql_injection'"""
+    if '_' in key or key.islower():
+        return key
+    snake = re.sub(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])', '_', key).lower()
+    return snake[:-len('_tester')] if snake.endswith('_tester') else snake
+
+
+def tester_priority(key: str) -> int:
+    """TESTER_PRIORITY of a tester key or class name (50 for unknown testers)"""
+    return TESTER_PRIORITY.get(tester_family(key), 50)
+
+
+@dataclass
+class TesterPlan:
+    key: str
+    enabled: bool = True
+    reason: str = ''
+    payloads: int = 0
+    pruned_payloads: int = 0
+    requests: int = 0
+
+
+@dataclass
+class ScanPlan:
+    """Testers to run, payloads kept per tester and the estimated request count"""
+    facts: Dict[str, Any] = field(default_factory=dict)
+    excluded_tags: Set[str] = field(default_factory=set)
+    testers: List[TesterPlan] = field(default_factory=list)
+
+    @property
+    def estimated_requests(self) -> int:
+        return sum(tester.requests for tester in self.testers if tester.enabled)
+
+    def is_enabled(self, key: str) -> bool:
+        return all(tester.enabled for tester in self.testers if tester.key == key)
+
+    def skip(self, key: str, reason: str):
+        """Disable a tester after planning, when a fact it depends on is only known later"""
+        for tester in self.testers:
+            if tester.key == key:
+                tester.enabled = False
+                tester.reason = reason
+
+    def summary_lines(self) -> List[str]:
+        xml = {True: 'yes', False: 'no'}.get(self.facts.get('accepts_xml'), 'unknown')
+        lines = [f"OS: {self.facts.get('os') or 'unknown'} | XML endpoints: {xml}"]
+        if self.excluded_tags:
+            lines.append(f"Excluded payload tags: {', '.join(sorted(self.excluded_tags))}")
+        for tester in self.testers:
+            if not tester.enabled:
+                lines.append(f"  - {tester.key}: skipped ({tester.reason})")
+                continue
+            pruned = f", {tester.pruned_payloads} pruned" if tester.pruned_payloads else ''
+            lines.append(f"  + {tester.key}: {tester.payloads} payloads{pruned}, ~{tester.requests} requests")
+        lines.append(f"Estimated requests: ~{self.estimated_requests}")
+        return lines
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'facts': dict(self.facts),
+            'excluded_tags': sorted(self.excluded_tags),
+            'testers': [tester.__dict__.copy() for tester in self.testers],
+            'estimated_requests': self.estimated_requests,
+        }
+
+
+class ScanPlanner:
+    """
+    Turns detection results into a scan plan.
+
+    technologies is the usual {category: [names]} mapping (entries may also be
+    dicts with a 'name'); content_types are Content-Type values / form enctypes
+    seen on the target; xml_probe_statuses are the answers to XML_PROBE sent to
+    the endpoints that will be tested. Unknown facts never prune anything:
+    HTML pages and urlencoded forms do not rule XML out, only endpoints that
+    all refused the probe do.
+    """
+    def __init__(self, technologies: Dict[str, List[Any]], content_types: Iterable[str] = (),
+                 server_banner: str = '', xml_probe_statuses: Iterable[int] = ()):
+        self.technologies = {
+            category: {tech if isinstance(tech, str) else tech.get('name', '') for tech in techs}
+            for category, techs in (technologies or {}).items()
+        }
+        self.content_types = [content_type for content_type in content_types if content_type]
+        self.server_banner = server_banner or ''
+        self.xml_probe_statuses = [status for status in xml_probe_statuses if status]
+
+    @property
+    def detected(self) -> Set[str]:
+        return set().union(*self.technologies.values()) if self.technologies else set()
+
+    def os_family(self) -> Optional[str]:
+        detected = self.detected
+        windows = bool(detected & WINDOWS_TECHS) or bool(WINDOWS_BANNER.search(self.server_banner))
+        unix = bool(detected & UNIX_TECHS) or bool(UNIX_BANNER.search(self.server_banner))
+        # Apache also runs on Windows: it only counts as Unix when nothing points at Windows
+        if 'Apache' in detected and not windows:
+            unix = True
+        if windows == unix:
+            return None
+        return 'windows' if windows else 'unix'
+
+    def accepts_xml(self) -> Optional[bool]:
+        """True when XML was seen, False when every endpoint refused the XML probe, else None"""
+        if any(XML_CONTENT.search(content_type) for content_type in self.content_types):
+            return True
+        if self.xml_probe_statuses:
+            return any(status not in XML_REJECTED_STATUSES for status in self.xml_probe_statuses)
+        return None
+
+    def excluded_tags(self) -> Set[str]:
+        excluded: Set[str] = set()
+        os_family = self.os_family()
+        if os_family:
+            other = 'unix' if os_family == 'windows' else 'windows'
+            excluded |= OS_TAGS[other]
+        # Only prune by language once a language with tagged payloads was seen
+        languages = self.technologies.get('languages', set())
+        if languages & set(LANGUAGE_TAGS.values()):
+            excluded |= {tag for tag, language in LANGUAGE_TAGS.items() if language not in languages}
+        databases = self.technologies.get('databases', set())
+        if databases & set(DATABASE_TAGS.values()):
+            excluded |= {tag for tag, database in DATABASE_TAGS.items() if database not in databases}
+        return excluded
+
+    def plan(self, testers: Dict[str, Any], targets: int, baseline_requests: int = 0,
+             max_payloads: Dict[str, Optional[int]] = None) -> ScanPlan:
+        """
+        Decide which testers run and set their excluded_tags.
+
+        Args:
+            testers: {key: tester}; testers expose get_payloads() / excluded_tags
+            targets: forms or parameters each tester will be run against
+            baseline_requests: extra requests per target (baseline fetches)
+            max_payloads: optional per-key payload cap
+        """
+        max_payloads = max_payloads or {}
+        excluded = self.excluded_tags()
+        accepts_xml = self.accepts_xml()
+        plan = ScanPlan(
+            facts={'os': self.os_family(), 'accepts_xml': accepts_xml, 'targets': targets},
+            excluded_tags=excluded,
+        )
+        for key, tester in testers.items():
+            entry = TesterPlan(key)
+            plan.testers.append(entry)
+            if tester_family(key) in XML_TESTERS and accepts_xml is False:
+                entry.enabled = False
+                entry.reason = 'no endpoint accepts XML'
+                continue
+            tester.excluded_tags = set(excluded)
+            all_payloads = tester.get_payloads()
+            kept = tester.planned_payloads()
+            cap = max_payloads.get(key)
+            entry.payloads = min(len(kept), cap) if cap else len(kept)
+            entry.pruned_payloads = len(all_payloads) - len(kept)
+            # Testers without payloads (passive checks) still cost a request per target
+            entry.requests = targets * (max(entry.payloads, 1) + baseline_requests)
+        return plan
@@ -0,0 +1,187 @@
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+PATH = 1
+FILE = 2
+
+
+class _TrieNode:
+    __slots__ = ('children', 'kind')
+
+    def __init__(self):
+        self.children: Optional[Dict[str, '_TrieNode']] = None
+        self.kind = 0
+
+
+class PathTrie:
+    """
+    Set of URL paths stored by segment, so shared prefixes are kept once.
+    Each stored path is marked as a directory-like path or a file.
+    """
+    def __init__(self):
+        self._root = _TrieNode()
+        self.path_count = 0
+        self.file_count = 0
+
+    def add(self, path: str, kind: int) -> bool:
+        """Store a path; returns False if it was already there."""
+        node = self._root
+        for segment in path.split('/'):
+            if node.children is None:
+                node.children = {}
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _TrieNode()
+            node = child
+        if node.kind & kind:
+            return False
+        node.kind |= kind
+        if kind == FILE:
+            self.file_count += 1
+        else:
+            self.path_count += 1
+        return True
+
+    def iter(self, kind: int) -> Iterator[str]:
+        """Yield stored paths of one kind, in insertion order per level."""
+        stack: List[Tuple[_TrieNode, List[str]]] = [(self._root, [])]
+        while stack:
+            node, segments = stack.pop()
+            if node.kind & kind:
+                yield '/'.join(segments)
+            if node.children:
+                for segment, child in reversed(list(node.children.items())):
+                    stack.append((child, segments + [segment]))
+
+    def __contains__(self, path: str) -> bool:
+        node = self._root
+        for segment in path.split('/'):
+            if not node.children or segment not in node.children:
+                return False
+            node = node.children[segment]
+        return node.kind != 0
+
+
+class SiteGraph(Mapping):
+    """
+    Compact storage for the crawl structure of WebMapper.
+
+    URLs and anchor texts are interned to integer ids, edges live in
+    array('I') adjacency lists and paths are deduplicated in a trie per
+    domain. Reading it like the old site_structure dict ('links', 'forms',
+    'domains', ...) builds that section on demand, which is meant for
+    report generation only.
+    """
+    SECTIONS = ('domains', 'subdomains', 'directories', 'files', 'forms', 'links', 'external_links')
+
+    def __init__(self):
+        self._url_ids: Dict[str, int] = {}
+        self._urls: List[str] = []
+        self._text_ids: Dict[str, int] = {}
+        self._texts: List[str] = []
+        self._links: Dict[int, array] = {}
+        self._link_texts: Dict[int, array] = {}
+        self._external: Dict[int, array] = {}
+        self._forms: List[Tuple[int, str, str, int]] = []
+        self.domains: Dict[str, PathTrie] = {}
+        self.link_count = 0
+        self.external_count = 0
+
+    def intern(self, url: str) -> int:
+        url_id = self._url_ids.get(url)
+        if url_id is None:
+            url_id = self._url_ids[url] = len(self._urls)
+            self._urls.append(url)
+        return url_id
+
+    def url(self, url_id: int) -> str:
+        return self._urls[url_id]
+
+    def _intern_text(self, text: str) -> int:
+        text_id = self._text_ids.get(text)
+        if text_id is None:
+            text_id = self._text_ids[text] = len(self._texts)
+            self._texts.append(text)
+        return text_id
+
+    def add_link(self, from_url: str, to_url: str, text: str = ''):
+        src = self.intern(from_url)
+        if src not in self._links:
+            self._links[src] = array('I')
+            self._link_texts[src] = array('I')
+        self._links[src].append(self.intern(to_url))
+        self._link_texts[src].append(self._intern_text(text))
+        self.link_count += 1
+
+    def add_external(self, from_url: str, to_url: str):
+        src = self.intern(from_url)
+        if src not in self._external:
+            self._external[src] = array('I')
+        self._external[src].append(self.intern(to_url))
+        self.external_count += 1
+
+    def add_form(self, url: str, action: str, method: str, inputs: int):
+        self._forms.append((self.intern(url), action, method, inputs))
+
+    def add_domain(self, domain: str) -> PathTrie:
+        trie = self.domains.get(domain)
+        if trie is None:
+            trie = self.domains[domain] = PathTrie()
+        return trie
+
+    def add_path(self, domain: str, path: str, is_file: bool) -> bool:
+        return self.add_domain(domain).add(path, FILE if is_file else PATH)
+
+    def out_links(self, url: str) -> List[str]:
+        """Internal links found on a page."""
+        src = self._url_ids.get(url)
+        if src is None or src not in self._links:
+            return []
+        return [self._urls[dst] for dst in self._links[src]]
+
+    @property
+    def form_count(self) -> int:
+        return len(self._forms)
+
+    # --- dict view for reports ---
+
+    def __getitem__(self, section: str) -> Any:
+        if section == 'domains':
+            return {
+                domain: {'paths': list(trie.iter(PATH)), 'files': list(trie.iter(FILE))}
+                for domain, trie in self.domains.items()
+            }
+        if section == 'links':
+            return [
+                {'from': self._urls[src], 'to': self._urls[dst], 'text': self._texts[text]}
+                for src, targets in self._links.items()
+                for dst, text in zip(targets, self._link_texts[src])
+            ]
+        if section == 'external_links':
+            links = []
+            for src, targets in self._external.items():
+                for dst in targets:
+                    to_url = self._urls[dst]
+                    links.append({'from': self._urls[src], 'to': to_url, 'domain': urlparse(to_url).netloc})
+            return links
+        if section == 'forms':
+            return [
+                {'url': self._urls[url_id], 'action': action, 'method': method, 'inputs': inputs}
+                for url_id, action, method, inputs in self._forms
+            ]
+        if section in self.SECTIONS:
+            return {}
+        raise KeyError(section)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.SECTIONS)
+
+    def __len__(self) -> int:
+        return len(self.SECTIONS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Full site_structure dict (e.g. for JSON export)."""
+        return {section: self[section] for section in self.SECTIONS}
+
@@ -0,0 +1,150 @@
+"""
+Site-wide Technology Detection
+Aggregates fingerprint evidence over every page fetched by the crawler
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from .fingerprint_index import FINGERPRINT_INDEX, Fingerprint, FingerprintIndex
+from .fingerprint_rules import RuleSet, default_rules
+
+CONFIDENCE_ORDER = {'low': 1, 'medium': 2, 'high': 3}
+
+
+@dataclass
+class TechEvidence:
+    """Evidence collected for one technology across the site"""
+    category: str
+    tech: str
+    pages: int = 0
+    urls: List[str] = field(default_factory=list)
+    patterns: Set[str] = field(default_factory=set)
+    versions: Set[str] = field(default_factory=set)
+    base_confidence: str = 'low'
+
+    def confidence(self, saturation: int) -> str:
+        if self.pages >= saturation:
+            return 'high'
+        by_pages = 'medium' if self.pages >= 2 else 'low'
+        return max(by_pages, self.base_confidence, key=lambda level: CONFIDENCE_ORDER[level])
+
+
+class SiteTechnologyAggregator:
+    """
+    Streaming technology detection over crawled pages.
+
+    observe() is meant to be registered as a page observer of the mapper, so
+    every body is fingerprinted once, right after it is downloaded. Once a
+    technology has been seen on `saturation` pages its patterns are dropped
+    from the active index, so pages get cheaper to scan as the crawl goes on.
+    Structured rules add versions and cookie / meta / script-src evidence.
+    """
+    def __init__(self, index: FingerprintIndex = FINGERPRINT_INDEX, saturation: int = 5,
+                 max_urls: int = 10, rules: RuleSet = None):
+        self.index = index
+        self.rules = rules if rules is not None else default_rules()
+        self.saturation = saturation
+        self.max_urls = max_urls
+        self.evidence: Dict[Tuple[str, str], TechEvidence] = {}
+        self.pages_observed = 0
+        self._observed_urls: Set[str] = set()
+        self._saturated: Set[Tuple[str, str]] = set()
+        self._active: Optional[FingerprintIndex] = index
+        self._stale = False
+
+    def observe(self, url: str, html: str, headers: dict = None) -> List[Fingerprint]:
+        """Fingerprint one page; returns the fingerprints that matched on it"""
+        if url in self._observed_urls:
+            return []
+        self._observed_urls.add(url)
+        self.pages_observed += 1
+        index = self._active_index()
+
+        matched = []
+        if index is not None:
+            for header_name, header_value in (headers or {}).items():
+                is_server_header = header_name.lower() in ['server', 'x-powered-by']
+                for fp in index.match(str(header_value), ['tech']):
+                    if fp.category == 'languages' or (fp.category == 'servers' and is_server_header):
+                        matched.append((fp, f"header {header_name}", ''))
+
+            if html:
+                for pattern in index.scan(html):
+                    for fp in index.fingerprints([pattern]):
+                        # Servers and languages only count from headers
+                        if fp.source == 'tech' and fp.category in ('servers', 'languages'):
+                            continue
+                        matched.append((fp, pattern, ''))
+
+        # Saturated technologies still run rules until a version is known
+        settled = {tech for (category, tech) in self._saturated if self.evidence[(category, tech)].versions}
+        for match in self.rules.analyze(url, html, headers, exclude=settled).values():
+            fp = Fingerprint('rules', match.category, match.tech, match.level)
+            for evidence in match.evidence:
+                matched.append((fp, f"rule {evidence}", match.version))
+
+        return self._apply(url, matched)
+
+    def record(self, url: str, category: str, tech: str, confidence: str = 'medium',
+               pattern: str = '', version: str = '') -> List[Fingerprint]:
+        """Add evidence found outside page bodies (favicon hashes, static assets, ...)"""
+        return self._apply(url, [(Fingerprint('asset', category, tech, confidence), pattern, version)])
+
+    def _apply(self, url: str, matched: List[Tuple[Fingerprint, str, str]]) -> List[Fingerprint]:
+        page_seen: Set[Tuple[str, str]] = set()
+        found = []
+        for fp, pattern, version in matched:
+            key = (fp.category, fp.tech)
+            if key in self._saturated:
+                if version:
+                    self.evidence[key].versions.add(version)
+                continue
+            evidence = self.evidence.get(key)
+            if evidence is None:
+                evidence = self.evidence[key] = TechEvidence(fp.category, fp.tech)
+            evidence.patterns.add(pattern)
+            if version:
+                evidence.versions.add(version)
+            if CONFIDENCE_ORDER[fp.confidence] > CONFIDENCE_ORDER[evidence.base_confidence]:
+                evidence.base_confidence = fp.confidence
+            if key in page_seen:
+                continue
+            page_seen.add(key)
+            found.append(fp)
+            evidence.pages += 1
+            if len(evidence.urls) < self.max_urls:
+                evidence.urls.append(url)
+            if evidence.pages >= self.saturation:
+                self._saturated.add(key)
+                self._stale = True
+        return found
+
+    def _active_index(self) -> Optional[FingerprintIndex]:
+        """Index restricted to patterns that can still add evidence; rebuilt lazily"""
+        if self._stale:
+            self._stale = False
+            active = self.index.without(self._saturated)
+            self._active = active if len(active) else None
+        return self._active
+
+    def results(self) -> Dict[str, List[str]]:
+        """Detected technologies by category, like TechnologyDetector.detect_all"""
+        result: Dict[str, Set[str]] = {}
+        for (category, tech) in self.evidence:
+            result.setdefault(category, set()).add(tech)
+        return {category: sorted(techs) for category, techs in result.items()}
+
+    def detailed_report(self) -> Dict[str, List[Dict]]:
+        """Per-technology confidence, page count and the URLs where it was seen"""
+        report: Dict[str, List[Dict]] = {}
+        for evidence in sorted(self.evidence.values(), key=lambda e: (-e.pages, e.tech)):
+            report.setdefault(evidence.category, []).append({
+                'name': evidence.tech,
+                'confidence': evidence.confidence(self.saturation),
+                'pages': evidence.pages,
+                'urls': list(evidence.urls),
+                'patterns': sorted(evidence.patterns),
+                'versions': sorted(evidence.versions),
+            })
+        return report
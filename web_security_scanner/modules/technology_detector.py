@@ -19,6 +19,10 @@ except ImportError:
     from js_frameworks import JSframeworks
     from analytics_patterns import ANALYTICS_PATTERNS
 
+from .fingerprint_index import FINGERPRINT_INDEX
+from .fingerprint_rules import default_rules
+from .cookie_analyzer import response_cookies
+
 
 try:
     from ..utils.i18n import i18n
@@ -34,37 +38,45 @@ class TechnologyDetector:
         self.cms_signatures = CMS_fingerprints
         self.js_signatures = JSframeworks
         self.analytics_signatures = ANALYTICS_PATTERNS
+        self.index = FINGERPRINT_INDEX
+        self.rules = default_rules()
         
         self.detected = defaultdict(set)
         self.confidence_scores = {}
+        self.versions = {}
+        self._scanned_text = None
+        self._scanned_hits = set()
     
     def detect_all(self, response, html_content: str = None) -> Dict[str, List[str]]:
         """
         Perform comprehensive technology detection
         
         Args:
-            response: HTTP response object
+            response: HTTP response object (or an async core result dict)
             html_content: HTML content (optional, will extract from response if not provided)
             
         Returns:
             Dictionary with detected technologies by category
         """
-        if html_content is None:
-            html_content = response.text
-        
-        headers = response.headers
+        if isinstance(response, dict):
+            html_content = response.get('text', '') if html_content is None else html_content
+            headers = response.get('headers') or {}
+        else:
+            html_content = response.text if html_content is None else html_content
+            headers = response.headers
         
         # Run all detection methods
         self._detect_from_headers(headers)
         self._detect_from_html(html_content)
         self._detect_from_scripts(html_content)
         self._detect_from_meta_tags(html_content)
-        self._detect_from_cookies(response.cookies)
+        self._detect_from_cookies(response)
         self._detect_cms(html_content, headers)
         self._detect_js_frameworks(html_content)
         self._detect_analytics(html_content)
         self._detect_security_headers(headers)
         self._detect_cdn(headers, html_content)
+        self._detect_from_rules(response, html_content, headers)
         
         # Convert sets to sorted lists
         result = {
@@ -77,37 +89,30 @@ class TechnologyDetector:
         
         return result
     
+    def _scan_html(self, html_content: str) -> set:
+        """Patterns found in the page; the HTML is scanned once and shared by all detectors"""
+        if self._scanned_text is not html_content:
+            self._scanned_text = html_content
+            self._scanned_hits = self.index.scan(html_content)
+        return self._scanned_hits
+    
     def _detect_from_headers(self, headers: dict):
         """Detect technologies from HTTP headers"""
         for header_name, header_value in headers.items():
-            header_lower = header_value.lower()
-            
-            # Detect servers
-            if header_name.lower() in ['server', 'x-powered-by']:
-                for tech, patterns in self.tech_signatures.get('servers', {}).items():
-                    for pattern in patterns:
-                        if pattern.lower() in header_lower:
-                            self.detected['servers'].add(tech)
-                            self._update_confidence(tech, 'high')
+            is_server_header = header_name.lower() in ['server', 'x-powered-by']
             
-            # Detect languages
-            for lang, patterns in self.tech_signatures.get('languages', {}).items():
-                for pattern in patterns:
-                    if pattern.lower() in header_lower:
-                        self.detected['languages'].add(lang)
-                        self._update_confidence(lang, 'high')
+            for fp in self.index.match(header_value, ['tech']):
+                # Servers only from Server / X-Powered-By; languages from any header
+                if fp.category == 'languages' or (fp.category == 'servers' and is_server_header):
+                    self.detected[fp.category].add(fp.tech)
+                    self._update_confidence(fp.tech, 'high')
     
     def _detect_from_html(self, html_content: str):
         """Detect technologies from HTML content patterns"""
-        html_lower = html_content.lower()
-        
-        for category, tech_dict in self.tech_signatures.items():
-            if category not in ['servers', 'languages']:  # Already handled by headers
-                for tech, patterns in tech_dict.items():
-                    for pattern in patterns:
-                        if pattern.lower() in html_lower:
-                            self.detected[category].add(tech)
-                            self._update_confidence(tech, 'medium')
+        for fp in self.index.fingerprints(self._scan_html(html_content), ['tech']):
+            if fp.category not in ['servers', 'languages']:  # Already handled by headers
+                self.detected[fp.category].add(fp.tech)
+                self._update_confidence(fp.tech, 'medium')
     
     def _detect_from_scripts(self, html_content: str):
         """Detect technologies from script tags"""
@@ -131,21 +136,11 @@ class TechnologyDetector:
     
     def _analyze_script_url(self, src: str):
         """Analyze script URL for technology detection"""
-        src_lower = src.lower()
-        
-        # Detect JS frameworks
-        for framework, patterns in self.js_signatures.items():
-            for pattern in patterns:
-                if pattern.lower() in src_lower:
-                    self.detected['js_frameworks'].add(framework)
-                    self._update_confidence(framework, 'high')
-        
-        # Detect frontend frameworks
-        for framework, patterns in self.tech_signatures.get('frontend', {}).items():
-            for pattern in patterns:
-                if pattern.lower() in src_lower:
-                    self.detected['frontend'].add(framework)
-                    self._update_confidence(framework, 'high')
+        for fp in self.index.match(src, ['js', 'tech']):
+            # JS frameworks and frontend frameworks
+            if fp.source == 'js' or fp.category == 'frontend':
+                self.detected[fp.category].add(fp.tech)
+                self._update_confidence(fp.tech, 'high')
     
     def _analyze_script_content(self, content: str):
         """Analyze inline script content"""
@@ -177,12 +172,9 @@ class TechnologyDetector:
             for meta in meta_tags:
                 # Generator meta tag (CMS detection)
                 if meta.get('name') == 'generator':
-                    content = meta.get('content', '').lower()
-                    for cms, patterns in self.cms_signatures.items():
-                        for pattern in patterns:
-                            if pattern.lower() in content:
-                                self.detected['cms'].add(cms)
-                                self._update_confidence(cms, 'high')
+                    for fp in self.index.match(meta.get('content', ''), ['cms']):
+                        self.detected['cms'].add(fp.tech)
+                        self._update_confidence(fp.tech, 'high')
                 
                 # Other meta tags
                 for attr in ['content', 'property', 'name']:
@@ -197,54 +189,46 @@ class TechnologyDetector:
         except Exception as e:
             self.logger.warning(f"Error detecting from meta tags: {e}")
     
-    def _detect_from_cookies(self, cookies):
-        """Detect technologies from cookies"""
-        for cookie in cookies:
-            cookie_name = cookie.name.lower()
-            
-            if 'phpsessid' in cookie_name:
-                self.detected['languages'].add('PHP')
-            elif 'asp.net' in cookie_name or 'aspx' in cookie_name:
-                self.detected['languages'].add('ASP.NET')
-            elif 'jsessionid' in cookie_name:
-                self.detected['languages'].add('Java')
-            elif 'cfid' in cookie_name or 'cftoken' in cookie_name:
-                self.detected['languages'].add('ColdFusion')
+    def _detect_from_cookies(self, response):
+        """Detect technologies from the Set-Cookie headers (works for live, cached and async responses)"""
+        for cookie in response_cookies(response):
+            for category, tech in cookie.technologies:
+                self.detected[category].add(tech)
+                self._update_confidence(tech, 'medium')
+    
+    def _detect_from_rules(self, response, html_content: str, headers: dict):
+        """Detect technologies and versions with the structured fingerprint rules"""
+        cookies = {cookie.name: cookie.value for cookie in response_cookies(response)}
+        url = response.get('url', '') if isinstance(response, dict) else getattr(response, 'url', '')
+        matches = self.rules.analyze(url, html_content, headers, cookies)
+        for match in matches.values():
+            self.detected[match.category].add(match.tech)
+            self._update_confidence(match.tech, match.level)
+            if match.version:
+                self.versions[match.tech] = match.version
     
     def _detect_cms(self, html_content: str, headers: dict):
         """Enhanced CMS detection"""
-        html_lower = html_content.lower()
+        match_counts = defaultdict(int)
+        for fp in self.index.fingerprints(self._scan_html(html_content), ['cms']):
+            match_counts[fp.tech] += 1
         
-        for cms, patterns in self.cms_signatures.items():
-            match_count = 0
-            for pattern in patterns:
-                if pattern.lower() in html_lower:
-                    match_count += 1
-            
-            if match_count > 0:
-                self.detected['cms'].add(cms)
-                confidence = 'high' if match_count >= 2 else 'medium'
-                self._update_confidence(cms, confidence)
+        for cms, match_count in match_counts.items():
+            self.detected['cms'].add(cms)
+            confidence = 'high' if match_count >= 2 else 'medium'
+            self._update_confidence(cms, confidence)
     
     def _detect_js_frameworks(self, html_content: str):
         """Detect JavaScript frameworks"""
-        html_lower = html_content.lower()
-        
-        for framework, patterns in self.js_signatures.items():
-            for pattern in patterns:
-                if pattern.lower() in html_lower:
-                    self.detected['js_frameworks'].add(framework)
-                    self._update_confidence(framework, 'medium')
+        for fp in self.index.fingerprints(self._scan_html(html_content), ['js']):
+            self.detected['js_frameworks'].add(fp.tech)
+            self._update_confidence(fp.tech, 'medium')
     
     def _detect_analytics(self, html_content: str):
         """Detect analytics and tracking tools"""
-        html_lower = html_content.lower()
-        
-        for tool, patterns in self.analytics_signatures.items():
-            for pattern in patterns:
-                if pattern.lower() in html_lower:
-                    self.detected['analytics'].add(tool)
-                    self._update_confidence(tool, 'high')
+        for fp in self.index.fingerprints(self._scan_html(html_content), ['analytics']):
+            self.detected['analytics'].add(fp.tech)
+            self._update_confidence(fp.tech, 'high')
     
     def _detect_security_headers(self, headers: dict):
         """Detect security headers and WAF"""
@@ -302,6 +286,8 @@ class TechnologyDetector:
             'cdnjs': ['cdnjs.cloudflare.com']
         }
         
+        html_lower = html_content.lower()
+        
         for cdn, patterns in cdn_patterns.items():
             for pattern in patterns:
                 # Check headers
@@ -312,7 +298,7 @@ class TechnologyDetector:
                         break
                 
                 # Check HTML content
-                if pattern.lower() in html_content.lower():
+                if pattern in html_lower:
                     self.detected['cdn'].add(cdn)
                     self._update_confidence(cdn, 'medium')
     
@@ -347,9 +333,12 @@ class TechnologyDetector:
         for category, techs in self.detected.items():
             report[category] = []
             for tech in sorted(techs):
-                report[category].append({
+                entry = {
                     'name': tech,
                     'confidence': self.get_confidence_level(tech)
-                })
+                }
+                if tech in self.versions:
+                    entry['version'] = self.versions[tech]
+                report[category].append(entry)
         
         return report
@@ -0,0 +1,388 @@
+"""
+TLS Inspector
+Grabs certificate chains of every discovered host concurrently, without verification getting in the way
+"""
+
+import asyncio
+import ipaddress
+import logging
+import ssl
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# OIDs used below (dotted form)
+OID_COMMON_NAME = '2.5.4.3'
+OID_ORGANIZATION = '2.5.4.10'
+OID_SUBJECT_ALT_NAME = '2.5.29.17'
+OID_RSA = '1.2.840.113549.1.1.1'
+OID_EC = '1.2.840.10045.2.1'
+
+SIGNATURE_ALGORITHMS = {
+    '1.2.840.113549.1.1.2': 'md2WithRSAEncryption',
+    '1.2.840.113549.1.1.4': 'md5WithRSAEncryption',
+    '1.2.840.113549.1.1.5': 'sha1WithRSAEncryption',
+    '1.2.840.113549.1.1.10': 'rsassaPss',
+    '1.2.840.113549.1.1.11': 'sha256WithRSAEncryption',
+    '1.2.840.113549.1.1.12': 'sha384WithRSAEncryption',
+    '1.2.840.113549.1.1.13': 'sha512WithRSAEncryption',
+    '1.2.840.10045.4.1': 'ecdsa-with-SHA1',
+    '1.2.840.10045.4.3.2': 'ecdsa-with-SHA256',
+    '1.2.840.10045.4.3.3': 'ecdsa-with-SHA384',
+    '1.2.840.10045.4.3.4': 'ecdsa-with-SHA512',
+    '1.3.101.112': 'Ed25519',
+    '1.3.101.113': 'Ed448',
+}
+WEAK_SIGNATURES = {'md2WithRSAEncryption', 'md5WithRSAEncryption', 'sha1WithRSAEncryption', 'ecdsa-with-SHA1'}
+EC_CURVES = {'1.2.840.10045.3.1.7': 256, '1.3.132.0.34': 384, '1.3.132.0.35': 521, '1.3.132.0.10': 256}
+MIN_RSA_BITS = 2048
+EXPIRY_WARNING_DAYS = 30
+WEAK_PROTOCOLS = {'SSLv2', 'SSLv3', 'TLSv1', 'TLSv1.1'}
+
+
+class DERError(ValueError):
+    pass
+
+
+def _read_tlv(data: bytes, offset: int) -> Tuple[int, bytes, int]:
+    """(tag, value, next offset) of the DER element at offset"""
+    if offset + 2 > len(data):
+        raise DERError("truncated element")
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7f
+        if not size or offset + size > len(data):
+            raise DERError("bad length")
+        length = int.from_bytes(data[offset:offset + size], 'big')
+        offset += size
+    end = offset + length
+    if end > len(data):
+        raise DERError("truncated value")
+    return tag, data[offset:end], end
+
+
+def _children(data: bytes) -> List[Tuple[int, bytes]]:
+    items, offset = [], 0
+    while offset < len(data):
+        tag, value, offset = _read_tlv(data, offset)
+        items.append((tag, value))
+    return items
+
+
+def _oid(value: bytes) -> str:
+    parts, current = [], 0
+    for byte in value:
+        current = (current << 7) | (byte & 0x7f)
+        if not byte & 0x80:
+            parts.append(current)
+            current = 0
+    if not parts:
+        return ''
+    first = min(parts[0] // 40, 2)
+    return '.'.join(str(part) for part in [first, parts[0] - first * 40] + parts[1:])
+
+
+def _name(value: bytes) -> Dict[str, str]:
+    """X.509 Name -> {oid: value} (first value wins)"""
+    attributes: Dict[str, str] = {}
+    for _, rdn in _children(value):
+        for _, pair in _children(rdn):
+            items = _children(pair)
+            if len(items) == 2 and items[0][0] == 0x06:
+                attributes.setdefault(_oid(items[0][1]), items[1][1].decode('utf-8', 'replace'))
+    return attributes
+
+
+def _time(tag: int, value: bytes) -> Optional[datetime]:
+    text = value.decode('ascii', 'replace').rstrip('Z')
+    try:
+        if tag == 0x17:  # UTCTime
+            parsed = datetime.strptime(text[:12], '%y%m%d%H%M%S')
+        else:  # GeneralizedTime
+            parsed = datetime.strptime(text[:14], '%Y%m%d%H%M%S')
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class CertificateInfo:
+    subject: str = ''
+    subject_org: str = ''
+    issuer: str = ''
+    issuer_org: str = ''
+    not_before: Optional[datetime] = None
+    not_after: Optional[datetime] = None
+    dns_names: List[str] = field(default_factory=list)
+    ip_addresses: List[str] = field(default_factory=list)
+    signature_algorithm: str = ''
+    key_type: str = ''
+    key_bits: int = 0
+    self_signed: bool = False
+
+    @property
+    def expired(self) -> bool:
+        return bool(self.not_after and self.not_after < datetime.now(timezone.utc))
+
+    @property
+    def days_left(self) -> Optional[int]:
+        return (self.not_after - datetime.now(timezone.utc)).days if self.not_after else None
+
+    def weaknesses(self) -> List[str]:
+        issues = []
+        if self.signature_algorithm in WEAK_SIGNATURES and not self.self_signed:
+            issues.append(f"weak signature algorithm {self.signature_algorithm}")
+        if self.key_type == 'RSA' and 0 < self.key_bits < MIN_RSA_BITS:
+            issues.append(f"weak RSA key ({self.key_bits} bits)")
+        return issues
+
+    def matches(self, host: str) -> bool:
+        """Hostname check against the SANs (CN only when there are none), wildcards one label deep"""
+        host = host.lower().rstrip('.')
+        names = self.dns_names or ([self.subject] if self.subject else [])
+        for name in names:
+            name = name.lower().rstrip('.')
+            if name == host:
+                return True
+            if name.startswith('*.') and host.count('.') == name.count('.') and host.endswith(name[1:]):
+                return True
+        return host in self.ip_addresses
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        for key in ('not_before', 'not_after'):
+            data[key] = data[key].isoformat() if data[key] else None
+        data['weaknesses'] = self.weaknesses()
+        return data
+
+
+def parse_certificate(der: bytes) -> CertificateInfo:
+    """Minimal X.509 parser: names, validity, SANs, signature algorithm and key size"""
+    _, certificate, _ = _read_tlv(der, 0)
+    parts = _children(certificate)
+    tbs = _children(parts[0][1])
+    if tbs and tbs[0][0] == 0xa0:  # explicit version
+        tbs = tbs[1:]
+    # serial, signature, issuer, validity, subject, subjectPublicKeyInfo, [optional fields]
+    info = CertificateInfo()
+    algorithm = _children(parts[1][1])
+    info.signature_algorithm = SIGNATURE_ALGORITHMS.get(_oid(algorithm[0][1]), _oid(algorithm[0][1]))
+
+    issuer, subject = _name(tbs[2][1]), _name(tbs[4][1])
+    info.issuer, info.issuer_org = issuer.get(OID_COMMON_NAME, ''), issuer.get(OID_ORGANIZATION, '')
+    info.subject, info.subject_org = subject.get(OID_COMMON_NAME, ''), subject.get(OID_ORGANIZATION, '')
+    info.self_signed = tbs[2][1] == tbs[4][1]
+
+    validity = _children(tbs[3][1])
+    info.not_before = _time(*validity[0])
+    info.not_after = _time(*validity[1])
+
+    key_info = _children(tbs[5][1])
+    key_algorithm = _children(key_info[0][1])
+    key_oid = _oid(key_algorithm[0][1])
+    if key_oid == OID_RSA:
+        info.key_type = 'RSA'
+        rsa_key = _children(_children(key_info[1][1][1:])[0][1])  # BIT STRING -> RSAPublicKey
+        modulus = rsa_key[0][1].lstrip(b'\x00')
+        info.key_bits = len(modulus) * 8 - (8 - modulus[0].bit_length()) if modulus else 0
+    elif key_oid == OID_EC:
+        info.key_type = 'EC'
+        if len(key_algorithm) > 1 and key_algorithm[1][0] == 0x06:
+            info.key_bits = EC_CURVES.get(_oid(key_algorithm[1][1]), 0)
+    else:
+        info.key_type = SIGNATURE_ALGORITHMS.get(key_oid, key_oid)
+
+    for tag, value in tbs[6:]:
+        if tag != 0xa3:  # extensions
+            continue
+        for _, extension in _children(_children(value)[0][1]):
+            items = _children(extension)
+            if _oid(items[0][1]) != OID_SUBJECT_ALT_NAME:
+                continue
+            for name_tag, name in _children(_children(items[-1][1])[0][1]):
+                if name_tag == 0x82:  # dNSName
+                    info.dns_names.append(name.decode('ascii', 'replace'))
+                elif name_tag == 0x87:  # iPAddress
+                    try:
+                        info.ip_addresses.append(str(ipaddress.ip_address(name)))
+                    except ValueError:
+                        pass
+    return info
+
+
+@dataclass
+class TLSResult:
+    host: str
+    port: int
+    protocol: str = ''
+    cipher: str = ''
+    chain: List[CertificateInfo] = field(default_factory=list)
+    error: str = ''
+
+    @property
+    def leaf(self) -> Optional[CertificateInfo]:
+        return self.chain[0] if self.chain else None
+
+    @property
+    def names(self) -> List[str]:
+        """DNS names of the leaf certificate, wildcards stripped"""
+        leaf = self.leaf
+        if leaf is None:
+            return []
+        names = leaf.dns_names + ([leaf.subject] if leaf.subject and '.' in leaf.subject else [])
+        return sorted({name.lower().lstrip('*.').rstrip('.') for name in names if name})
+
+    def issues(self) -> List[str]:
+        leaf = self.leaf
+        if leaf is None:
+            return []
+        issues = []
+        if leaf.expired:
+            issues.append(f"certificate expired on {leaf.not_after:%Y-%m-%d}")
+        elif leaf.days_left is not None and leaf.days_left < EXPIRY_WARNING_DAYS:
+            issues.append(f"certificate expires in {leaf.days_left} days")
+        if leaf.self_signed:
+            issues.append("self-signed certificate")
+        if not leaf.matches(self.host):
+            issues.append(f"certificate does not cover {self.host}")
+        for position, certificate in enumerate(self.chain):
+            for weakness in certificate.weaknesses():
+                issues.append(weakness if position == 0 else f"{weakness} in chain ({certificate.subject})")
+        if self.protocol in WEAK_PROTOCOLS:
+            issues.append(f"outdated protocol {self.protocol}")
+        return issues
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'host': self.host, 'port': self.port, 'protocol': self.protocol, 'cipher': self.cipher,
+            'error': self.error, 'names': self.names, 'issues': self.issues(),
+            'chain': [certificate.to_dict() for certificate in self.chain],
+        }
+
+
+def _client_context(lenient: bool = False) -> ssl.SSLContext:
+    """No verification: invalid or self-signed certificates are exactly what we want to see"""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    if lenient:
+        # Old servers: accept legacy protocols and ciphers rather than failing the handshake
+        context.minimum_version = ssl.TLSVersion.MINIMUM_SUPPORTED
+        try:
+            context.set_ciphers('ALL:@SECLEVEL=0')
+        except ssl.SSLError:
+            pass
+    return context
+
+
+def peer_chain(ssl_object) -> List[bytes]:
+    """DER certificates sent by the peer, leaf first; falls back to the leaf alone"""
+    getter = getattr(ssl_object, 'get_unverified_chain', None)
+    if getter is None:
+        getter = getattr(getattr(ssl_object, '_sslobj', None), 'get_unverified_chain', None)
+    chain = []
+    try:
+        for certificate in (getter() if getter else None) or []:
+            chain.append(certificate if isinstance(certificate, bytes)
+                         else certificate.public_bytes(ssl._ssl.ENCODING_DER))
+    except Exception:
+        chain = []
+    if not chain:
+        leaf = ssl_object.getpeercert(binary_form=True)
+        chain = [leaf] if leaf else []
+    return chain
+
+
+def split_host_port(netloc: str, default_port: int = 443) -> Tuple[str, int]:
+    parsed = urlparse(f"//{netloc}")
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    return (parsed.hostname or netloc), (port or default_port)
+
+
+def is_subdomain(name: str, domain: str) -> bool:
+    """True if name is a proper subdomain of domain, on a label boundary (evilexample.com is not under example.com)"""
+    name, domain = name.lower().rstrip('.'), domain.lower().rstrip('.')
+    return name != domain and name.endswith('.' + domain)
+
+
+class TLSInspector:
+    """
+    Concurrent certificate grabbing with a per host:port cache.
+
+    Handshakes never verify, so expired, self-signed or mismatched
+    certificates are captured instead of silently failing; a second, lenient
+    handshake is tried for servers that only speak legacy TLS.
+    """
+    def __init__(self, timeout: float = 5, max_concurrency: int = 20):
+        self.timeout = timeout
+        self.results: Dict[Tuple[str, int], TLSResult] = {}
+        self._pending: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.logger = logging.getLogger("TLSInspector")
+
+    async def inspect(self, host: str, port: int = 443) -> TLSResult:
+        key = (host.lower(), port)
+        if key in self.results:
+            return self.results[key]
+        if key in self._pending:
+            return await self._pending[key]
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            async with self._semaphore:
+                result = await self._handshake(host, port, lenient=False)
+                if result.error and not result.chain:
+                    retry = await self._handshake(host, port, lenient=True)
+                    if retry.chain:
+                        result = retry
+            self.results[key] = result
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            # Waiters on the same host must not hang when this handshake is cancelled or fails;
+            # a cancelled handshake is an error result for them (not cached), not their own cancellation
+            if not future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    future.set_result(TLSResult(host, port, error='handshake cancelled'))
+                else:
+                    future.set_exception(e)
+            raise
+        finally:
+            del self._pending[key]
+
+    async def inspect_many(self, targets: Iterable[Tuple[str, int]]) -> List[TLSResult]:
+        return list(await asyncio.gather(*[self.inspect(host, port) for host, port in set(targets)]))
+
+    async def _handshake(self, host: str, port: int, lenient: bool) -> TLSResult:
+        result = TLSResult(host, port)
+        writer = None
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=_client_context(lenient), server_hostname=host),
+                timeout=self.timeout
+            )
+            ssl_object = writer.get_extra_info('ssl_object')
+            result.protocol = ssl_object.version() or ''
+            result.cipher = (ssl_object.cipher() or ('',))[0]
+            for der in peer_chain(ssl_object):
+                try:
+                    result.chain.append(parse_certificate(der))
+                except (DERError, IndexError) as e:
+                    self.logger.debug(f"Could not parse certificate from {host}:{port}: {e}")
+        except Exception as e:
+            result.error = str(e) or e.__class__.__name__
+            self.logger.debug(f"TLS handshake with {host}:{port} failed: {result.error}")
+        finally:
+            if writer is not None:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except Exception:
+                    pass
+        return result
@@ -3,17 +3,23 @@ Vulnerability Detection Module
 Contains testers for various vulnerability types
 """
 
-from .base_tester import BaseVulnerabilityTester
-from .sql_injection import SQLInjectionTester
-from .xss_tester import XSSTester
-from .nosql_injection import NoSQLInjectionTester
-from .open_redirect import OpenRedirectTester
-from .ssrf_tester import SSRFTester
-from .command_injection import CommandInjectionTester
-from .path_traversal import PathTraversalTester
-from .xxe_tester import XXETester
-from .csrf_tester import CSRFTester
-from .idor_tester import IDORTester
+import importlib
+
+# Sync testers, imported on first access (PEP 562): the async engine imports its
+# *_async modules from this package without loading the sync testers
+_EXPORTS = {
+    'BaseVulnerabilityTester': '.base_tester',
+    'SQLInjectionTester': '.sql_injection',
+    'XSSTester': '.xss_tester',
+    'NoSQLInjectionTester': '.nosql_injection',
+    'OpenRedirectTester': '.open_redirect',
+    'SSRFTester': '.ssrf_tester',
+    'CommandInjectionTester': '.command_injection',
+    'PathTraversalTester': '.path_traversal',
+    'XXETester': '.xxe_tester',
+    'CSRFTester': '.csrf_tester',
+    'IDORTester': '.idor_tester',
+}
 
 __all__ = [
     'BaseVulnerabilityTester',
@@ -28,3 +34,14 @@ __all__ = [
     'CSRFTester',
     'IDORTester'
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = globals()[name] = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -4,10 +4,12 @@ Abstract base class for all vulnerability testers
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Set
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
 
+from ..scan_planner import filter_payloads
+
 
 class BaseVulnerabilityTester(ABC):
     """Base class for vulnerability testing"""
@@ -18,12 +20,55 @@ class BaseVulnerabilityTester(ABC):
         self.logger = logger
         self.baseline_responses = {}
         self.vulnerabilities = []
+        # Payload tags pruned by the scan planner (e.g. Windows payloads against Linux)
+        self.excluded_tags: Set[str] = set()
+        # ScanCheckpoint set by the scanner; payloads completed before a resume are not sent again
+        self.checkpoint = None
+        # ScanProgress set by the scanner; checked payloads are counted as completed jobs
+        self.progress = None
     
     @abstractmethod
     def get_payloads(self) -> List[str]:
         """Return list of payloads for this vulnerability type"""
         pass
     
+    def planned_payloads(self) -> List[str]:
+        """Payloads left after the scan planner's tag pruning"""
+        return filter_payloads(self.get_payloads(), self.excluded_tags)
+    
+    def adapt_payload(self, url: str, payload: str) -> str:
+        """Payload as it should be sent to url, encoded once the WAF guard saw blocks on its host"""
+        waf_guard = getattr(self.scanner, 'waf_guard', None)
+        return waf_guard.adapt(url, payload) if waf_guard else payload
+    
+    def out_of_budget(self) -> bool:
+        """True once the scan budget ran out: the core sends nothing more"""
+        budget = getattr(self.scanner, 'budget', None)
+        return budget is not None and budget.exhausted
+    
+    def already_tested(self, endpoint: str, parameter: str, payload: str) -> bool:
+        """True when payload must not be sent: a previous run already checked it, or the budget ran out"""
+        if self.out_of_budget():
+            return True
+        done = self.checkpoint is not None and self.checkpoint.is_done(
+            self.__class__.__name__, endpoint, parameter, payload)
+        if done and self.progress is not None:
+            self.progress.job_done(self.__class__.__name__, endpoint)
+        return done
+    
+    def mark_tested(self, endpoint: str, parameter: str, payload: str = None, finding: Dict = None):
+        """Record a checked payload (and what it found); without payload the whole parameter is done"""
+        if self.out_of_budget() and not finding:
+            # The request may have been refused: leave it for a resumed scan
+            return
+        if self.progress is not None and payload is not None:
+            self.progress.job_done(self.__class__.__name__, endpoint)
+        if self.checkpoint is not None:
+            if finding:
+                self.checkpoint.add_finding(finding)
+            self.checkpoint.mark_done(self.__class__.__name__, endpoint, parameter,
+                                      *([payload] if payload is not None else []))
+    
     @abstractmethod
     def check_vulnerability(self, response, baseline, payload) -> bool:
         """Check if response indicates vulnerability"""
@@ -54,9 +99,15 @@ class BaseVulnerabilityTester(ABC):
             return vulnerabilities
         
         # Get payloads
-        payloads = self.get_payloads()
+        payloads = self.planned_payloads()
         if max_payloads:
             payloads = payloads[:max_payloads]
+        # All inputs get the payload at once, so the form is one parameter ('') for the checkpoint
+        endpoint = (self.checkpoint.endpoint(form['action'], form['method'], form['inputs']) if self.checkpoint
+                    else f"{form['method'].upper()} {form['action']}")
+        if self.progress is not None:
+            self.progress.start(self.__class__.__name__, endpoint, len(payloads))
+        payloads = [p for p in payloads if not self.already_tested(endpoint, '', p)]
         
         self.logger.info(f"Testing {len(payloads)} payloads on {form['action']}")
         
@@ -64,22 +115,26 @@ class BaseVulnerabilityTester(ABC):
         def test_payload(payload):
             try:
                 # Build request data
-                data = {input_name: payload for input_name in form['inputs']}
+                sent = self.adapt_payload(form['action'], payload)
+                data = {input_name: sent for input_name in form['inputs']}
                 
                 # Make request
                 response = self.scanner.make_request(
                     form['action'],
                     form['method'],
-                    data=data
+                    data=data,
+                    probe=True
                 )
                 
-                if not response:
+                # Block pages say nothing about the application
+                if not response or getattr(response, 'waf_blocked', False):
                     return None
                 
                 # Check if vulnerable
+                finding = None
                 if self.check_vulnerability(response, baseline, payload):
                     vuln_info = self.get_vulnerability_info()
-                    return {
+                    finding = {
                         'url': form['action'],
                         'method': form['method'],
                         'payload': payload,
@@ -90,8 +145,8 @@ class BaseVulnerabilityTester(ABC):
                         'cwe': vuln_info.get('cwe'),
                         'owasp': vuln_info.get('owasp')
                     }
-                
-                return None
+                self.mark_tested(endpoint, '', payload, finding)
+                return finding
                 
             except Exception as e:
                 self.logger.error(f"Error testing payload: {e}")
@@ -112,6 +167,8 @@ class BaseVulnerabilityTester(ABC):
                         {'payload': result['payload']}
                     )
         
+        if self.progress is not None:
+            self.progress.finish(self.__class__.__name__, endpoint, skipped=self.out_of_budget())
         return vulnerabilities
     
     def test_url_parameters(self, url: str, parameters: List[str], max_payloads: int = None) -> List[Dict]:
@@ -128,11 +185,16 @@ class BaseVulnerabilityTester(ABC):
         """
         vulnerabilities = []
         
-        payloads = self.get_payloads()
+        payloads = self.planned_payloads()
         if max_payloads:
             payloads = payloads[:max_payloads]
         
+        endpoint = self.checkpoint.endpoint(url, 'GET', parameters) if self.checkpoint else f"GET {url}"
+        if self.progress is not None:
+            self.progress.start(self.__class__.__name__, endpoint, len(parameters) * len(payloads))
         for param in parameters:
+            if self.already_tested(endpoint, param, '*'):
+                continue
             # Get baseline
             baseline_data = {param: 'test123'}
             baseline = self.scanner.make_request(url, 'GET', data=baseline_data)
@@ -142,13 +204,17 @@ class BaseVulnerabilityTester(ABC):
             
             # Test payloads
             for payload in payloads:
+                if self.already_tested(endpoint, param, payload):
+                    continue
                 try:
-                    data = {param: payload}
-                    response = self.scanner.make_request(url, 'GET', data=data)
+                    data = {param: self.adapt_payload(url, payload)}
+                    response = self.scanner.make_request(url, 'GET', data=data, probe=True)
+                    if response is not None and getattr(response, 'waf_blocked', False):
+                        continue
                     
                     if response and self.check_vulnerability(response, baseline, payload):
                         vuln_info = self.get_vulnerability_info()
-                        vulnerabilities.append({
+                        finding = {
                             'url': url,
                             'method': 'GET',
                             'payload': payload,
@@ -158,18 +224,24 @@ class BaseVulnerabilityTester(ABC):
                             'description': vuln_info['description'],
                             'cwe': vuln_info.get('cwe'),
                             'owasp': vuln_info.get('owasp')
-                        })
+                        }
+                        vulnerabilities.append(finding)
                         
                         self.logger.vulnerability(
                             vuln_info['name'],
                             url,
                             {'parameter': param, 'payload': payload}
                         )
+                        self.mark_tested(endpoint, param, finding=finding)
                         break  # Move to next parameter after finding vulnerability
+                    if response:
+                        self.mark_tested(endpoint, param, payload)
                         
                 except Exception as e:
                     self.logger.error(f"Error testing parameter {param}: {e}")
         
+        if self.progress is not None:
+            self.progress.finish(self.__class__.__name__, endpoint, skipped=self.out_of_budget())
         return vulnerabilities
     
     def _get_baseline_response(self, form: Dict) -> Dict:
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 import logging
 import asyncio
+from urllib.parse import quote
 from ...core.scanner_core_async import AsyncScannerCore
 from ...events.event_emitter import ScanEventEmitter, ScanEventType
+from ..scan_planner import filter_payloads
 
 class VulnerabilityTester(ABC):
     """
@@ -16,6 +18,12 @@ class VulnerabilityTester(ABC):
         self.logger = logging.getLogger(self.__class__.__name__)
         # Delay entre payloads para evitar alertas (en segundos)
         self.payload_delay = config.get('payload_delay', 0.5)
+        # Payload tags pruned by the scan planner (e.g. Windows payloads against Linux)
+        self.excluded_tags: Set[str] = set()
+        # ScanCheckpoint set by the scanner; payloads completed before a resume are not sent again
+        self.checkpoint = None
+        # ScanProgress set by the scanner; checked payloads are counted as completed jobs
+        self.progress = None
 
     @abstractmethod
     async def run_test(self, target_url: str, **kwargs):
@@ -37,8 +45,60 @@ class VulnerabilityTester(ABC):
         """Return a description of what the tester does."""
         pass
 
+    def get_payloads(self) -> List[str]:
+        """Payloads sent per parameter; empty for testers that send none."""
+        return []
+
+    def planned_payloads(self) -> List[str]:
+        """Payloads left after the scan planner's tag pruning."""
+        return filter_payloads(self.get_payloads(), self.excluded_tags)
+
+    def adapt_payload(self, url: str, payload: str, in_query: bool = False) -> str:
+        """
+        Payload as it should be sent to url, encoded once the core's WAF guard saw blocks on its host.
+        in_query percent-encodes the variant so it can be spliced into a query string as is.
+        """
+        waf_guard = getattr(self.scanner, 'waf_guard', None)
+        sent = waf_guard.adapt(url, payload) if waf_guard else payload
+        if in_query and sent != payload:
+            sent = quote(sent, safe='%')
+        return sent
+
+    def out_of_budget(self) -> bool:
+        """True once the scan budget ran out: the core sends nothing more."""
+        budget = getattr(self.scanner, 'budget', None)
+        return budget is not None and budget.exhausted
+
+    def already_tested(self, url: str, parameter: str, payload: str) -> bool:
+        """
+        True when payload must not be sent to this endpoint's parameter: a
+        previous run of this scan already checked it, or the budget ran out.
+        """
+        if self.out_of_budget():
+            return True
+        if self.checkpoint is None:
+            return False
+        done = self.checkpoint.is_done(self.__class__.__name__, self.checkpoint.endpoint(url), parameter, payload)
+        if done and self.progress is not None:
+            self.progress.job_done(self.__class__.__name__, url)
+        return done
+
+    def mark_tested(self, url: str, parameter: str, payload: Optional[str] = None):
+        """Record a checked payload; without payload the whole parameter is done (e.g. found vulnerable)."""
+        if self.out_of_budget():
+            # The request may have been refused: leave it for a resumed scan
+            return
+        if self.progress is not None and payload is not None:
+            self.progress.job_done(self.__class__.__name__, url)
+        if self.checkpoint is not None:
+            self.checkpoint.mark_done(self.__class__.__name__, self.checkpoint.endpoint(url), parameter,
+                                      *([payload] if payload is not None else []))
+
     async def report_vulnerability(self, vulnerability_data: Dict[str, Any]):
         """Helper to emit a vulnerability found event."""
+        if self.checkpoint is not None:
+            # Stored before the payload is marked done, so a resume cannot lose it
+            self.checkpoint.add_finding(vulnerability_data)
         await self.event_emitter.emit(
             ScanEventType.VULNERABILITY_FOUND,
             vulnerability=vulnerability_data,
@@ -1,3 +1,4 @@
+from typing import List
 from .base_tester_async import VulnerabilityTester
 import urllib.parse
 from ...utils.i18n import i18n
@@ -11,8 +12,8 @@ class CommandInjectionTester(VulnerabilityTester):
     def description(self) -> str:
         return "Checks for Command Injection vulnerabilities."
 
-    async def run_test(self, target_url: str, **kwargs):
-        payloads = [
+    def get_payloads(self) -> List[str]:
+        return [
             '; cat /etc/passwd',
             '| cat /etc/passwd',
             '; id',
@@ -26,6 +27,9 @@ class CommandInjectionTester(VulnerabilityTester):
             '& whoami',
             '| whoami'
         ]
+
+    async def run_test(self, target_url: str, **kwargs):
+        payloads = self.planned_payloads()
         
         parsed = urllib.parse.urlparse(target_url)
         params = urllib.parse.parse_qs(parsed.query)
@@ -40,13 +44,18 @@ class CommandInjectionTester(VulnerabilityTester):
 
         for param_name in params:
             for idx, payload in enumerate(payloads, 1):
+                if self.already_tested(target_url, param_name, payload):
+                    continue
                 # Log payload being tested
                 await self.log_payload(payload, idx, len(payloads))
                 
-                query = parsed.query.replace(f"{param_name}={params[param_name][0]}", f"{param_name}={payload}")
+                sent = self.adapt_payload(target_url, payload, in_query=True)
+                query = parsed.query.replace(f"{param_name}={params[param_name][0]}", f"{param_name}={sent}")
                 test_url = urllib.parse.urlunparse(parsed._replace(query=query))
                 
-                response = await self.scanner.request("GET", test_url)
+                response = await self.scanner.request("GET", test_url, probe=True)
+                if response.get("waf_blocked"):
+                    continue
                 text = response.get("text", "").lower()
                 
                 indicators = [
@@ -75,7 +84,9 @@ class CommandInjectionTester(VulnerabilityTester):
                         "severity": "Critical",
                         "evidence": i18n.get('vulnerabilities.evidence.command_injection')
                     })
+                    self.mark_tested(target_url, param_name)
                     break
+                self.mark_tested(target_url, param_name, payload)
                 
                 # Delay between payloads
                 await self.delay_between_payloads()
@@ -63,7 +63,7 @@ class IDORTester(BaseVulnerabilityTester):
             if not baseline or baseline.status_code >= 400:
                 continue
             
-            payloads = self.get_payloads()
+            payloads = self.planned_payloads()
             if max_payloads:
                 payloads = payloads[:max_payloads]
             
@@ -1,3 +1,4 @@
+from typing import List
 from .base_tester_async import VulnerabilityTester
 import urllib.parse
 from ...utils.i18n import i18n
@@ -11,14 +12,17 @@ class SQLInjectionTester(VulnerabilityTester):
     def description(self) -> str:
         return "Checks for common SQL Injection vulnerabilities in URL parameters."
 
-    async def run_test(self, target_url: str, **kwargs):
-        payloads = [
+    def get_payloads(self) -> List[str]:
+        return [
             "'", 
             "1' OR '1'='1", 
             "' OR 1=1--", 
             "' UNION SELECT NULL--",
             "admin' --"
         ]
+
+    async def run_test(self, target_url: str, **kwargs):
+        payloads = self.planned_payloads()
         
         # Parse URL to find parameters
         parsed = urllib.parse.urlparse(target_url)
@@ -38,14 +42,19 @@ class SQLInjectionTester(VulnerabilityTester):
 
         for param_name in params:
             for idx, payload in enumerate(payloads, 1):
+                if self.already_tested(target_url, param_name, payload):
+                    continue
                 # Log payload being tested
                 await self.log_payload(payload, idx, len(payloads))
                 
                 # Construct URL with payload
-                query = parsed.query.replace(f"{param_name}={params[param_name][0]}", f"{param_name}={payload}")
+                sent = self.adapt_payload(target_url, payload, in_query=True)
+                query = parsed.query.replace(f"{param_name}={params[param_name][0]}", f"{param_name}={sent}")
                 test_url = urllib.parse.urlunparse(parsed._replace(query=query))
                 
-                response = await self.scanner.request("GET", test_url)
+                response = await self.scanner.request("GET", test_url, probe=True)
+                if response.get("waf_blocked"):
+                    continue
                 
                 if self._check_sqli_error(response.get("text", "")):
                     await self.report_vulnerability({
@@ -56,8 +65,10 @@ class SQLInjectionTester(VulnerabilityTester):
                         "severity": "High",
                         "evidence": i18n.get('vulnerabilities.evidence.sqli_error')
                     })
+                    self.mark_tested(target_url, param_name)
                     # Stop testing this parameter if vulnerable
                     break
+                self.mark_tested(target_url, param_name, payload)
                 
                 # Delay between payloads
                 await self.delay_between_payloads()
@@ -30,12 +30,16 @@ Conexiones:
 import json
 import re
 from datetime import datetime
+from html import escape
 from pathlib import Path
 from urllib.parse import urlparse, urljoin
 from typing import Dict, List, Set, Any
-import dns.resolver
 import socket
 
+from .site_graph import SiteGraph, PATH
+from .tls_inspector import is_subdomain, parse_certificate, peer_chain, split_host_port
+from .ct_import import CTLogImporter
+
 class WebMapper:
     """
     Generador de mapas visuales de sitios web.
@@ -60,15 +64,12 @@ class WebMapper:
         self.url_tree = {}
         self.technologies = {}
         self.vulnerabilities = []
-        self.site_structure = {
-            'domains': {},
-            'subdomains': {},
-            'directories': {},
-            'files': {},
-            'forms': [],
-            'links': [],
-            'external_links': []
-        }
+        # Grafo compacto; se lee como el antiguo dict de estructura al generar reportes
+        self.site_structure = SiteGraph()
+        # Callbacks (url, html, headers) invocados con cada página descargada
+        self.page_observers = []
+        # Volcados locales de logs de Certificate Transparency (JSON lines / CSV)
+        self.ct_logs: List[str] = []
         
     def map_website(self, base_url: str, max_depth: int = 3) -> Dict[str, Any]:
         """
@@ -118,6 +119,9 @@ class WebMapper:
         """Descubre subdominios usando múltiples técnicas."""
         try:
             # Técnica 1: DNS brute force con subdominios comunes
+            # dnspython se importa aquí: solo lo necesita el descubrimiento de subdominios
+            import dns.resolver
+
             common_subdomains = [
                 'www', 'mail', 'ftp', 'admin', 'blog', 'dev', 'staging',
                 'test', 'api', 'cdn', 'shop', 'store', 'portal', 'support',
@@ -144,29 +148,42 @@ class WebMapper:
             # Técnica 3: Búsqueda en CSP headers
             self._discover_from_csp_headers()
             
+            # Técnica 4: Volcados de Certificate Transparency
+            self._discover_from_ct_logs()
+            
         except Exception as e:
             self.logger.error(f"Error en descubrimiento de subdominios: {e}")
     
     def _discover_from_ssl_cert(self):
-        """Descubre subdominios desde certificados SSL."""
+        """Descubre subdominios desde certificados SSL (sin verificar: los inválidos también cuentan)."""
         try:
-            # Intentar obtener info del certificado
             import ssl
-            context = ssl.create_default_context()
-            with socket.create_connection((self.base_domain, 443), timeout=5) as sock:
-                with context.wrap_socket(sock, server_hostname=self.base_domain) as ssock:
-                    cert = ssock.getpeercert()
-                    
-                    # Buscar Subject Alternative Names
-                    if 'subjectAltName' in cert:
-                        for name_type, name in cert['subjectAltName']:
-                            if name_type == 'DNS':
-                                if self.base_domain in name:
-                                    self.discovered_subdomains.add(name)
-                                    self.logger.debug(f"Subdominio desde SSL: {name}")
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            host, port = split_host_port(self.base_domain)
+            with socket.create_connection((host, port), timeout=5) as sock:
+                with context.wrap_socket(sock, server_hostname=host) as ssock:
+                    # Sin verificación getpeercert() viene vacío: se parsea el certificado DER
+                    for der in peer_chain(ssock)[:1]:
+                        for name in parse_certificate(der).dns_names:
+                            name = name.lower().lstrip('*.')
+                            if is_subdomain(name, host):
+                                self.discovered_subdomains.add(name)
+                                self.logger.debug(f"Subdominio desde SSL: {name}")
         except Exception as e:
             self.logger.debug(f"No se pudo analizar certificado SSL: {e}")
     
+    def _discover_from_ct_logs(self):
+        """Descubre subdominios en volcados locales de logs de Certificate Transparency."""
+        if not self.ct_logs:
+            return
+        host, _ = split_host_port(self.base_domain)
+        domain = host[4:] if host.startswith('www.') else host
+        names = CTLogImporter([domain]).import_files(self.ct_logs)
+        self.logger.info(f"Subdominios desde CT logs: {len(names - self.discovered_subdomains)} nuevos")
+        self.discovered_subdomains.update(names)
+    
     def _discover_from_csp_headers(self):
         """Descubre subdominios desde Content-Security-Policy headers."""
         try:
@@ -205,6 +222,7 @@ class WebMapper:
             # Parsear estructura de URL
             parsed = urlparse(url)
             self._add_to_structure(parsed)
+            self._notify_page_observers(url, response.text, response.headers)
             
             # Buscar links en HTML
             from bs4 import BeautifulSoup
@@ -218,60 +236,62 @@ class WebMapper:
                 
                 # Si es del mismo dominio, crawlear
                 if self.base_domain in parsed_link.netloc:
-                    self.site_structure['links'].append({
-                        'from': url,
-                        'to': absolute_url,
-                        'text': link.get_text(strip=True)[:50]
-                    })
+                    self.site_structure.add_link(url, absolute_url, link.get_text(strip=True)[:50])
                     self._crawl_structure(absolute_url, depth + 1, max_depth)
                 else:
                     # Link externo
-                    self.site_structure['external_links'].append({
-                        'from': url,
-                        'to': absolute_url,
-                        'domain': parsed_link.netloc
-                    })
+                    self.site_structure.add_external(url, absolute_url)
             
             # Extraer formularios
             for form in soup.find_all('form'):
-                self.site_structure['forms'].append({
-                    'url': url,
-                    'action': form.get('action', ''),
-                    'method': form.get('method', 'GET').upper(),
-                    'inputs': len(form.find_all('input'))
-                })
+                self.site_structure.add_form(
+                    url,
+                    form.get('action', ''),
+                    form.get('method', 'GET').upper(),
+                    len(form.find_all('input'))
+                )
                 
         except Exception as e:
             self.logger.debug(f"Error crawleando {url}: {e}")
     
+    def add_page_observer(self, callback):
+        """
+        Registra un observador que recibe cada página descargada por el crawler.
+        
+        Args:
+            callback: Función (url, html, headers) llamada con el cuerpo ya descargado
+        """
+        self.page_observers.append(callback)
+    
+    def _notify_page_observers(self, url: str, html: str, headers):
+        """Entrega la página a los observadores; un fallo en uno no detiene el crawling."""
+        for callback in self.page_observers:
+            try:
+                callback(url, html, headers)
+            except Exception as e:
+                self.logger.debug(f"Error en observador de página para {url}: {e}")
+    
     def _add_to_structure(self, parsed_url):
         """Agrega URL a la estructura del sitio."""
         domain = parsed_url.netloc
         path = parsed_url.path
         
         # Agregar dominio/subdominio
-        if domain not in self.site_structure['domains']:
-            self.site_structure['domains'][domain] = {
-                'paths': [],
-                'files': []
-            }
+        self.site_structure.add_domain(domain)
         
-        # Agregar path
+        # Agregar path (sin duplicados)
         if path and path != '/':
             parts = path.split('/')
             
             # Detectar si es archivo o directorio
-            if '.' in parts[-1]:
-                self.site_structure['domains'][domain]['files'].append(path)
-            else:
-                self.site_structure['domains'][domain]['paths'].append(path)
+            self.site_structure.add_path(domain, path, is_file='.' in parts[-1])
     
     def _analyze_structure(self):
         """Analiza la estructura descubierta."""
         # Detectar patrones comunes
-        for domain, data in self.site_structure['domains'].items():
+        for domain, trie in self.site_structure.domains.items():
             # Detectar CMS por estructura de paths
-            paths = data['paths']
+            paths = list(trie.iter(PATH))
             
             if any('wp-content' in p or 'wp-admin' in p for p in paths):
                 self.technologies[domain] = self.technologies.get(domain, [])
@@ -296,10 +316,10 @@ class WebMapper:
         return {
             'total_urls': len(self.visited_urls),
             'total_subdomains': len(self.discovered_subdomains),
-            'total_domains': len(self.site_structure['domains']),
-            'total_forms': len(self.site_structure['forms']),
-            'total_internal_links': len(self.site_structure['links']),
-            'total_external_links': len(self.site_structure['external_links']),
+            'total_domains': len(self.site_structure.domains),
+            'total_forms': self.site_structure.form_count,
+            'total_internal_links': self.site_structure.link_count,
+            'total_external_links': self.site_structure.external_count,
             'total_technologies': sum(len(techs) for techs in self.technologies.values()),
             'total_vulnerabilities': len(self.vulnerabilities)
         }
@@ -392,11 +412,15 @@ class WebMapper:
     
     <hr>
     
+    {self._generate_diff_html(data)}
+    
     <h2>URLs Descubiertas</h2>
     {urls_html}
     
     <hr>
     
+    {self._generate_js_endpoints_html(data)}
+    
     <h2>Subdominios</h2>
     {'<ul>' + ''.join(f'<li>{sd}</li>' for sd in data.get('subdomains', [])) + '</ul>' if data.get('subdomains') else '<p>No se encontraron subdominios.</p>'}
     
@@ -418,6 +442,66 @@ class WebMapper:
         
         return html
     
+    def _generate_diff_html(self, data: Dict[str, Any]) -> str:
+        """Genera la sección de cambios respecto al mapeo anterior (modo incremental)."""
+        diff = data.get('diff')
+        if not diff:
+            return ''
+        
+        def url_list(urls):
+            if not urls:
+                return '<p>Ninguno.</p>'
+            return '<ul>' + ''.join(
+                f'<li><a href="{escape(u)}" target="_blank">{escape(u)}</a></li>' for u in urls
+            ) + '</ul>'
+        
+        def form_list(forms):
+            if not forms:
+                return '<p>Ninguno.</p>'
+            return '<ul>' + ''.join(
+                f'<li>{escape(f.get("method", "GET"))} {escape(f.get("action", ""))} en {escape(f.get("url", ""))} '
+                f'({escape(", ".join(f.get("fields", [])))})</li>' for f in forms
+            ) + '</ul>'
+        
+        return f"""
+    <h2>Cambios desde el mapeo anterior</h2>
+    <p>Descargadas: {diff.get('fetched', 0)} | Sin cambios (304): {diff.get('not_modified', 0)} | Omitidas: {diff.get('skipped', 0)} | Sin verificar: {diff.get('unverified', 0)}</p>
+    <h3>Endpoints nuevos</h3>
+    {url_list(diff.get('new_endpoints', []))}
+    <h3>Endpoints eliminados</h3>
+    {url_list(diff.get('removed_endpoints', []))}
+    <h3>Endpoints modificados</h3>
+    {url_list(diff.get('changed_endpoints', []))}
+    <h3>Formularios nuevos</h3>
+    {form_list(diff.get('new_forms', []))}
+    <h3>Formularios eliminados</h3>
+    {form_list(diff.get('removed_forms', []))}
+    <h3>Endpoints sin verificar (fallo transitorio, se conserva el estado anterior)</h3>
+    {url_list(diff.get('unverified_endpoints', []))}
+    
+    <hr>
+"""
+    
+    def _generate_js_endpoints_html(self, data: Dict[str, Any]) -> str:
+        """Genera la sección de endpoints encontrados en el JavaScript del sitio."""
+        endpoints = data.get('js_endpoints')
+        if not endpoints:
+            return ''
+        
+        items = ''.join(
+            f'<li><b>{escape(e["method"])}</b> {escape(e["url"])}'
+            f'{" (" + escape(", ".join(e["params"])) + ")" if e.get("params") else ""}'
+            f' <i>[{escape(e.get("kind", ""))}]</i></li>'
+            for e in sorted(endpoints, key=lambda e: e['url'])
+        )
+        return f"""
+    <h2>Endpoints en JavaScript</h2>
+    <p>Total: {len(endpoints)}</p>
+    <ul>{items}</ul>
+    
+    <hr>
+"""
+    
     def _get_css(self) -> str:
         """Retorna el CSS para el mapa HTML."""
         return """
@@ -778,7 +862,7 @@ class WebMapper:
             for tech in techs:
                 html += f"""
                 <div class="tech-item">
-                    <strong>{tech['name']}</strong>
+                    <strong>{tech['name']}{' ' + tech['version'] if tech.get('version') else ''}</strong>
                     <span class="badge" style="background: #00C851; color: white;">{tech['type']}</span>
                     <span class="badge" style="background: #ffbb33; color: #333;">Confianza: {tech['confidence']}</span>
                     <p style="margin-top: 10px; color: #666;">{tech['evidence']}</p>
@@ -1,21 +1,56 @@
 import asyncio
+import hashlib
+import itertools
 import logging
 import re
 import socket
+import time
 from urllib.parse import urlparse, urljoin
 from datetime import datetime
-from typing import Dict, Any, Set, List
+from typing import Dict, Any, Set, List, Optional, Tuple
 from bs4 import BeautifulSoup
 from .web_mapper import WebMapper
+from .crawl_graph import CrawlGraphStore, PageRecord, compute_structure_diff
+from .frontier import FrontierBackend, MemoryFrontier, frontier_from_spec
+from .tls_inspector import TLSInspector, TLSResult, is_subdomain, split_host_port
+
+# Answers that say nothing about the page itself: no response, rate limiting, gateway errors
+TRANSIENT_STATUSES = {0, 429, 502, 503, 504}
 
 class WebMapperAsync(WebMapper):
     """
     Async version of WebMapper.
     """
-    def __init__(self, scanner_core, logger=None):
+    def __init__(self, scanner_core, logger=None, frontier: FrontierBackend = None, shard: int = 0):
         super().__init__(scanner_core, logger or logging.getLogger("WebMapperAsync"))
         self.scanner = scanner_core # This is AsyncScannerCore
+        # Shared crawl state; pass the same SQLite/Redis frontier to several mappers to split a crawl
+        self.frontier = frontier or MemoryFrontier()
+        self.shard = shard
+        # Optional JSEndpointExtractor; when set, scripts of every crawled page are analyzed
+        self.js_extractor = None
+        self.js_endpoints: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # Certificate harvesting of every discovered host; None disables it
+        self.tls_inspector: Optional[TLSInspector] = TLSInspector()
+        self.tls_results: Dict[Tuple[str, int], TLSResult] = {}
+        # Callbacks (url, page) for every parsed page: links, forms and JS endpoints as they are found
+        self.endpoint_observers = []
         
+    def add_endpoint_observer(self, callback):
+        """Register a callback (url, page) receiving each parsed page while the crawl runs."""
+        self.endpoint_observers.append(callback)
+
+    def add_discovered(self, url: str):
+        """Add a URL found outside the crawl (content discovery hit) to the site structure."""
+        self._add_to_structure(urlparse(url))
+
+    def _notify_endpoint_observers(self, url: str, page: Dict[str, Any]):
+        for callback in self.endpoint_observers:
+            try:
+                callback(url, page)
+            except Exception as e:
+                self.logger.debug(f"Error en observador de endpoints para {url}: {e}")
+
     async def map_website(self, base_url: str, max_depth: int = 3) -> Dict[str, Any]:
         """
         Mapea un sitio web completo (Async).
@@ -24,6 +59,7 @@ class WebMapperAsync(WebMapper):
         
         parsed = urlparse(base_url)
         self.base_domain = parsed.netloc
+        self.base_scheme = parsed.scheme
         
         # 1. Descubrir subdominios
         self.logger.info("Descubriendo subdominios...")
@@ -31,7 +67,8 @@ class WebMapperAsync(WebMapper):
         
         # 2. Crawlear estructura
         self.logger.info("Crawleando estructura del sitio...")
-        await self._crawl_structure(base_url, depth=0, max_depth=max_depth)
+        await self._crawl_structure(base_url, max_depth=max_depth)
+        await self._merge_passive_subdomains()
         
         # 3. Analizar estructura
         self.logger.info("Analizando estructura...")
@@ -44,6 +81,8 @@ class WebMapperAsync(WebMapper):
             'scan_timestamp': datetime.now().isoformat(),
             'subdomains': list(self.discovered_subdomains),
             'structure': self.site_structure,
+            'js_endpoints': list(self.js_endpoints.values()),
+            'tls': [result.to_dict() for result in self.tls_results.values()],
             'technologies': self.technologies,
             'vulnerabilities': self.vulnerabilities,
             'statistics': self._generate_statistics()
@@ -60,6 +99,13 @@ class WebMapperAsync(WebMapper):
         # CSP Check
         await self._discover_from_csp_headers()
         
+        # Local certificate transparency dumps can be multi-GB: stream them off the event loop
+        if self.ct_logs:
+            await asyncio.get_running_loop().run_in_executor(None, self._discover_from_ct_logs)
+        
+        # Certificate SANs of the base domain (and of whatever the checks above found)
+        await self._discover_from_tls()
+        
         # We can skip brute force or run it in executor for speed/non-blocking
         # loop = asyncio.get_event_loop()
         # await loop.run_in_executor(None, super()._discover_subdomains) 
@@ -79,65 +125,399 @@ class WebMapperAsync(WebMapper):
         except Exception as e:
             self.logger.debug(f"Error analizando CSP headers: {e}")
 
-    async def _crawl_structure(self, url: str, depth: int, max_depth: int):
-        # Limpiar URL de fragmentos
-        url_clean = url.split('#')[0]
-        
-        if depth > max_depth or url_clean in self.visited_urls:
+    async def _merge_passive_subdomains(self):
+        """Subdominios de las cabeceras CSP de todas las páginas descargadas (bus pasivo)."""
+        passive_bus = getattr(self.scanner, 'passive_bus', None)
+        analyzer = passive_bus.get('csp_domains') if passive_bus is not None else None
+        if analyzer is None:
+            return
+        await passive_bus.drain()
+        new = analyzer.subdomains_of(self.base_domain) - self.discovered_subdomains
+        if new:
+            self.discovered_subdomains.update(new)
+            await self._discover_from_tls()
+
+    async def _discover_from_tls(self, rounds: int = 2):
+        """
+        Inspecciona el certificado de cada host conocido en paralelo y añade
+        los SAN del dominio base como subdominios; los nombres nuevos se
+        inspeccionan en la siguiente ronda. Los resultados quedan en tls_results.
+        """
+        if self.tls_inspector is None:
             return
+        base_host, base_port = split_host_port(self.base_domain)
+        if getattr(self, 'base_scheme', 'https') != 'https':
+            base_port = 443
+        for _ in range(rounds):
+            targets = {(base_host, base_port)} | {
+                split_host_port(subdomain) for subdomain in self.discovered_subdomains
+            }
+            targets -= set(self.tls_results)
+            if not targets:
+                return
+            found = set()
+            for result in await self.tls_inspector.inspect_many(targets):
+                self.tls_results[(result.host, result.port)] = result
+                found.update(name for name in result.names if is_subdomain(name, base_host))
+            new = found - self.discovered_subdomains
+            for name in new:
+                self.logger.debug(f"Subdominio desde certificado: {name}")
+            self.discovered_subdomains.update(new)
+            if not new:
+                return
+
+    async def _crawl_structure(self, url: str, max_depth: int):
+        """
+        Crawl through the frontier. Several mappers sharing a frontier (processes
+        or hosts) each pop only their own shard; links are routed to the shard
+        that owns them, and everyone stops once the whole frontier is idle.
+        """
+        frontier = self.frontier
+        await frontier.run(frontier.add_urls, [(url.split('#')[0], 0)])
+        budget = getattr(self.scanner, 'budget', None)
         
-        self.visited_urls.add(url_clean)
-        self.logger.info(f"Mapeando URL [{len(self.visited_urls)}]: {url_clean}")
+        async def worker():
+            while True:
+                if budget is not None and budget.exhausted:
+                    # Sin presupuesto: lo pendiente queda en el frontier (un escaneo reanudado lo retoma)
+                    return
+                item = await frontier.run(frontier.pop, self.shard)
+                if item is None:
+                    if await frontier.run(frontier.is_idle):
+                        return
+                    # Other shards are still producing work
+                    await asyncio.sleep(0.1)
+                    continue
+                page_url, depth = item
+                page = None
+                requeue = False
+                try:
+                    page = await self._fetch_page(page_url)
+                    # Rechazada por el presupuesto: vuelve a la cola sin contar como rastreada
+                    requeue = bool(page.get('budget_exhausted'))
+                    if page['status'] == 200 and depth < max_depth:
+                        await frontier.run(frontier.add_urls, [(link, depth + 1) for link, _ in page['links']])
+                except asyncio.CancelledError:
+                    requeue = True
+                    raise
+                except Exception as e:
+                    self.logger.debug(f"Error crawleando {page_url}: {e}")
+                finally:
+                    # La URL nunca se queda en vuelo: si no, los demás workers esperarían para siempre
+                    await self._release(page_url, depth, page, requeue)
         
+        workers = [asyncio.create_task(worker()) for _ in range(self.scanner.config.max_concurrency)]
         try:
-            response = await self.scanner.request("GET", url_clean)
-            if not response or response.get('status_code') != 200:
-                return
-            
-            parsed = urlparse(url_clean)
-            self._add_to_structure(parsed)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        await self._merge_frontier_pages()
+
+    async def _release(self, url: str, depth: int, page: Optional[Dict[str, Any]], requeue: bool):
+        """Libera el hueco en vuelo de una URL: la devuelve a la cola o la marca como rastreada."""
+        frontier = self.frontier
+        try:
+            if requeue:
+                await frontier.run(frontier.requeue, url, depth)
+            else:
+                await frontier.run(frontier.done, url, page)
+        except Exception as e:
+            # La página no se pudo guardar: al menos se libera el hueco
+            self.logger.debug(f"Error guardando {url} en el frontier: {e}")
+            if page is not None:
+                await frontier.run(frontier.done, url, None)
+
+    async def _fetch_page(self, url: str) -> Dict[str, Any]:
+        self.logger.info(f"Mapeando URL [shard {self.shard}]: {url}")
+        response = await self.scanner.request("GET", url)
+        if response.get('budget_exhausted'):
+            return {'status': 0, 'links': [], 'external': [], 'forms': [], 'budget_exhausted': True}
+        status = response.get('status_code', 0)
+        text = response.get('text', '')
+        links, external, forms = self._parse_page(url, text) if status == 200 and text else ([], [], [])
+        page = {'status': status, 'links': links, 'external': external, 'forms': forms}
+        if status == 200 and text:
+            self._notify_page_observers(url, text, response.get('headers', {}))
+        if self.js_extractor and status == 200 and text:
+            page['js_endpoints'] = await self.js_extractor.analyze_page(url, text)
+        if status == 200:
+            self._notify_endpoint_observers(url, page)
+        return page
+
+    async def _merge_frontier_pages(self):
+        """Build visited_urls and site_structure from the pages crawled by every worker."""
+        pages = await self.frontier.run(lambda: list(self.frontier.iter_pages()))
+        for url, page in pages:
+            self.visited_urls.add(url)
+            if page['status'] != 200:
+                continue
+            self._add_to_structure(urlparse(url))
+            links = [(to_url, text) for to_url, text in page['links']]
+            self._record_page(url, links, page['external'], page['forms'])
+            for endpoint in page.get('js_endpoints', []):
+                self._add_js_endpoint(endpoint)
+
+    def _add_js_endpoint(self, endpoint: Dict[str, Any]):
+        """Merge an endpoint found in JavaScript into the map."""
+        key = (endpoint['method'], endpoint['url'])
+        existing = self.js_endpoints.get(key)
+        if existing is None:
+            self.js_endpoints[key] = dict(endpoint)
+            parsed = urlparse(endpoint['url'])
+            if self.base_domain in parsed.netloc:
+                self._add_to_structure(parsed)
+        else:
+            existing['params'] = sorted(set(existing['params']) | set(endpoint['params']))
+            existing['sources'] = sorted(set(existing['sources']) | set(endpoint['sources']))
+
+    def _parse_page(self, url: str, text: str) -> Tuple[List[Tuple[str, str]], List[str], List[Dict[str, Any]]]:
+        """
+        Extract internal links (url, anchor text), external links and forms from a page.
+        """
+        soup = BeautifulSoup(text, 'html.parser')
+        
+        links = []
+        seen = set()
+        external = []
+        for link in soup.find_all('a', href=True):
+            absolute_url = urljoin(url, link['href']).split('#')[0]
+            parsed_link = urlparse(absolute_url)
             
-            text = response.get('text', '')
-            if not text:
+            if self.base_domain in parsed_link.netloc:
+                if absolute_url not in seen:
+                    seen.add(absolute_url)
+                    links.append((absolute_url, link.get_text(strip=True)[:50]))
+            elif parsed_link.netloc:
+                external.append(absolute_url)
+        
+        forms = []
+        for form in soup.find_all('form'):
+            forms.append({
+                'action': form.get('action', ''),
+                'method': form.get('method', 'GET').upper(),
+                'fields': [field.get('name') for field in form.find_all(['input', 'textarea', 'select'])
+                           if field.get('name')],
+                'inputs': len(form.find_all('input'))
+            })
+        return links, external, forms
+
+    def _record_page(self, url: str, links: List[Tuple[str, str]], external: List[str],
+                     forms: List[Dict[str, Any]]):
+        """Add a parsed page's links and forms to site_structure."""
+        for to_url, text in links:
+            self.site_structure.add_link(url, to_url, text)
+        for to_url in external:
+            self.site_structure.add_external(url, to_url)
+        for form in forms:
+            self.site_structure.add_form(url, form['action'], form['method'], form['inputs'])
+
+    async def map_website_incremental(self, base_url: str, state_path: str, max_depth: int = 3,
+                                      min_likelihood: float = 0.3) -> Dict[str, Any]:
+        """
+        Re-map a site using the crawl graph persisted by the previous run.
+
+        Pages are revisited in order of change likelihood with conditional
+        requests; pages unlikely to have changed are carried over from the
+        stored graph without any request. The structural diff against the
+        previous map is returned under 'diff'.
+        """
+        self.logger.info(f"Iniciando mapeo incremental de: {base_url}")
+        parsed = urlparse(base_url)
+        self.base_domain = parsed.netloc
+        self.base_scheme = parsed.scheme
+        
+        await self._discover_subdomains()
+        
+        store = CrawlGraphStore(state_path, self.base_domain)
+        try:
+            previous = store.load()
+            current, changed, counters = await self._crawl_incremental(
+                base_url.split('#')[0], previous, max_depth, min_likelihood
+            )
+            store.save(list(current.values()))
+            store.delete([url for url in previous if url not in current])
+        finally:
+            store.close()
+        await self._merge_passive_subdomains()
+        
+        diff = compute_structure_diff(previous, current, changed)
+        diff.update(counters)
+        self._analyze_structure()
+        
+        map_data = {
+            'base_url': base_url,
+            'base_domain': self.base_domain,
+            'scan_timestamp': datetime.now().isoformat(),
+            'diff': diff,
+            'subdomains': list(self.discovered_subdomains),
+            'structure': self.site_structure,
+            'js_endpoints': list(self.js_endpoints.values()),
+            'tls': [result.to_dict() for result in self.tls_results.values()],
+            'technologies': self.technologies,
+            'vulnerabilities': self.vulnerabilities,
+            'statistics': self._generate_statistics()
+        }
+        self.logger.info(
+            f"Mapeo incremental completado: {counters['fetched']} descargadas, "
+            f"{counters['not_modified']} sin cambios, {counters['skipped']} omitidas, "
+            f"{counters['unverified']} sin verificar, "
+            f"{len(diff['new_endpoints'])} nuevas, {len(diff['removed_endpoints'])} eliminadas"
+        )
+        return map_data
+
+    async def _crawl_incremental(self, root: str, previous: Dict[str, PageRecord], max_depth: int,
+                                 min_likelihood: float):
+        now = time.time()
+        current: Dict[str, PageRecord] = {}
+        changed: List[str] = []
+        counters = {'fetched': 0, 'not_modified': 0, 'skipped': 0, 'unverified': 0}
+        unverified: List[str] = []
+        queued = {root}
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        sequence = itertools.count()
+        # The root is always revisited: it is the entry point of every subtree
+        queue.put_nowait((-1.0, next(sequence), root, 0))
+
+        def enqueue_children(record: PageRecord, depth: int):
+            if depth >= max_depth:
                 return
+            for child, _ in record.outlinks:
+                if child not in queued:
+                    queued.add(child)
+                    child_record = previous.get(child)
+                    likelihood = child_record.change_likelihood(now) if child_record else 1.0
+                    queue.put_nowait((-likelihood, next(sequence), child, depth + 1))
 
-            soup = BeautifulSoup(text, 'html.parser')
-            
-            # Recolectar todas las URLs únicas
-            found_urls = set()
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                absolute_url = urljoin(url_clean, href)
-                # Limpiar fragmentos y query strings opcionales
-                absolute_url_clean = absolute_url.split('#')[0]
-                
-                parsed_link = urlparse(absolute_url_clean)
-                
-                if self.base_domain in parsed_link.netloc and absolute_url_clean not in found_urls:
-                    found_urls.add(absolute_url_clean)
-                    self.site_structure['links'].append({
-                        'from': url_clean,
-                        'to': absolute_url_clean,
-                        'text': link.get_text(strip=True)[:50]
-                    })
-                elif parsed_link.netloc and self.base_domain not in parsed_link.netloc:
-                    self.site_structure['external_links'].append({
-                        'from': url_clean,
-                        'to': absolute_url_clean,
-                        'domain': parsed_link.netloc
-                    })
-            
-            # Crawlear URLs encontradas de forma secuencial
-            for found_url in found_urls:
-                await self._crawl_structure(found_url, depth + 1, max_depth)
-            
-            for form in soup.find_all('form'):
-                self.site_structure['forms'].append({
-                    'url': url_clean,
-                    'action': form.get('action', ''),
-                    'method': form.get('method', 'GET').upper(),
-                    'inputs': len(form.find_all('input'))
-                })
-                
-        except Exception as e:
-            self.logger.debug(f"Error crawleando {url_clean}: {e}")
+        budget = getattr(self.scanner, 'budget', None)
+
+        async def worker():
+            while True:
+                priority, _, url, depth = await queue.get()
+                try:
+                    old = previous.get(url)
+                    out_of_budget = budget is not None and budget.exhausted
+                    if old and old.status == 200 and (-priority < min_likelihood or out_of_budget):
+                        record = old
+                        counters['skipped'] += 1
+                    elif out_of_budget:
+                        # Nunca visitada y sin presupuesto: queda fuera de este mapa
+                        counters['skipped'] += 1
+                        continue
+                    else:
+                        record = await self._revisit_page(url, old, depth, now, counters)
+                        if record is None:
+                            # Fallo transitorio: se conserva el registro anterior sin darlo por verificado
+                            if not old:
+                                continue
+                            record = old
+                            counters['unverified'] += 1
+                            unverified.append(url)
+                        elif old and record.changes > old.changes:
+                            changed.append(url)
+                    current[url] = record
+                    self.visited_urls.add(url)
+                    if record.status == 200:
+                        self._add_to_structure(urlparse(url))
+                        self._record_page(url, record.outlinks, record.external, record.forms)
+                        for endpoint in record.js_endpoints:
+                            self._add_js_endpoint(endpoint)
+                        self._notify_endpoint_observers(url, {'status': record.status, 'links': record.outlinks,
+                                                              'external': record.external, 'forms': record.forms,
+                                                              'js_endpoints': record.js_endpoints})
+                        enqueue_children(record, depth)
+                except Exception as e:
+                    self.logger.debug(f"Error crawleando {url}: {e}")
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.scanner.config.max_concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        counters['unverified_endpoints'] = sorted(unverified)
+        return current, changed, counters
+
+    async def _revisit_page(self, url: str, old: Optional[PageRecord], depth: int, now: float,
+                            counters: Dict[str, int]) -> Optional[PageRecord]:
+        """Fetch a page conditionally and return its updated record, or None if the fetch failed transiently."""
+        headers = {}
+        if old and old.etag:
+            headers['If-None-Match'] = old.etag
+        if old and old.last_modified:
+            headers['If-Modified-Since'] = old.last_modified
+        
+        self.logger.info(f"Revisitando URL: {url}")
+        response = await self.scanner.request("GET", url, headers=headers)
+        status = response.get('status_code', 0)
+        if status in TRANSIENT_STATUSES:
+            self.logger.debug(f"Revisita sin respuesta válida para {url} ({status or response.get('error')})")
+            return None
+        response_headers = {k.lower(): v for k, v in response.get('headers', {}).items()}
+        
+        record = PageRecord(
+            url=url,
+            depth=depth,
+            first_seen=old.first_seen if old else now,
+            last_changed=old.last_changed if old else now,
+            checks=(old.checks if old else 0) + 1,
+            changes=old.changes if old else 0,
+            last_checked=now
+        )
+        
+        if status == 304 and old:
+            counters['not_modified'] += 1
+            record.status = old.status
+            record.content_hash = old.content_hash
+            record.etag, record.last_modified = old.etag, old.last_modified
+            record.outlinks, record.external, record.forms = old.outlinks, old.external, old.forms
+            record.js_endpoints = old.js_endpoints
+            return record
+        
+        counters['fetched'] += 1
+        text = response.get('text', '')
+        record.status = status
+        record.content_hash = hashlib.md5(text.encode('utf-8', 'ignore')).hexdigest()
+        record.etag = response_headers.get('etag', '')
+        record.last_modified = response_headers.get('last-modified', '')
+        if status == 200 and text:
+            self._notify_page_observers(url, text, response.get('headers', {}))
+            if self.js_extractor:
+                record.js_endpoints = await self.js_extractor.analyze_page(url, text)
+        
+        if old and old.content_hash == record.content_hash and old.status == status:
+            # Same bytes as last time: reuse the parsed links instead of re-parsing
+            record.outlinks, record.external, record.forms = old.outlinks, old.external, old.forms
+            return record
+        
+        record.last_changed = now
+        if old:
+            record.changes += 1
+        if status == 200 and text:
+            record.outlinks, record.external, record.forms = self._parse_page(url, text)
+        return record
+
+
+def run_crawl_worker(base_url: str, frontier_spec: str, shard: int, num_shards: int,
+                     max_depth: int = 3, core_config: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Entry point for one mapper of a sharded crawl, usable as a multiprocessing
+    target or run once per host. Every worker returns the same merged map.
+    """
+    from ..core.scanner_core_async import AsyncScannerCore, ScanConfig
+
+    async def run():
+        core = AsyncScannerCore(ScanConfig(**(core_config or {})))
+        frontier = frontier_from_spec(frontier_spec, num_shards)
+        mapper = WebMapperAsync(core, frontier=frontier, shard=shard)
+        try:
+            await core.start()
+            return await mapper.map_website(base_url, max_depth=max_depth)
+        finally:
+            await core.close()
+            frontier.close()
+
+    return asyncio.run(run())
@@ -0,0 +1,167 @@
+"""
+Multi-process scanning
+Shards batch targets across worker processes, each with its own event loop and cores
+"""
+
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import os
+import queue
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .events.event_emitter import ScanEventEmitter, ScanEventType
+
+_RESULT = 'RESULT'
+_DONE = 'DONE'
+
+
+def _compact(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Plain JSON-able copy, so nothing unpicklable (or huge) crosses the process boundary"""
+    return json.loads(json.dumps(data, default=str))
+
+
+def shard_targets(targets: List[str], shards: int) -> List[List[str]]:
+    """Round-robin split: neighbouring targets (often the same site family) land on different workers"""
+    return [targets[index::shards] for index in range(shards) if targets[index::shards]]
+
+
+def run_batch_worker(worker_id: int, targets: List[str], indexes: List[int], profile: str,
+                     config: Dict[str, Any], batch_options: Dict[str, Any], events: "multiprocessing.Queue"):
+    """
+    Entry point of one worker process: scans its shard with a BatchScanner
+    and sends every event and summary back to the parent through `events`.
+    indexes are the targets' positions in the whole batch, used to name reports.
+    """
+    from .batch_scanner import BatchScanner
+
+    logging.basicConfig(level=batch_options.pop('log_level', logging.WARNING))
+    batch = BatchScanner(config, **batch_options)
+
+    def forward(event_type: ScanEventType):
+        def send(**kwargs):
+            events.put((event_type.name, worker_id, _compact(kwargs)))
+        return send
+
+    for event_type in ScanEventType:
+        if event_type not in (ScanEventType.SCAN_START, ScanEventType.SCAN_COMPLETE):
+            batch.event_emitter.on(event_type, forward(event_type), inline=True)
+
+    async def run():
+        async for summary in batch.scan(targets, profile, indexes):
+            events.put((_RESULT, worker_id, _compact(summary)))
+
+    try:
+        asyncio.run(run())
+    finally:
+        events.put((_DONE, worker_id, {}))
+
+
+class ProcessPoolScanner:
+    """
+    Batch scanning spread over several processes.
+
+    Parsing, fingerprinting and report building are CPU-bound and one event
+    loop only uses one core, so targets are sharded over `processes` workers
+    (each runs a BatchScanner with its own loop, connection pool and fair
+    limiter). The target and concurrency caps are divided between workers,
+    and events are re-emitted on this scanner's emitter in the parent, tagged
+    with target=url, so listeners do not care where a scan ran.
+    """
+    def __init__(self, config: Dict[str, Any] = None, processes: Optional[int] = None,
+                 max_targets: int = 10, per_target: int = 10, global_concurrency: int = 100,
+                 output_dir: str = 'reports', event_emitter: ScanEventEmitter = None):
+        self.config = config or {}
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.max_targets = max_targets
+        self.per_target = per_target
+        self.global_concurrency = global_concurrency
+        self.output_dir = output_dir
+        self.event_emitter = event_emitter or ScanEventEmitter()
+        self._logger = logging.getLogger(__name__)
+
+    async def scan(self, targets: List[str], profile: str = "balanced") -> AsyncIterator[Dict[str, Any]]:
+        """Scan every target; yields each summary as soon as its worker reports it"""
+        if not targets:
+            return
+        shards = shard_targets(targets, min(self.processes, len(targets)))
+        shard_indexes = shard_targets(list(range(len(targets))), len(shards))
+        # spawn: forking a process that already runs an event loop or threads is unsafe
+        context = multiprocessing.get_context('spawn')
+        events = context.Queue()
+        batch_dir = str(Path(self.output_dir) / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        batch_options = {
+            'max_targets': max(1, math.ceil(self.max_targets / len(shards))),
+            'per_target': self.per_target,
+            'global_concurrency': max(1, math.ceil(self.global_concurrency / len(shards))),
+            # One directory for the whole batch, reports numbered by their global index
+            'batch_dir': batch_dir,
+            'log_level': logging.getLogger().level or logging.WARNING,
+        }
+        workers = {
+            worker_id: context.Process(
+                target=run_batch_worker,
+                args=(worker_id, shard, shard_indexes[worker_id], profile, self.config, dict(batch_options), events),
+                name=f"scan-worker-{worker_id}",
+                daemon=True
+            )
+            for worker_id, shard in enumerate(shards)
+        }
+        pending = {worker_id: set(shard) for worker_id, shard in enumerate(shards)}
+        for process in workers.values():
+            process.start()
+
+        loop = asyncio.get_running_loop()
+        running = set(workers)
+        done = 0
+        await self.event_emitter.emit(ScanEventType.SCAN_START, url=f"{len(targets)} targets", targets=targets)
+        try:
+            while running:
+                try:
+                    kind, worker_id, data = await loop.run_in_executor(None, events.get, True, 0.5)
+                except queue.Empty:
+                    # A worker that died without saying so (killed, segfault) leaves its targets unscanned
+                    for worker_id in [w for w in running if not workers[w].is_alive()]:
+                        running.discard(worker_id)
+                        for target in sorted(pending[worker_id]):
+                            done += 1
+                            yield self._lost(target, workers[worker_id].exitcode)
+                    continue
+
+                if kind == _DONE:
+                    running.discard(worker_id)
+                    for target in sorted(pending[worker_id]):
+                        done += 1
+                        yield self._lost(target, workers[worker_id].exitcode)
+                    pending[worker_id].clear()
+                elif kind == _RESULT:
+                    pending[worker_id].discard(data['url'])
+                    done += 1
+                    await self.event_emitter.emit(
+                        ScanEventType.PROGRESS_UPDATE,
+                        message=f"Finished {data['url']} ({done}/{len(targets)}, worker {worker_id})"
+                    )
+                    yield data
+                else:
+                    await self.event_emitter.emit(ScanEventType[kind], worker=worker_id, **data)
+        finally:
+            for process in workers.values():
+                if process.is_alive():
+                    process.terminate()
+                process.join(timeout=5)
+            events.close()
+            await self.event_emitter.emit(ScanEventType.SCAN_COMPLETE, report=batch_dir)
+            await self.event_emitter.close()
+
+    async def run(self, targets: List[str], profile: str = "balanced") -> List[Dict[str, Any]]:
+        """Scan every target and return all summaries (in completion order)"""
+        return [summary async for summary in self.scan(targets, profile)]
+
+    def _lost(self, target: str, exitcode: Optional[int]) -> Dict[str, Any]:
+        self._logger.error(f"Worker exited ({exitcode}) before finishing {target}")
+        return {'url': target, 'vulnerabilities': [], 'technologies': {}, 'report': None,
+                'error': f"worker process exited with code {exitcode}"}
@@ -1,14 +1,11 @@
 import json
 from datetime import datetime
 import html
-import openpyxl
-from docx import Document
-from flask import Flask, send_file, request
-from fpdf import FPDF
 import re
 
+# openpyxl, python-docx, fpdf y Flask solo se importan al generar ese formato o al crear
+# la app de descargas: importar este módulo para el reporte HTML no los carga
 
-app = Flask(__name__)
 
 def generar_reporte_json(resultados, nombre_archivo="scan_results.json"):
     """Genera un reporte en formato JSON"""
@@ -124,6 +121,8 @@ def generar_tabla_vulns(vulns, campos):
 
 def generar_reporte_excel(resultados, nombre_archivo="scan_results.xlsx"):
     """Genera un reporte en formato Excel (XLSX)"""
+    import openpyxl
+
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "Vulnerabilidades"
@@ -151,6 +150,8 @@ def generar_reporte_excel(resultados, nombre_archivo="scan_results.xlsx"):
 
 def generar_reporte_word(resultados, nombre_archivo="scan_results.docx"):
     """Genera un reporte en formato Word (DOCX)"""
+    from docx import Document
+
     doc = Document()
     doc.add_heading('Reporte Web Security Scanner', 0)
 
@@ -192,6 +193,7 @@ def generar_reporte_pdf(resultados=None, pdf_file="scan_results.pdf"):
             with open("scan_results.json", encoding="utf-8") as f:
                 resultados = json.load(f).get("resultados", {})
 
+        from fpdf import FPDF
         pdf = FPDF()
         pdf.add_page()
         pdf.set_auto_page_break(auto=True, margin=15)
@@ -304,48 +306,60 @@ def get_severity_and_desc(vuln_type):
         else:
             return ("Desconocida", "No se pudo determinar la gravedad.")
 
-@app.route('/descargar/<tipo>')
-def descargar(tipo):
-    # Carga los resultados desde el HTML generado (parseando el JSON embebido o leyendo el archivo JSON)
-    # Aquí usamos el archivo scan_results.json que se genera junto con el HTML
-    try:
+def crear_app():
+    """Crea la app Flask que sirve las descargas enlazadas desde el reporte HTML"""
+    from flask import Flask, send_file
+
+    app = Flask(__name__)
+
+    @app.route('/descargar/<tipo>')
+    def descargar(tipo):
+        # Carga los resultados desde el HTML generado (parseando el JSON embebido o leyendo el archivo JSON)
+        # Aquí usamos el archivo scan_results.json que se genera junto con el HTML
+        try:
+            with open('scan_results.json', encoding='utf-8') as f:
+                resultados = json.load(f)['resultados']
+        except Exception as e:
+            return f"No se pudo cargar la información del reporte: {e}", 500
+
+        if tipo == 'excel':
+            generar_reporte_excel(resultados)
+            return send_file('scan_results.xlsx', as_attachment=True)
+        elif tipo == 'word':
+            generar_reporte_word(resultados)
+            return send_file('scan_results.docx', as_attachment=True)
+        elif tipo == 'pdf':
+            generar_reporte_pdf(resultados)
+            return send_file('scan_results.pdf', as_attachment=True)
+        else:
+            return "Tipo de reporte no soportado", 400
+
+    # Solo genera Excel y Word cuando el usuario lo descarga desde el HTML
+    @app.route('/descargar/excel')
+    def descargar_excel():
         with open('scan_results.json', encoding='utf-8') as f:
             resultados = json.load(f)['resultados']
-    except Exception as e:
-        return f"No se pudo cargar la información del reporte: {e}", 500
-
-    if tipo == 'excel':
         generar_reporte_excel(resultados)
         return send_file('scan_results.xlsx', as_attachment=True)
-    elif tipo == 'word':
+
+    @app.route('/descargar/word')
+    def descargar_word():
+        with open('scan_results.json', encoding='utf-8') as f:
+            resultados = json.load(f)['resultados']
         generar_reporte_word(resultados)
         return send_file('scan_results.docx', as_attachment=True)
-    elif tipo == 'pdf':
-        generar_reporte_pdf(resultados)
-        return send_file('scan_results.pdf', as_attachment=True)
-    else:
-        return "Tipo de reporte no soportado", 400
-
-# Solo genera Excel y Word cuando el usuario lo descarga desde el HTML
-@app.route('/descargar/excel')
-def descargar_excel():
-    with open('scan_results.json', encoding='utf-8') as f:
-        resultados = json.load(f)['resultados']
-    generar_reporte_excel(resultados)
-    return send_file('scan_results.xlsx', as_attachment=True)
-
-@app.route('/descargar/word')
-def descargar_word():
-    with open('scan_results.json', encoding='utf-8') as f:
-        resultados = json.load(f)['resultados']
-    generar_reporte_word(resultados)
-    return send_file('scan_results.docx', as_attachment=True)
-
-@app.route('/descargar/pdf')
-def descargar_pdf():
-    # Genera el PDF solo cuando se solicita
-    generar_reporte_pdf()
-    return send_file('scan_results.pdf', as_attachment=True)
 
+    @app.route('/descargar/pdf')
+    def descargar_pdf():
+        # Genera el PDF solo cuando se solicita
+        generar_reporte_pdf()
+        return send_file('scan_results.pdf', as_attachment=True)
 
+    return app
 
+def __getattr__(name):
+    # reporte.app se sigue pudiendo usar, pero la app se crea la primera vez que se pide
+    if name == 'app':
+        app = globals()['app'] = crear_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,17 +4,26 @@ Main scanner script with modular design and advanced features
 """
 
 import argparse
+import queue
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from urllib.parse import urljoin
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+from core.checkpoint import ScanCheckpoint
+from core.progress import ScanProgress, progress_line
 from core.config import Config
 from core.logger import setup_logger, ScanLogger
 from core.scanner_core import ScannerCore
 from modules.technology_detector import TechnologyDetector
+from modules.site_technology import SiteTechnologyAggregator
+from modules.cookie_analyzer import CookieAnalyzer, response_cookies
 from modules.web_mapper import WebMapper
+from modules.scan_planner import ScanPlanner, XML_PROBE, XML_TESTERS, tester_family, tester_priority
 from utils.i18n import i18n
 from modules.vulnerability_testers import (
     SQLInjectionTester,
@@ -38,11 +47,13 @@ init(autoreset=True)
 class WebSecurityScannerV4:
     """Enhanced Web Security Scanner with modular architecture"""
     
-    def __init__(self, url: str, config: Config, verbose: bool = False, generate_map: bool = True):
+    def __init__(self, url: str, config: Config, verbose: bool = False, generate_map: bool = True,
+                 resume: bool = False):
         self.url = url
         self.config = config
         self.verbose = verbose
         self.generate_map = generate_map
+        self.resume = resume
         
         # Setup logging
         log_config = config.config.get('logging', {})
@@ -59,14 +70,60 @@ class WebSecurityScannerV4:
         
         # Initialize technology detector
         self.tech_detector = TechnologyDetector(self.logger)
+        self.site_technologies = SiteTechnologyAggregator(
+            saturation=config.get('technology_detection.saturation', 5)
+        )
+        
+        self.cookies = CookieAnalyzer(
+            max_samples=config.get('cookies.sample_size', 10),
+            min_entropy_bits=config.get('cookies.min_entropy_bits', 64)
+        )
         
         # Initialize web mapper
         if self.generate_map:
             self.web_mapper = WebMapper(self.scanner, self.logger)
+            self.web_mapper.ct_logs = list(config.get('subdomains.ct_logs', []) or [])
+            if config.get('technology_detection.site_wide', True):
+                # Fingerprint every crawled page as it is downloaded
+                self.web_mapper.add_page_observer(self.site_technologies.observe)
+        
+        # Forms found by the crawl are tested while it keeps going
+        self.pipelined = self.generate_map and config.get('pipeline.enabled', True)
+        self.form_queue = queue.Queue()
+        self.crawl_thread = None
+        self.map_data = None
+        self._seen_forms = set()
+        self._forms_lock = threading.Lock()
+        if self.pipelined:
+            self.web_mapper.add_page_observer(self._on_crawled_page)
         
         # Initialize vulnerability testers
         self.testers = self._initialize_testers()
         
+        # Completed payloads, queued forms and findings survive a crash in the scans database
+        self.checkpoint = None
+        self._finding_keys = set()
+        if config.get('database.enabled', False):
+            self.checkpoint = ScanCheckpoint(
+                config.get('database.path', 'scans.db'),
+                url,
+                interval=config.get('database.checkpoint_interval', 5)
+            )
+            for tester in self.testers.values():
+                tester.checkpoint = self.checkpoint
+        
+        # Planned/completed payload jobs, reported with rates and ETA while testing
+        self.progress = ScanProgress()
+        for tester in self.testers.values():
+            tester.progress = self.progress
+        # Forms the scan budget left untested
+        self._not_covered = []
+        self.scan_plan = None
+        # Form action -> status of the XML probe (None: no answer), each action is probed once
+        self._xml_probes = {}
+        self.content_types = []
+        self.server_banner = ''
+        
         # Results storage
         self.results = {
             'url': url,
@@ -136,24 +193,72 @@ class WebSecurityScannerV4:
         print(f"{Fore.CYAN}{i18n.get('scanner.testers_info', count=len(self.testers))}")
         print(f"{Fore.CYAN}{'='*60}\n")
         
-        # Step 1: Initial connection test
-        self._test_connection()
-        
-        # Step 2: Detect technologies
-        if self.config.get('technology_detection.enabled', True):
-            self._detect_technologies()
-        
-        # Step 3: Crawl and discover
-        self._crawl_site()
-        
-        # Step 4: Test vulnerabilities
-        self._test_vulnerabilities()
-        
-        # Step 5: Show results
-        self._show_results()
-        
-        # Step 6: Generate reports
-        self._generate_reports()
+        try:
+            # Step 1: Initial connection test
+            if self.scanner.budget:
+                self.scanner.budget.start()
+            self._test_connection()
+            self._begin_checkpoint()
+            
+            # Step 2: Detect technologies
+            if self.config.get('technology_detection.enabled', True):
+                self._detect_technologies()
+            
+            # Step 3: Crawl and discover
+            self._crawl_site()
+            
+            # Step 3.1: Cookie flags and session id strength
+            if self.config.get('cookies.enabled', True):
+                self._analyze_cookies()
+            
+            # Step 3.5: Plan which testers and payloads make sense for this target
+            if self.config.get('planning.enabled', True):
+                self._plan_scan()
+            
+            # Step 4: Test vulnerabilities (overlapping the crawl when pipelined)
+            if self.pipelined:
+                self._start_crawl()
+            self._test_vulnerabilities()
+            if self.checkpoint:
+                self.checkpoint.finish()
+            
+            # Step 5: Show results
+            self._show_results()
+            
+            # Step 6: Generate reports
+            self._generate_reports()
+        finally:
+            if self.checkpoint:
+                self.checkpoint.close()
+    
+    def _begin_checkpoint(self):
+        """Start the checkpoint; on resume requeue the stored forms and restore the findings"""
+        if not self.checkpoint:
+            return
+        if not self.checkpoint.begin(self.resume):
+            return
+        forms = self.checkpoint.load_state('forms', [])
+        for form in forms:
+            self._add_form(form)
+        for finding in self.checkpoint.findings():
+            self._finding_keys.add(ScanCheckpoint.finding_key(finding))
+            self.results['vulnerabilities'].append(finding)
+        print(f"{Fore.CYAN}[*] Resuming: {self.checkpoint.completed} payloads already sent, "
+              f"{len(forms)} forms, {len(self.results['vulnerabilities'])} findings restored")
+    
+    def _add_vulnerabilities(self, vulnerabilities: list) -> list:
+        """Record findings (checkpointed); returns those not already restored from before a resume"""
+        new = []
+        for vuln in vulnerabilities:
+            key = ScanCheckpoint.finding_key(vuln)
+            if key in self._finding_keys:
+                continue
+            self._finding_keys.add(key)
+            if self.checkpoint:
+                self.checkpoint.add_finding(vuln)
+            new.append(vuln)
+        self.results['vulnerabilities'].extend(new)
+        return new
     
     def _test_connection(self):
         """Test initial connection to target"""
@@ -179,78 +284,307 @@ class WebSecurityScannerV4:
         
         if response:
             self.results['technologies'] = self.tech_detector.detect_all(response)
+            self.results['technology_versions'] = dict(self.tech_detector.versions)
+            self.site_technologies.observe(self.url, response.text, response.headers)
+            for waf in self.results['technologies'].get('waf', []):
+                self.scanner.waf_guard.note_waf(self.url, waf)
             
             print(f"{Fore.GREEN}[+] {i18n.get('technologies.completed_short')}")
             
             # Show detected technologies
             for category, techs in self.results['technologies'].items():
                 if techs:
-                    print(f"{Fore.CYAN}  {category.replace('_', ' ').title()}: {Fore.YELLOW}{', '.join(str(t) if isinstance(t, str) else t.get('name', 'Unknown') for t in techs)}")
+                    names = [str(t) if isinstance(t, str) else t.get('name', 'Unknown') for t in techs]
+                    names = [f"{name} {self.tech_detector.versions[name]}" if name in self.tech_detector.versions else name
+                             for name in names]
+                    print(f"{Fore.CYAN}  {category.replace('_', ' ').title()}: {Fore.YELLOW}{', '.join(names)}")
     
     def _crawl_site(self):
         """Crawl site to discover forms and parameters"""
         self.logger.info("Crawling site...")
         print(f"\n{Fore.BLUE}[*] Crawling site...")
         
-        # This would be implemented with a proper crawler
-        # For now, we'll just analyze the main page
+        # Only the landing page here; when pipelined the web map crawl adds the forms of every other page
         response = self.scanner.make_request(self.url, 'GET')
         
         if response:
+            # Cached responses keep their Set-Cookie headers, so this costs no request
+            self.cookies.observe(self.url, response)
             from bs4 import BeautifulSoup
             soup = BeautifulSoup(response.text, 'html.parser')
+            self.content_types.append(response.headers.get('Content-Type', ''))
+            self.server_banner = response.headers.get('Server', '')
             
             # Extract forms
-            forms = soup.find_all('form')
-            for form in forms:
-                action = form.get('action', self.url)
-                method = form.get('method', 'GET').upper()
-                
-                # Normalize action URL
-                if action and not action.startswith('http'):
-                    if action.startswith('/'):
-                        from urllib.parse import urlparse
-                        parsed = urlparse(self.url)
-                        action = f"{parsed.scheme}://{parsed.netloc}{action}"
-                    else:
-                        action = f"{self.url.rstrip('/')}/{action}"
-                
-                inputs = []
-                for input_tag in form.find_all(['input', 'textarea', 'select']):
-                    name = input_tag.get('name')
-                    if name and input_tag.get('type') != 'submit':
-                        inputs.append(name)
-                
-                if inputs:
-                    self.results['forms'].append({
-                        'action': action,
-                        'method': method,
-                        'inputs': inputs
-                    })
+            for form in self._extract_forms(self.url, soup):
+                self._add_form(form)
             
             print(f"{Fore.GREEN}[+] Found {len(self.results['forms'])} forms")
     
+    def _extract_forms(self, page_url: str, soup) -> list:
+        """Forms with at least one named input, action resolved against the page URL"""
+        forms = []
+        for form in soup.find_all('form'):
+            action = urljoin(page_url, form.get('action') or page_url)
+            method = form.get('method', 'GET').upper()
+            
+            inputs = []
+            for input_tag in form.find_all(['input', 'textarea', 'select']):
+                name = input_tag.get('name')
+                if name and input_tag.get('type') != 'submit':
+                    inputs.append(name)
+            
+            self.content_types.append(form.get('enctype', ''))
+            if inputs:
+                forms.append({
+                    'action': action,
+                    'method': method,
+                    'inputs': inputs
+                })
+        return forms
+    
+    def _add_form(self, form: dict) -> bool:
+        """Record a form once (same action, method and inputs) and queue it for testing"""
+        key = (form['action'], form['method'], tuple(sorted(form['inputs'])))
+        with self._forms_lock:
+            if key in self._seen_forms:
+                return False
+            self._seen_forms.add(key)
+            self.results['forms'].append(form)
+            if self.checkpoint:
+                self.checkpoint.save_state('forms', self.results['forms'])
+        self.form_queue.put(form)
+        return True
+    
+    def _on_crawled_page(self, url: str, html: str, headers):
+        """Page observer of the mapper: hand the page's forms to the testers right away"""
+        if '<form' not in html.lower():
+            return
+        from bs4 import BeautifulSoup
+        max_forms = self.config.get('pipeline.max_endpoints', 100)
+        for form in self._extract_forms(url, BeautifulSoup(html, 'html.parser')):
+            if len(self._seen_forms) >= max_forms:
+                return
+            if self._add_form(form):
+                self.logger.debug(f"Queued form {form['method']} {form['action']}")
+    
+    def _start_crawl(self):
+        """Run the web map crawl in the background; its pages feed the form queue"""
+        def crawl():
+            try:
+                self.map_data = self.web_mapper.map_website(self.url, max_depth=self.config.get('scanner.max_depth', 3))
+            except Exception as e:
+                self.logger.error(f"Error crawling site: {e}")
+        
+        print(f"\n{Fore.BLUE}[*] Crawling site in the background...")
+        self.crawl_thread = threading.Thread(target=crawl, name='crawl', daemon=True)
+        self.crawl_thread.start()
+    
+    def _next_form(self):
+        """Next queued form; None once the queue is empty and the crawl has finished"""
+        while True:
+            crawling = self.crawl_thread is not None and self.crawl_thread.is_alive()
+            try:
+                return self.form_queue.get(timeout=0.2)
+            except queue.Empty:
+                if not crawling:
+                    return None
+    
+    def _analyze_cookies(self):
+        """Check cookie flags and sample fresh sessions in parallel to measure session id entropy"""
+        sample_size = self.config.get('cookies.sample_size', 10)
+        threads = self.config.get('scanner.threads', 10)
+        
+        for host, name, url in self.cookies.needs_samples(sample_size) if sample_size > 1 else []:
+            missing = sample_size - len(self.cookies.samples.get((host, name), []))
+            with ThreadPoolExecutor(max_workers=min(threads, missing)) as executor:
+                responses = list(executor.map(lambda _: self.scanner.make_request(url, 'GET', stateless=True),
+                                              range(missing)))
+            self.cookies.add_samples(host, name, [
+                cookie.value for response in responses if response
+                for cookie in response_cookies(response) if cookie.name == name and not cookie.deleted
+            ])
+        
+        findings = self.cookies.findings()
+        for entry in findings:
+            weak = entry['weak'] or entry['reused']
+            self._add_vulnerabilities([{
+                'url': entry['url'],
+                'method': 'GET',
+                'payload': entry['name'],
+                'parameters': [entry['name']],
+                'type': i18n.get('vulnerabilities.weak_session_id' if weak else 'vulnerabilities.insecure_cookie'),
+                'severity': 'high' if entry['reused'] else 'medium' if weak or entry['session'] else 'low',
+                'description': i18n.get('vulnerabilities.evidence.session_id', name=entry['name'],
+                                        issues='; '.join(entry['issues'])),
+                'cwe': 'CWE-330' if weak else 'CWE-614',
+                'owasp': 'A07:2021' if weak else 'A05:2021'
+            }])
+        self.results['cookies'] = {
+            'session_cookies': [f"{host} {name}" for host, name in self.cookies.session_cookies()],
+            'entropy': {f"{host} {name}": self.cookies.entropy(host, name)
+                        for host, name in self.cookies.session_cookies()},
+            'issues': findings
+        }
+        if findings:
+            print(f"{Fore.YELLOW}[!] {len(findings)} cookie issue(s) found")
+    
+    def _plan_scan(self):
+        """Prune testers and payload families for the detected stack and show the plan"""
+        # When pipelined the crawl has not found its forms yet: XXE is decided after it (_xml_testers_after_crawl)
+        probe = 'xxe' in self.testers and not self.pipelined
+        planner = ScanPlanner(self.results['technologies'], self.content_types, self.server_banner,
+                              self._probe_xml() if probe else ())
+        max_payloads = {
+            name: self.config.get(f'vulnerabilities.{name}.max_payloads') for name in self.testers
+        }
+        self.scan_plan = planner.plan(
+            self.testers,
+            targets=len(self.results['forms']),
+            baseline_requests=1,
+            max_payloads=max_payloads
+        )
+        self.results['scan_plan'] = self.scan_plan.to_dict()
+        
+        print(f"\n{Fore.BLUE}[*] Scan plan:")
+        for line in self.scan_plan.summary_lines():
+            color = Fore.YELLOW if line.lstrip().startswith('-') else Fore.CYAN
+            print(f"{color}  {line}")
+    
+    def _probe_xml(self) -> list:
+        """
+        Statuses of an XML body posted to each form action found so far, so
+        the planner can rule XXE out. Actions already probed are not sent again.
+        """
+        for action in sorted({form['action'] for form in self.results['forms']}):
+            if action not in self._xml_probes:
+                response = self.scanner.make_request(action, 'POST', data=XML_PROBE,
+                                                     headers={'Content-Type': 'application/xml'})
+                self._xml_probes[action] = response.status_code if response is not None else None
+        return [status for status in self._xml_probes.values() if status is not None]
+    
+    def _xml_testers_after_crawl(self, testers: dict) -> dict:
+        """
+        XML testers held back while pipelined: once the crawl is over, probe
+        every form it found and drop them if all of them refused XML
+        """
+        planner = ScanPlanner(self.results['technologies'], self.content_types, self.server_banner,
+                              self._probe_xml())
+        accepts_xml = planner.accepts_xml()
+        self.scan_plan.facts['accepts_xml'] = accepts_xml
+        if accepts_xml is not False:
+            return testers
+        for name in testers:
+            self.scan_plan.skip(name, 'no endpoint accepts XML')
+            print(f"{Fore.YELLOW}[*] Skipping {name}: no endpoint accepts XML")
+        self.results['scan_plan'] = self.scan_plan.to_dict()
+        return {}
+    
     def _test_vulnerabilities(self):
-        """Test for vulnerabilities"""
-        if not self.results['forms']:
+        """Test every queued form with the planned testers, as forms arrive from the crawl"""
+        # Most valuable testers first: a scan budget is spent on them before the rest
+        ranked = sorted(self.testers.items(), key=lambda item: tester_priority(item[0]), reverse=True)
+        testers = {name: tester for name, tester in ranked
+                   if not self.scan_plan or self.scan_plan.is_enabled(name)}
+        held = {}
+        if self.pipelined and self.scan_plan:
+            held = {name: tester for name, tester in testers.items() if tester_family(name) in XML_TESTERS}
+            testers = {name: tester for name, tester in testers.items() if name not in held}
+        if not self.pipelined and not self.results['forms']:
             print(f"{Fore.YELLOW}[!] No forms found, skipping vulnerability tests")
             return
         
         print(f"\n{Fore.BLUE}[*] Testing for vulnerabilities...")
         
-        for tester_name, tester in self.testers.items():
+        def run(tester_name, tester, form):
             vuln_config = self.config.config['vulnerabilities'].get(tester_name, {})
-            max_payloads = vuln_config.get('max_payloads')
-            
-            self.logger.info(f"Testing {tester_name}...")
-            print(f"\n{Fore.BLUE}[*] Testing {tester_name.replace('_', ' ').title()}...")
-            
-            for form in self.results['forms']:
-                vulnerabilities = tester.test_form(form, max_payloads)
-                self.results['vulnerabilities'].extend(vulnerabilities)
+            self.logger.info(f"Testing {tester_name} on {form['action']}...")
+            return tester_name, tester.test_form(form, vuln_config.get('max_payloads'))
+        
+        workers = self.config.get('pipeline.workers', 4) if self.pipelined else 1
+        stop_reports = self._start_progress_reports()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = []
+                form = self._next_form()
+                while form is not None:
+                    if self.scanner.budget and self.scanner.budget.exhausted:
+                        self._not_covered.append(form['action'])
+                    else:
+                        futures.extend(executor.submit(run, name, tester, form) for name, tester in testers.items())
+                    form = self._next_form()
                 
-                if vulnerabilities:
-                    print(f"{Fore.RED}[!] Found {len(vulnerabilities)} {tester_name} vulnerabilities")
+                # The crawl is over: every form is known, so the XML probe can rule XXE in or out
+                if held and not (self.scanner.budget and self.scanner.budget.exhausted):
+                    for name, tester in self._xml_testers_after_crawl(held).items():
+                        futures.extend(executor.submit(run, name, tester, form)
+                                       for form in list(self.results['forms']))
+                
+                for future in as_completed(futures):
+                    try:
+                        tester_name, vulnerabilities = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error testing form: {e}")
+                        continue
+                    vulnerabilities = self._add_vulnerabilities(vulnerabilities)
+                    
+                    if vulnerabilities:
+                        print(f"{Fore.RED}[!] Found {len(vulnerabilities)} {tester_name} vulnerabilities")
+        finally:
+            stop_reports.set()
+            self.results['progress'] = self._progress_snapshot()
+            self._print_progress(self.results['progress'])
+        
+        if not self.results['forms']:
+            print(f"{Fore.YELLOW}[!] No forms found, skipping vulnerability tests")
+        
+        self._report_budget()
+        self.results['waf_guard'] = self.scanner.waf_guard.report()
+        for host, state in self.results['waf_guard'].items():
+            if state['blocks']:
+                print(f"{Fore.YELLOW}[!] WAF {state['waf'] or 'unknown'} on {host}: {state['blocks']} blocked requests, "
+                      f"delay {state['delay']}s, payload encoding {state['encoding']}")
+    
+    def _report_budget(self):
+        """Budget use and, when it ran out, the forms and payload jobs left untested"""
+        budget = self.scanner.budget
+        if not budget:
+            return
+        with self.scanner.stats_lock:
+            requests, received = self.scanner.stats['total_requests'], self.scanner.stats['bytes_received']
+        report = budget.report(requests, received)
+        report['not_covered'] = {'forms': list(self._not_covered), 'jobs': self.progress.skipped()}
+        self.results['budget'] = report
+        if not budget.exhausted:
+            return
+        missing = report['not_covered']
+        print(f"{Fore.YELLOW}[!] Budget exhausted ({budget.exhausted_by}) after {report['used']['time']}s, "
+              f"{requests} requests, {received} bytes: {len(missing['forms'])} forms and "
+              f"{sum(missing['jobs'].values())} payload jobs not tested")
+        for name, jobs in sorted(missing['jobs'].items()):
+            print(f"{Fore.YELLOW}    - {name}: {jobs} jobs not tested")
+    
+    def _start_progress_reports(self) -> threading.Event:
+        """Print a progress line every progress.interval seconds until the returned event is set"""
+        stop = threading.Event()
+        interval = self.config.get('progress.interval', 5)
+        if interval and interval > 0:
+            def report():
+                while not stop.wait(interval):
+                    self._print_progress(self._progress_snapshot())
+            threading.Thread(target=report, name='progress-reporter', daemon=True).start()
+        return stop
+    
+    def _progress_snapshot(self) -> dict:
+        with self.scanner.stats_lock:
+            requests, received = self.scanner.stats['total_requests'], self.scanner.stats['bytes_received']
+        return self.progress.snapshot(requests, received)
+    
+    def _print_progress(self, snapshot: dict):
+        print(f"{Fore.CYAN}[*] {progress_line(snapshot)}")
+        if self.verbose:
+            for name, tester in snapshot['testers'].items():
+                print(f"{Fore.CYAN}      {name}: {tester['done']}/{tester['planned']} ({tester['percent']:.1f}%)")
     
     def _show_results(self):
         """Display scan results"""
@@ -299,12 +633,12 @@ class WebSecurityScannerV4:
         reporting_config = self.config.config.get('reporting', {})
         formats = reporting_config.get('formats', ['json'])
         
-        if 'json' in formats:
-            self._save_json_report()
-        
-        # Generate HTML Web Map
+        # Generate HTML Web Map (first: its crawl feeds site-wide technology detection)
         if self.generate_map and hasattr(self, 'web_mapper'):
             self._generate_web_map()
+        
+        if 'json' in formats:
+            self._save_json_report()
     
     def _generate_web_map(self):
         """Generate interactive HTML web map"""
@@ -315,8 +649,9 @@ class WebSecurityScannerV4:
             # Get max depth from config
             max_depth = self.config.get('scanner.max_depth', 3)
             
-            # Map the website
-            map_data = self.web_mapper.map_website(self.url, max_depth=max_depth)
+            # Map the website (already crawled in the background when pipelined)
+            map_data = self.map_data or self.web_mapper.map_website(self.url, max_depth=max_depth)
+            self._merge_site_technologies()
             
             # Add technologies and vulnerabilities to map
             self.web_mapper.add_technologies(self.url, self.results['technologies'])
@@ -338,6 +673,22 @@ class WebSecurityScannerV4:
             self.logger.error(f"Error generating web map: {e}")
             print(f"{Fore.RED}[!] Error generating web map: {e}")
     
+    def _merge_site_technologies(self):
+        """Add technologies seen on crawled pages to the landing-page results"""
+        site_results = self.site_technologies.results()
+        new_techs = []
+        for category, techs in site_results.items():
+            current = self.results['technologies'].setdefault(category, [])
+            for tech in techs:
+                if tech not in current:
+                    current.append(tech)
+                    new_techs.append(tech)
+        
+        self.results['technology_evidence'] = self.site_technologies.detailed_report()
+        print(f"{Fore.GREEN}[+] Site-wide detection: {self.site_technologies.pages_observed} pages analyzed")
+        if new_techs:
+            print(f"{Fore.CYAN}  Only on inner pages: {Fore.YELLOW}{', '.join(sorted(new_techs))}")
+    
     def _save_json_report(self):
         """Save results to JSON file"""
         import json
@@ -381,6 +732,16 @@ def main():
                        help='Generate interactive HTML web map (default: True)')
     parser.add_argument('--no-map', action='store_true',
                        help='Disable HTML map generation')
+    parser.add_argument('--ct-log', action='append', metavar='FILE',
+                       help='Certificate transparency dump (JSON lines/CSV, .gz ok) to mine for subdomains; repeatable')
+    parser.add_argument('--checkpoint', nargs='?', const='', metavar='DB',
+                       help='Save progress to the scans database (DB, default database.path) so the scan can be resumed')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted scan of this URL from the scans database (implies --checkpoint)')
+    parser.add_argument('--max-time', type=float, metavar='SECONDS',
+                       help='Stop sending requests after this much wall time (budget.max_time)')
+    parser.add_argument('--max-requests', type=int, metavar='N', help='Request cap for the whole scan')
+    parser.add_argument('--max-bytes', type=int, metavar='N', help='Cap on response bytes received')
     
     # Authentication
     parser.add_argument('--auth-type', choices=['basic', 'bearer', 'session', 'oauth'],
@@ -417,6 +778,18 @@ def main():
     if args.profile:
         config.apply_profile(args.profile)
     
+    if args.ct_log:
+        config.set('subdomains.ct_logs', args.ct_log)
+    
+    for cap in ('max_time', 'max_requests', 'max_bytes'):
+        if getattr(args, cap) is not None:
+            config.set(f'budget.{cap}', getattr(args, cap))
+    
+    if args.checkpoint is not None or args.resume:
+        config.set('database.enabled', True)
+        if args.checkpoint:
+            config.set('database.path', args.checkpoint)
+    
     # Apply log level if specified
     if args.log_level:
         config.set('logging.level', args.log_level)
@@ -441,7 +814,8 @@ def main():
         # Determine if map generation should be enabled
         generate_map = args.generate_map and not args.no_map
         
-        scanner = WebSecurityScannerV4(args.url, config, args.verbose, generate_map=generate_map)
+        scanner = WebSecurityScannerV4(args.url, config, args.verbose, generate_map=generate_map,
+                                       resume=args.resume)
         
         # Setup authentication if configured
         if config.get('authentication.enabled'):
@@ -458,6 +832,8 @@ def main():
         
     except KeyboardInterrupt:
         print(f"\n{Fore.YELLOW}[!] Scan interrupted by user")
+        if config.get('database.enabled', False):
+            print(f"{Fore.CYAN}[*] Progress was saved; run again with --resume to continue")
         sys.exit(0)
     except Exception as e:
         print(f"\n{Fore.RED}[!] Error: {e}")
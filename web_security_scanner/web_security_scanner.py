@@ -29,6 +29,8 @@ from Tecnologias import TECNOLOGIAS
 from js_frameworks import JSframeworks
 from cms_fingerprints import CMS_fingerprints
 from analytics_patterns import ANALYTICS_PATTERNS
+from modules.fingerprint_index import FINGERPRINT_INDEX
+from modules.site_technology import SiteTechnologyAggregator
 from reporte import generar_reporte_html, generar_reporte_excel, generar_reporte_word, generar_reporte_pdf
 
 init(autoreset=True)
@@ -173,6 +175,9 @@ class WebSecurityScanner:
         self.meta_signatures = {
             'generator': CMS_fingerprints
         }
+        self.fingerprint_index = FINGERPRINT_INDEX
+        # Acumula evidencia de tecnologías de todas las páginas exploradas
+        self.site_technologies = SiteTechnologyAggregator(self.fingerprint_index)
 
     def load_subdir_and_subdomain_wordlists(self):
         # Carga las wordlists de subdirectorios y subdominios
@@ -238,81 +243,20 @@ class WebSecurityScanner:
         try:
             # Analiza cabeceras HTTP
             for header_name, header_value in headers.items():
-                if 'servers' in self.tech_signatures:
-                    for server, patterns in self.tech_signatures['servers'].items():
-                        for pattern in patterns:
-                            if pattern.lower() in header_value.lower():
-                                if server not in detected_tech['servers']:
-                                    detected_tech['servers'].append(server)
-                if 'languages' in self.tech_signatures:
-                    for lang, patterns in self.tech_signatures['languages'].items():
-                        for pattern in patterns:
-                            if pattern.lower() in header_value.lower():
-                                if lang not in detected_tech['languages']:
-                                    detected_tech['languages'].append(lang)
+                for fp in self.fingerprint_index.match(header_value, ['tech']):
+                    if fp.category in ('servers', 'languages') and fp.tech not in detected_tech[fp.category]:
+                        detected_tech[fp.category].append(fp.tech)
             # Analiza etiquetas meta para CMS
             soup = BeautifulSoup(html_content, 'html.parser')
-            meta_tags = soup.find_all('meta')
-            for meta in meta_tags:
+            for meta in soup.find_all('meta'):
                 if meta.get('name') == 'generator' and meta.get('content'):
-                    content = meta.get('content').lower()
-                    for cms, patterns in self.meta_signatures['generator'].items():
-                        for pattern in patterns:
-                            if pattern.lower() in content:
-                                if cms not in detected_tech['cms']:
-                                    detected_tech['cms'].append(cms)
-            # Analiza scripts para frameworks JS y analytics
-            scripts = soup.find_all('script')
-            for script in scripts:
-                script_src = script.get('src', '')
-                script_content = script.string if script.string else ''
-                if 'js_frameworks' in self.tech_signatures:
-                    for framework, patterns in self.tech_signatures['js_frameworks'].items():
-                        for pattern in patterns:
-                            if (pattern.lower() in script_src.lower() or 
-                                (script_content and pattern.lower() in script_content.lower())):
-                                if framework not in detected_tech['js_frameworks']:
-                                    detected_tech['js_frameworks'].append(framework)
-                if 'frontend' in self.tech_signatures:
-                    for framework, patterns in self.tech_signatures['frontend'].items():
-                        for pattern in patterns:
-                            if (pattern.lower() in script_src.lower() or 
-                                (script_content and pattern.lower() in script_content.lower())):
-                                if framework not in detected_tech['frontend']:
-                                    detected_tech['frontend'].append(framework)
-                if 'analytics' in self.tech_signatures:
-                    for analytics, patterns in self.tech_signatures['analytics'].items():
-                        for pattern in patterns:
-                            if (pattern.lower() in script_src.lower() or 
-                                (script_content and pattern.lower() in script_content.lower())):
-                                if analytics not in detected_tech['analytics']:
-                                    detected_tech['analytics'].append(analytics)
-            # Analiza enlaces <link> para detectar CMS y frameworks frontend
-            links = soup.find_all('link')
-            for link in links:
-                href = link.get('href', '')
-                # Detección de CMS por patrones en href
-                if 'cms' in self.tech_signatures:
-                    for cms, patterns in self.tech_signatures['cms'].items():
-                        for pattern in patterns:
-                            if pattern.lower() in href.lower():
-                                if cms not in detected_tech['cms']:
-                                    detected_tech['cms'].append(cms)
-                # Detección de frameworks frontend por patrones en href
-                if 'frontend' in self.tech_signatures:
-                    for framework, patterns in self.tech_signatures['frontend'].items():
-                        for pattern in patterns:
-                            if pattern.lower() in href.lower():
-                                if framework not in detected_tech['frontend']:
-                                    detected_tech['frontend'].append(framework)
-            # Busca patrones en todo el HTML para tecnologías adicionales (fallback)
-            for category, tech_dict in self.tech_signatures.items():
-                if category in detected_tech:
-                    for tech, patterns in tech_dict.items():
-                        for pattern in patterns:
-                            if pattern.lower() in html_content.lower():
-                                if tech not in detected_tech[category]:
-                                    detected_tech[category].append(tech)
+                    for fp in self.fingerprint_index.match(meta.get('content'), ['cms']):
+                        if fp.tech not in detected_tech['cms']:
+                            detected_tech['cms'].append(fp.tech)
+            # Un único recorrido del HTML cubre scripts (src y contenido), enlaces <link> y el resto de la página
+            for fp in self.fingerprint_index.match(html_content, ['tech']):
+                if fp.category in detected_tech and fp.tech not in detected_tech[fp.category]:
+                    detected_tech[fp.category].append(fp.tech)
         except Exception as e:
             # Si ocurre un error durante la detección, lo muestra solo si verbose está activo
             if self.verbose:
@@ -330,6 +274,20 @@ class WebSecurityScanner:
         else:
             print(f"{Fore.YELLOW}[!] No se detectaron tecnologías")
 
+    def merge_site_technologies(self):
+        """
+        Agrega a los resultados las tecnologías vistas en las páginas exploradas,
+        junto con la evidencia (páginas y URLs) de cada una.
+        """
+        for category, techs in self.site_technologies.results().items():
+            current = self.results['technologies'].setdefault(category, [])
+            for tech in techs:
+                if tech not in current:
+                    current.append(tech)
+                    if self.verbose:
+                        print(f"{Fore.GREEN}[+] Tecnología detectada en páginas internas: {tech}")
+        self.results['technology_evidence'] = self.site_technologies.detailed_report()
+
     def discover_subdirectories(self):
         """
         Descubre subdirectorios comunes usando una wordlist.
@@ -389,6 +347,7 @@ class WebSecurityScanner:
                     visited.add(url)
                     try:
                         response = self.session.get(url, verify=False, timeout=self.timeout)
+                        self.site_technologies.observe(url, response.text, response.headers)
                         self.extract_forms(response.text, url)
                         self.extract_links(response.text, url)
                         self.extract_parameters(url)
@@ -425,6 +384,7 @@ class WebSecurityScanner:
                         if self.verbose:
                             print(f"{Fore.RED}[!] Error durante la exploración de {url}: {e}")
             self.results['forms_found'] = len(self.forms)
+            self.merge_site_technologies()
             self.discover_subdirectories()
             self.discover_subdomains()
         except Exception as e:
@@ -814,25 +774,20 @@ class WebSecurityScanner:
     def detect_tech_from_filename(self, filename):
         if not 'technologies' in self.results:
             self.results['technologies'] = {}
-        js_frameworks = JSframeworks
-        for tech_key, tech_name in js_frameworks.items():
-            if tech_key in filename:
-                if not 'js_frameworks' in self.results['technologies']:
-                    self.results['technologies']['js_frameworks'] = []
-                if tech_name not in self.results['technologies']['js_frameworks']:
-                    self.results['technologies']['js_frameworks'].append(tech_name)
-                    if self.verbose:
-                        print(f"{Fore.GREEN}[+] Detectado framework JavaScript: {tech_name}")
+        for fp in self.fingerprint_index.match(filename, ['js']):
+            tech_name = fp.tech
+            if not 'js_frameworks' in self.results['technologies']:
+                self.results['technologies']['js_frameworks'] = []
+            if tech_name not in self.results['technologies']['js_frameworks']:
+                self.results['technologies']['js_frameworks'].append(tech_name)
+                if self.verbose:
+                    print(f"{Fore.GREEN}[+] Detectado framework JavaScript: {tech_name}")
 
     def fingerprint_cms(self, html_content):
-        cms_fingerprints = CMS_fingerprints
         detected_cms = []
-        for cms, patterns in cms_fingerprints.items():
-            for pattern in patterns:
-                if pattern.lower() in html_content.lower():
-                    if cms not in detected_cms:
-                        detected_cms.append(cms)
-                    break
+        for fp in self.fingerprint_index.match(html_content, ['cms']):
+            if fp.tech not in detected_cms:
+                detected_cms.append(fp.tech)
         if detected_cms and not 'cms' in self.results['technologies']:
             self.results['technologies']['cms'] = []
         for cms in detected_cms:
@@ -842,14 +797,10 @@ class WebSecurityScanner:
                     print(f"{Fore.GREEN}[+] Detectado CMS: {cms}")
 
     def identify_analytics_tools(self, html_content):
-        analytics_patterns = ANALYTICS_PATTERNS
         detected_analytics = []
-        for tool, patterns in analytics_patterns.items():
-            for pattern in patterns:
-                if pattern.lower() in html_content.lower():
-                    if tool not in detected_analytics:
-                        detected_analytics.append(tool)
-                    break
+        for fp in self.fingerprint_index.match(html_content, ['analytics']):
+            if fp.tech not in detected_analytics:
+                detected_analytics.append(fp.tech)
         if detected_analytics and not 'analytics' in self.results['technologies']:
             self.results['technologies']['analytics'] = []
         for tool in detected_analytics:
@@ -1,39 +1,108 @@
 import asyncio
 import logging
+from urllib.parse import urlparse, parse_qs
 from typing import List, Dict, Any, Optional
 from .events.event_emitter import ScanEventEmitter, ScanEventType
 from .core.scanner_core_async import AsyncScannerCore, ScanConfig
+from .core.budget import ScanBudget
+from .core.checkpoint import ScanCheckpoint
+from .core.progress import ScanProgress, progress_line
 from .modules.registry import TesterRegistry
 from .modules.vulnerability_testers.base_tester_async import VulnerabilityTester
 from .modules.web_mapper_async import WebMapperAsync
+from .modules.frontier import SQLiteFrontier, frontier_from_spec
+from .modules.content_discovery_async import ContentDiscoveryAsync
+from .modules.js_endpoint_extractor import JSEndpointExtractor
+from .modules.site_technology import SiteTechnologyAggregator
+from .modules.asset_fingerprint import AssetFingerprinter
+from .modules.scan_planner import ScanPlanner, ScanPlan, tester_priority
+from .modules.passive_analyzers import default_analyzers
+from .modules.cookie_analyzer import CookieAnalyzer, response_cookies
+from .modules.endpoint_pipeline import (EndpointPipeline, endpoint_priority, js_endpoint_url, page_endpoints,
+                                       page_parameters)
+from .utils.i18n import i18n
+
+# Profile -> (requests in flight, timeout in seconds)
+PROFILE_CORE = {'mapping': (5, 5), 'quick': (20, 5), 'balanced': (10, 10), 'intense': (50, 15)}
+
 
 class WebSecurityScanner:
     """
     Main Scanner Class (Async).
     Orchestrates the scanning process, manages dependencies, and handles events.
     """
-    def __init__(self, config: Dict[str, Any] = None):
+    def __init__(self, config: Dict[str, Any] = None, core: AsyncScannerCore = None):
         self.config = config or {}
         self.event_emitter = ScanEventEmitter()
         
-        # Initialize Core
-        core_config = ScanConfig(**self.config.get('core', {}))
-        self.core = AsyncScannerCore(core_config)
+        # Initialize Core (batch scans pass one bound to their shared connection pool)
+        self.core = core or AsyncScannerCore(ScanConfig(**self.config.get('core', {})))
+        # An injected core keeps its concurrency (a batch's per-target cap); the profile does not override it
+        self._fixed_concurrency = core is not None
         
         self.testers: List[VulnerabilityTester] = []
-        self.mapper = WebMapperAsync(self.core)
+        self.scan_plan: Optional[ScanPlan] = None
+        self.pipeline: Optional[EndpointPipeline] = None
+        self.checkpoint: Optional[ScanCheckpoint] = None
+        self._checkpoint_frontier: Optional[SQLiteFrontier] = None
+        self._finding_keys = set()
+        self.progress: Optional[ScanProgress] = None
+        self._progress_task: Optional[asyncio.Task] = None
+        self.budget: Optional[ScanBudget] = None
+        # Endpoints the budget left untested
+        self._not_covered: List[str] = []
+        self.profile = "balanced"
+        mapping_config = self.config.get('mapping', {})
+        frontier = None
+        if mapping_config.get('frontier'):
+            frontier = frontier_from_spec(mapping_config['frontier'], mapping_config.get('num_shards', 1))
+        self.mapper = WebMapperAsync(self.core, frontier=frontier, shard=mapping_config.get('shard', 0))
+        self.mapper.ct_logs = list(mapping_config.get('ct_logs', []))
+        if not self.config.get('tls', {}).get('enabled', True):
+            self.mapper.tls_inspector = None
+        # Technology detection over every page the mapper downloads
+        self.site_technologies = SiteTechnologyAggregator(
+            saturation=self.config.get('technology_detection', {}).get('saturation', 5)
+        )
+        self.mapper.add_page_observer(self.site_technologies.observe)
+        # Endpoints go to the testers while the crawl is still running
+        self.mapper.add_endpoint_observer(self._submit_page_endpoints)
+        # Cookie flags, session ids and their entropy, fed from responses already fetched
+        cookie_config = self.config.get('cookies', {})
+        self.cookies = CookieAnalyzer(
+            max_samples=cookie_config.get('sample_size', 10),
+            min_entropy_bits=cookie_config.get('min_entropy_bits', 64)
+        )
+        # Passive checks on every response the core fetches (crawl, testers, discovery)
+        self._cookie_technologies = set()
+        self.passive = self.config.get('passive', {}).get('enabled', True)
+        if self.passive:
+            for analyzer in default_analyzers(self.cookies):
+                self.core.passive_bus.register(analyzer)
+            self.core.passive_bus.on_finding(self._on_passive_finding)
         self._logger = logging.getLogger(__name__)
         
-        # Subscribe mapper to vulnerabilities
-        self.event_emitter.on(ScanEventType.VULNERABILITY_FOUND, self._on_vulnerability_found)
+        # Subscribe mapper to vulnerabilities (inline: the report reads them as soon as the scan ends)
+        self.event_emitter.on(ScanEventType.VULNERABILITY_FOUND, self._on_vulnerability_found, inline=True)
 
     def _on_vulnerability_found(self, **kwargs):
         """Collect vulnerabilities for the report."""
         vuln = kwargs.get('vulnerability')
+        if vuln and self.checkpoint is not None:
+            # Testers already stored theirs; the key set only drops findings restored on resume
+            key = ScanCheckpoint.finding_key(vuln)
+            if key in self._finding_keys:
+                return
+            self._finding_keys.add(key)
+            self.checkpoint.add_finding(vuln)
         if vuln:
             # Adapt format if needed, but it seems compatible
             self.mapper.vulnerabilities.append(vuln)
 
+    async def _on_passive_finding(self, finding: Dict[str, Any], analyzer: str):
+        """Report passive findings like tester findings."""
+        await self.event_emitter.emit(ScanEventType.VULNERABILITY_FOUND, vulnerability=finding, tester=analyzer)
+
     async def initialize(self):
         """
         Initialize the scanner: discover testers and instantiate them.
@@ -51,76 +120,152 @@ class WebSecurityScanner:
             except Exception as e:
                 self._logger.error(f"Failed to initialize tester {cls.__name__}: {e}")
 
-    async def run_scan(self, target_url: str, profile: str = "balanced"):
+    async def run_scan(self, target_url: str, profile: str = "balanced") -> Dict[str, Any]:
         """
         Run the full scan against the target URL.
+        Returns a summary: url, vulnerabilities, technologies, report path and error (if the scan failed).
         """
+        summary = {'url': target_url, 'vulnerabilities': self.mapper.vulnerabilities, 'technologies': {},
+                   'report': None, 'error': None}
         if not self.testers:
             await self.initialize()
 
         self._apply_profile(profile)
+        self.progress = ScanProgress()
+        for tester in self.testers:
+            tester.progress = self.progress
         
         await self.event_emitter.emit(ScanEventType.SCAN_START, url=target_url)
         await self.core.start()
         
         try:
             self._logger.info(f"Starting scan on {target_url} with profile: {profile}")
+            resumed = await self._open_checkpoint(target_url)
+            if not resumed and not self.config.get('mapping', {}).get('frontier'):
+                # The scanner's own frontier: every scan starts from an empty one (a shared one is left alone)
+                frontier = self.mapper.frontier
+                await frontier.run(frontier.clear)
             
-            # Create tasks for all testers
-            tasks = []
-            for tester in self.testers:
-                if self._should_run_tester(tester, profile):
-                    self._logger.debug(f"Scheduling {tester.name}")
-                    tasks.append(self._run_tester_safe(tester, target_url))
+            # Know the stack before sending payloads, so the planner can prune them
+            landing = await self._fingerprint_target(target_url, profile)
+            self.scan_plan = None
+            if self.config.get('planning', {}).get('enabled', True):
+                self.scan_plan = await self._plan_scan(target_url, landing, profile)
             
-            # Run all testers concurrently
-            if tasks:
-                await asyncio.gather(*tasks)
-            else:
+            # Testers consume endpoints as they are found: the target first, then whatever the crawl yields
+            self.profile = profile
+            self.pipeline = self._create_pipeline()
+            self.pipeline.start()
+            self._start_progress_reports()
+            if not any(self._should_run_tester(tester, profile) for tester in self.testers):
                 self._logger.warning("No testers scheduled for this profile.")
+            self.pipeline.submit(target_url, source='target')
+            if resumed:
+                # Pages crawled before the interruption will not be fetched again: queue their endpoints now
+                frontier = self.mapper.frontier
+                for url, page in await frontier.run(lambda: list(frontier.iter_pages())):
+                    if page['status'] == 200:
+                        self._submit_page_endpoints(url, page)
+            
+            if self._should_run_content_discovery(profile):
+                await self._run_content_discovery(target_url)
             
             # Run Web Mapper
             self._logger.info("Generating web architecture map...")
             await self.event_emitter.emit(ScanEventType.PROGRESS_UPDATE, message="Mapping web architecture...")
-            map_data = await self.mapper.map_website(target_url)
-            report_path = self.mapper.generate_map(map_data)
+            mapping_config = self.config.get('mapping', {})
+            if self._should_run_js_analysis(profile):
+                self.mapper.js_extractor = JSEndpointExtractor(
+                    self.core,
+                    self.event_emitter,
+                    include_external=self.config.get('js_analysis', {}).get('include_external', False)
+                )
+            if mapping_config.get('state_path'):
+                map_data = await self.mapper.map_website_incremental(
+                    target_url,
+                    mapping_config['state_path'],
+                    max_depth=mapping_config.get('max_depth', 3),
+                    min_likelihood=mapping_config.get('min_likelihood', 0.3)
+                )
+                diff = map_data['diff']
+                await self.event_emitter.emit(
+                    ScanEventType.LOG_MESSAGE,
+                    message=f"Map diff: {len(diff['new_endpoints'])} new, "
+                            f"{len(diff['removed_endpoints'])} removed endpoints, "
+                            f"{len(diff['new_forms'])} new forms"
+                )
+            else:
+                map_data = await self.mapper.map_website(target_url, max_depth=mapping_config.get('max_depth', 3))
+            await self.core.passive_bus.drain()
+            self._record_cookie_technologies()
+            await self._add_site_technologies(target_url)
+            await self._report_tls_issues()
+            await self.pipeline.join()
+            await self._report_pipeline()
+            summary['budget'] = await self._report_budget()
+            await self._report_waf_guard()
+            await self.core.passive_bus.drain()
+            await self._analyze_sessions()
+            if not self._target_answered(landing):
+                # Nothing answered (DNS failure, refused connection, timeouts): the scan did not happen
+                summary['error'] = f"target unreachable: {landing.get('error') or 'no response'}"
+                self._logger.error(f"Scan failed: {summary['error']}")
+                await self.event_emitter.emit(ScanEventType.ERROR, error=summary['error'])
+            elif self.checkpoint:
+                self.checkpoint.finish()
+            report_path = self.mapper.generate_map(map_data, mapping_config.get('output_path'))
+            summary['report'] = report_path
+            summary['technologies'] = self.site_technologies.results()
             
             self._logger.info(f"Map generated at: {report_path}")
             await self.event_emitter.emit(ScanEventType.LOG_MESSAGE, message=f"Report generated: {report_path}")
             
         except Exception as e:
             self._logger.error(f"Scan failed: {e}")
+            summary['error'] = str(e)
             await self.event_emitter.emit(ScanEventType.ERROR, error=str(e))
         finally:
+            if self.pipeline:
+                await self.pipeline.close()
+            summary['progress'] = await self._stop_progress_reports()
+            self._close_checkpoint()
             await self.core.close()
-            await self.event_emitter.emit(ScanEventType.SCAN_COMPLETE)
+            # The report path travels with the completion event: log lines may be dropped under load
+            await self.event_emitter.emit(ScanEventType.SCAN_COMPLETE, report=summary.get('report'))
+            # Listeners lag behind the scan; deliver everything before returning
+            await self.event_emitter.close()
+            for name, stats in self.event_emitter.stats().items():
+                if stats['dropped'] or stats['merged']:
+                    self._logger.debug(f"Event listener {name}: {stats}")
             self._logger.info("Scan complete")
+        return summary
 
     def _apply_profile(self, profile: str):
         """Apply scan profile settings."""
         # Update core config based on profile
-        if profile == 'mapping':
-            self.core.config.max_concurrency = 5
-            self.core.config.timeout = 5
-            # Update semaphore
-            self.core._semaphore = asyncio.Semaphore(5)
-        elif profile == 'quick':
-            self.core.config.max_concurrency = 20
-            self.core.config.timeout = 5
-            self.core._semaphore = asyncio.Semaphore(20)
-        elif profile == 'balanced':
-            self.core.config.max_concurrency = 10
-            self.core.config.timeout = 10
-            self.core._semaphore = asyncio.Semaphore(10)
-        elif profile == 'intense':
-            self.core.config.max_concurrency = 50
-            self.core.config.timeout = 15
-            self.core._semaphore = asyncio.Semaphore(50)
+        if profile in PROFILE_CORE:
+            concurrency, timeout = PROFILE_CORE[profile]
+            self.core.config.timeout = timeout
+            if not self._fixed_concurrency:
+                self.core.config.max_concurrency = concurrency
+                # Update semaphore
+                self.core._semaphore = asyncio.Semaphore(concurrency)
+        
+        # Wall time, request and byte caps from the budget section; quick scans stop after 10 minutes
+        budget = dict(self.config.get('budget', {}))
+        if profile == 'quick':
+            budget.setdefault('max_time', 600)
+        self.budget = ScanBudget.from_config(budget)
+        self.core.budget = self.budget
+        self._not_covered = []
 
     def _should_run_tester(self, tester: VulnerabilityTester, profile: str) -> bool:
-        """Determine if a tester should run based on the profile."""
+        """Determine if a tester should run based on the profile and the scan plan."""
         cls_name = tester.__class__.__name__
         
+        if self.scan_plan is not None and not self.scan_plan.is_enabled(cls_name):
+            return False
+        
         if profile == 'mapping':
             # Only passive or very light checks
             return cls_name in ['HeaderSecurityTester']
@@ -131,14 +276,336 @@ class WebSecurityScanner:
         # Balanced and Intense run everything
         return True
 
+    def _should_run_content_discovery(self, profile: str) -> bool:
+        """Directory brute-forcing is noisy, so it only runs on intense scans unless configured."""
+        discovery_config = self.config.get('content_discovery', {})
+        return discovery_config.get('enabled', profile == 'intense')
+
+    async def _run_content_discovery(self, target_url: str):
+        """Brute-force hidden files and directories and add the hits to the site map."""
+        discovery_config = self.config.get('content_discovery', {})
+        await self.event_emitter.emit(ScanEventType.PROGRESS_UPDATE, message="Discovering hidden content...")
+        discovery = ContentDiscoveryAsync(
+            self.core,
+            self.event_emitter,
+            wordlist=discovery_config.get('wordlist'),
+            extensions=discovery_config.get('extensions'),
+            max_depth=discovery_config.get('max_depth', 2)
+        )
+        try:
+            for hit in await discovery.discover(target_url):
+                self.mapper.add_discovered(hit['url'])
+        except Exception as e:
+            self._logger.error(f"Content discovery failed: {e}")
+            await self.event_emitter.emit(ScanEventType.ERROR, error=f"Content discovery failed: {str(e)}")
+
+    def _target_answered(self, landing: Dict[str, Any]) -> bool:
+        """True when the landing page or any other request of the scan got a response."""
+        if landing.get('status_code'):
+            return True
+        stats = self.core.stats
+        return stats['requests'] > stats['failed']
+
+    async def _fingerprint_target(self, target_url: str, profile: str) -> Dict[str, Any]:
+        """Fingerprint the landing page and static assets; returns the landing response."""
+        landing = await self.core.request("GET", target_url)
+        if landing.get('status_code') == 200 and landing.get('text'):
+            self.site_technologies.observe(target_url, landing['text'], landing.get('headers', {}))
+        # Session cookies name the stack; the passive bus sees the landing page later, so look now
+        self.cookies.observe(target_url, landing)
+        self._record_cookie_technologies()
+        if self._should_run_asset_fingerprint(profile):
+            await self._run_asset_fingerprint(target_url)
+        # A WAF known up front makes the core's guard quicker to call block pages
+        for waf in self.site_technologies.results().get('waf', []):
+            self.core.waf_guard.note_waf(target_url, waf)
+        return landing
+
+    async def _report_waf_guard(self):
+        """Log hosts where the WAF guard throttled requests or switched payload encoding."""
+        for host, state in self.core.waf_guard.report().items():
+            if not state['blocks']:
+                continue
+            line = (f"WAF {state['waf'] or 'unknown'} on {host}: {state['blocks']} blocked requests, "
+                    f"delay {state['delay']}s, payload encoding {state['encoding']}")
+            self._logger.warning(line)
+            await self.event_emitter.emit(ScanEventType.LOG_MESSAGE, message=line)
+
+    async def _plan_scan(self, target_url: str, landing: Dict[str, Any], profile: str) -> ScanPlan:
+        """Prune testers and payload families for the detected stack and show the plan."""
+        headers = {name.lower(): value for name, value in landing.get('headers', {}).items()}
+        planner = ScanPlanner(
+            self.site_technologies.results(),
+            content_types=[headers.get('content-type', '')],
+            server_banner=headers.get('server', '')
+        )
+        testers = {t.__class__.__name__: t for t in self.testers if self._should_run_tester(t, profile)}
+        # Only the landing page is known yet: its query and form fields stand in for what the crawl will add
+        plan = planner.plan(testers, targets=page_parameters(target_url, landing.get('text', '')))
+        for line in ["Scan plan:"] + plan.summary_lines():
+            self._logger.info(line)
+            await self.event_emitter.emit(ScanEventType.LOG_MESSAGE, message=line)
+        return plan
+
+    def _should_run_asset_fingerprint(self, profile: str) -> bool:
+        """Favicon and asset hashing only costs a handful of requests, so it runs by default."""
+        return self.config.get('asset_fingerprint', {}).get('enabled', True)
+
+    async def _run_asset_fingerprint(self, target_url: str):
+        """Identify technologies from the favicon hash and well-known static files."""
+        fingerprinter = AssetFingerprinter(self.core)
+        try:
+            for finding in await fingerprinter.fingerprint(target_url):
+                self.site_technologies.record(
+                    finding['url'], finding['category'], finding['name'], finding['confidence'],
+                    finding['evidence'], finding['version']
+                )
+        except Exception as e:
+            self._logger.error(f"Asset fingerprinting failed: {e}")
+            await self.event_emitter.emit(ScanEventType.ERROR, error=f"Asset fingerprinting failed: {str(e)}")
+
+    async def _report_tls_issues(self):
+        """Report certificate problems found while harvesting SANs (expired, self-signed, weak keys...)."""
+        for result in self.mapper.tls_results.values():
+            for issue in result.issues():
+                await self.event_emitter.emit(ScanEventType.VULNERABILITY_FOUND, vulnerability={
+                    "type": i18n.get('vulnerabilities.tls_issue'),
+                    "url": f"https://{result.host}:{result.port}/",
+                    "severity": "Medium" if 'expired' in issue or 'weak' in issue else "Low",
+                    "payload": "N/A",
+                    "evidence": issue
+                }, tester='tls')
+
+    def _record_cookie_technologies(self):
+        """Add the technologies revealed by cookie names (every Set-Cookie, not just the last one)."""
+        for (host, name), cookie in self.cookies.cookies.items():
+            if (host, name) in self._cookie_technologies:
+                continue
+            self._cookie_technologies.add((host, name))
+            for category, tech in cookie.technologies:
+                self.site_technologies.record(self.cookies.urls[(host, name)], category, tech, 'medium',
+                                              f"cookie {name}")
+
+    async def _analyze_sessions(self):
+        """
+        Sample session ids from fresh sessions (concurrently, only for cookies
+        with too few values seen passively) and report weak or repeated ids.
+        """
+        sample_size = self.config.get('cookies', {}).get('sample_size', 10)
+        if sample_size > 1:
+            await asyncio.gather(*(
+                self._sample_session(host, name, url, sample_size)
+                for host, name, url in self.cookies.needs_samples(sample_size)
+            ))
+        for entry in self.cookies.findings(include_flags=not self.passive):
+            await self.event_emitter.emit(ScanEventType.VULNERABILITY_FOUND, vulnerability={
+                "type": i18n.get('vulnerabilities.weak_session_id' if entry['weak'] or entry['reused']
+                                 else 'vulnerabilities.insecure_cookie'),
+                "url": entry['url'],
+                "severity": "High" if entry['reused'] else "Medium",
+                "payload": entry['name'],
+                "evidence": i18n.get('vulnerabilities.evidence.session_id', name=entry['name'],
+                                     issues='; '.join(entry['issues']))
+            }, tester='cookies')
+
+    async def _sample_session(self, host: str, name: str, url: str, sample_size: int):
+        """Open fresh sessions against the URL that issued the cookie and collect the ids."""
+        missing = sample_size - len(self.cookies.samples.get((host, name), []))
+        responses = await asyncio.gather(*(
+            self.core.request("GET", url, stateless=True) for _ in range(missing)
+        ))
+        values = [cookie.value for response in responses for cookie in response_cookies(response)
+                  if cookie.name == name and not cookie.deleted]
+        self.cookies.add_samples(host, name, values)
+
+    async def _add_site_technologies(self, target_url: str):
+        """Add the technologies seen while mapping to the map, with their evidence."""
+        domain = urlparse(target_url).netloc
+        entries = self.mapper.technologies.setdefault(domain, [])
+        known = {entry['name'] for entry in entries}
+        for category, techs in self.site_technologies.detailed_report().items():
+            for tech in techs:
+                if tech['name'] in known:
+                    continue
+                known.add(tech['name'])
+                entry = {
+                    'name': tech['name'],
+                    'type': category,
+                    'confidence': tech['confidence'],
+                    'evidence': f"{tech['pages']} page(s), e.g. {tech['urls'][0]}"
+                }
+                if tech['versions']:
+                    entry['version'] = ', '.join(tech['versions'])
+                entries.append(entry)
+        await self.event_emitter.emit(
+            ScanEventType.LOG_MESSAGE,
+            message=f"Technologies: {len(entries)} detected across "
+                    f"{self.site_technologies.pages_observed} pages"
+        )
+
+    async def _open_checkpoint(self, target_url: str) -> bool:
+        """
+        Checkpoint of this target in checkpoint.path, shared with the testers.
+        Unless the mapping config names its own frontier, the crawl runs on a
+        SQLite frontier next to it, so a resume continues the crawl as well.
+        Returns True when a previous run's progress was restored.
+        """
+        settings = self.config.get('checkpoint', {})
+        if not settings.get('path'):
+            return False
+        self.checkpoint = ScanCheckpoint(settings['path'], target_url, interval=settings.get('interval', 5.0))
+        resumed = self.checkpoint.begin(resume=settings.get('resume', False))
+        for tester in self.testers:
+            tester.checkpoint = self.checkpoint
+        mapping_config = self.config.get('mapping', {})
+        if not mapping_config.get('frontier') and not mapping_config.get('state_path'):
+            self._checkpoint_frontier = SQLiteFrontier(self.checkpoint.frontier_path())
+            self.mapper.frontier = self._checkpoint_frontier
+        if resumed:
+            frontier = self._checkpoint_frontier
+            requeued = await frontier.run(frontier.requeue_in_flight) if frontier else 0
+            findings = self.checkpoint.findings()
+            self.mapper.vulnerabilities.extend(findings)
+            self._finding_keys.update(map(ScanCheckpoint.finding_key, findings))
+            await self.event_emitter.emit(
+                ScanEventType.LOG_MESSAGE,
+                message=f"Resuming scan: {self.checkpoint.completed} payloads already sent, "
+                        f"{len(findings)} findings restored, {requeued} interrupted pages queued again"
+            )
+        return resumed
+
+    def _close_checkpoint(self):
+        if self.checkpoint:
+            if self.checkpoint.stats['skipped']:
+                self._logger.info(f"Checkpoint: {self.checkpoint.stats['skipped']} completed payloads skipped")
+            self.checkpoint.close()
+        if self._checkpoint_frontier:
+            self._checkpoint_frontier.close()
+
+    def _should_run_js_analysis(self, profile: str) -> bool:
+        """Bundle analysis costs one request per script, so quick scans skip it unless configured."""
+        return self.config.get('js_analysis', {}).get('enabled', profile != 'quick')
+
+    def _create_pipeline(self) -> EndpointPipeline:
+        """Endpoint queue between the crawler and the testers, capped per source."""
+        pipeline_config = self.config.get('pipeline', {})
+        return EndpointPipeline(
+            self._test_endpoint,
+            workers=pipeline_config.get('workers', 4),
+            limits={
+                'crawl': pipeline_config.get('max_endpoints', 100),
+                'js': self.config.get('js_analysis', {}).get('max_test_endpoints', 25)
+            },
+            priority=endpoint_priority
+        )
+
+    def _submit_page_endpoints(self, url: str, page: Dict[str, Any]):
+        """Queue the testable URLs of a crawled page (links with parameters, GET forms, JS endpoints)."""
+        if self.pipeline is None or self.profile == 'mapping':
+            return
+        for endpoint in page_endpoints(url, page.get('links', []), page.get('forms', [])):
+            self.pipeline.submit(endpoint, source='crawl')
+        for endpoint in page.get('js_endpoints', []):
+            endpoint_url = js_endpoint_url(endpoint)
+            if endpoint_url:
+                self.pipeline.submit(endpoint_url, source='js')
+
+    async def _test_endpoint(self, url: str, source: str):
+        """
+        Run the scheduled testers on one endpoint; header checks only make sense on the target.
+        Testers start most valuable first; once the budget runs low they run one after the other,
+        so what is left of it goes to the best ones.
+        """
+        if self.budget is not None and self.budget.exhausted:
+            self._not_covered.append(url)
+            return
+        testers = [t for t in self.testers if self._should_run_tester(t, self.profile)
+                   and (source == 'target' or t.__class__.__name__ != 'HeaderSecurityTester')]
+        if source != 'target':
+            self._logger.debug(f"Testing {url} ({source})")
+        testers.sort(key=lambda t: tester_priority(t.__class__.__name__), reverse=True)
+        if self.budget is None or not self.budget.running_low(self.core.stats['requests'], self.core.stats['bytes']):
+            await asyncio.gather(*[self._run_tester_safe(tester, url) for tester in testers])
+            return
+        for tester in testers:
+            await self._run_tester_safe(tester, url)
+
+    async def _report_pipeline(self):
+        """Log how many endpoints the crawl handed to the testers."""
+        stats = self.pipeline.stats
+        line = (f"Endpoints tested: {stats['tested']} "
+                f"({stats['duplicates']} duplicates, {stats['over_limit']} over the limit)")
+        self._logger.info(line)
+        await self.event_emitter.emit(ScanEventType.LOG_MESSAGE, message=line)
+
     async def _run_tester_safe(self, tester: VulnerabilityTester, target_url: str):
-        """Run a single tester with error handling."""
+        """Run a single tester with error handling; its jobs are every payload on every query parameter."""
+        key = tester.__class__.__name__
+        self.progress.start(key, target_url, len(parse_qs(urlparse(target_url).query)) * len(tester.planned_payloads()))
         try:
-            await self.event_emitter.emit(ScanEventType.PROGRESS_UPDATE, message=f"Running {tester.name}...")
             await tester.run_test(target_url)
         except Exception as e:
             self._logger.error(f"Error in tester {tester.name}: {e}")
             await self.event_emitter.emit(ScanEventType.ERROR, error=f"{tester.name} failed: {str(e)}")
+        finally:
+            self.progress.finish(key, target_url, skipped=self.budget is not None and self.budget.exhausted)
+
+    async def _report_budget(self) -> Optional[Dict[str, Any]]:
+        """Budget use and, when it ran out, what the scan did not cover."""
+        if self.budget is None:
+            return None
+        report = self.budget.report(self.core.stats['requests'], self.core.stats['bytes'])
+        frontier = self.mapper.frontier
+        pages = 0
+        if self.budget.exhausted:
+            pages = await frontier.run(frontier.queued) + await frontier.run(frontier.in_flight)
+        report['not_covered'] = {
+            'pages': pages,
+            'endpoints': list(self._not_covered),
+            'jobs': self.progress.skipped(),
+        }
+        used = report['used']
+        lines = [f"Budget: {used['time']}s, {used['requests']} requests, {used['bytes']} bytes"]
+        if self.budget.exhausted:
+            missing = report['not_covered']
+            lines.append(f"Budget exhausted ({self.budget.exhausted_by}): stopped with {missing['pages']} pages "
+                         f"not crawled, {len(missing['endpoints'])} endpoints and "
+                         f"{sum(missing['jobs'].values())} payload jobs not tested")
+            lines.extend(f"  - {name}: {jobs} jobs not tested" for name, jobs in sorted(missing['jobs'].items()))
+            self._logger.warning(lines[1])
+        for line in lines:
+            await self.event_emitter.emit(ScanEventType.LOG_MESSAGE, message=line)
+        return report
+
+    def _start_progress_reports(self):
+        """Emit a structured PROGRESS_UPDATE every progress.interval seconds (0 disables)."""
+        interval = self.config.get('progress', {}).get('interval', 5.0)
+        if interval > 0:
+            self._progress_task = asyncio.create_task(self._report_progress(interval))
+
+    async def _report_progress(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self._emit_progress()
+
+    async def _emit_progress(self) -> Dict[str, Any]:
+        """
+        One progress event: message is the one-line summary, progress the
+        snapshot (jobs planned/done, percent, req/s, jobs/s, ETA, per tester).
+        """
+        snapshot = self.progress.snapshot(self.core.stats['requests'], self.core.stats['bytes'])
+        await self.event_emitter.emit(ScanEventType.PROGRESS_UPDATE, message=progress_line(snapshot),
+                                      progress=snapshot)
+        return snapshot
+
+    async def _stop_progress_reports(self) -> Optional[Dict[str, Any]]:
+        """Stop the periodic reports and return the final figures (also emitted when reports were on)."""
+        if self._progress_task is None:
+            return self.progress.snapshot(self.core.stats['requests'], self.core.stats['bytes'])
+        self._progress_task.cancel()
+        await asyncio.gather(self._progress_task, return_exceptions=True)
+        self._progress_task = None
+        return await self._emit_progress()
 
     def get_event_emitter(self) -> ScanEventEmitter:
         return self.event_emitter